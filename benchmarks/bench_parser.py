@@ -0,0 +1,446 @@
+"""Benchmarks each phase of the :class:`~.READMEParser` on a synthetic project
+
+The project is generated offline, without intersphinx, and its size is set by the
+command line options. It's built once with Sphinx, then each phase is timed over
+several runs, using the same environment:
+
+* ``parse_env``, including :meth:`~.READMEParser.parse_titles` and the domain parsing steps
+* ``parse_sources``, including the doctree reparses and each :meth:`~.READMEParser.parse_doctree` collector
+* ``get_fingerprint`` and ``resolve_source``, including each ``replace_*`` step
+
+**Usage:**
+
+.. code-block:: shell
+
+   python benchmarks/bench_parser.py [--objects N] [--docs M] [--xrefs K] [-o results.json] [--compare baseline.json]
+
+Results are written as JSON. If a baseline is given, the command exits with status ``1``
+if the median time of any phase regressed by more than the ``--threshold``
+"""
+import os
+import sys
+import json
+import math
+import time
+import platform
+import argparse
+import functools
+import statistics
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARKS_DIR.parent))
+
+import sphinx  # noqa: E402
+from sphinx.application import Sphinx  # noqa: E402
+from sphinx.util.docutils import docutils_namespace, patch_docutils  # noqa: E402
+
+from sphinx_readme import __version__  # noqa: E402
+from sphinx_readme.utils.sphinx import get_conf_val  # noqa: E402
+
+
+#: The methods of the :class:`~.READMEParser` to time, in the order they're reported
+PARSER_PHASES = [
+    "parse_env", "parse_titles", "parse_roles", "parse_objtypes", "parse_references",
+    "parse_py_domain", "parse_std_domain",
+    "parse_sources", "parse_doctree", "parse_admonitions", "parse_rubrics",
+    "parse_toctrees", "parse_intersphinx_nodes",
+    "get_fingerprint", "resolve_source", "replace_directives", "replace_rst_images",
+    "replace_xrefs", "replace_py_xrefs", "replace_unresolved_xrefs",
+]
+
+#: Number of objects in each module of the generated package
+OBJECTS_PER_MODULE = 50
+
+CONF_PY = """\
+import sys
+sys.path.insert(0, {package_dir!r})
+
+extensions = ['sphinx_readme', 'sphinx.ext.autodoc']
+project = 'bench'
+html_baseurl = 'https://bench.readthedocs.io/en/latest'
+html_context = {{'github_user': 'bench', 'github_repo': 'bench', 'github_version': 'main'}}
+readme_src_files = 'README.rst'
+readme_docs_url_type = {docs_url_type!r}
+readme_linkcode_static = True
+readme_out_dir = {out_dir!r}
+"""
+
+
+def generate_package(package_dir: Path, objects: int) -> Dict[str, List[str]]:
+    """Generates a package with the given number of classes, methods and functions
+
+    :param package_dir: the directory to create the ``bench_pkg`` package in
+    :param objects: the total number of objects to generate
+    :return: the qualified names of the generated objects, by object type
+    """
+    names = {"module": [], "class": [], "method": [], "function": []}
+    pkg = package_dir / "bench_pkg"
+    pkg.mkdir(parents=True)
+    (pkg / "__init__.py").write_text('"""Synthetic package for benchmarks"""\n')
+
+    for m in range(math.ceil(objects / OBJECTS_PER_MODULE)):
+        module = f"bench_pkg.module_{m}"
+        lines = [f'"""Module {m}"""', ""]
+        cls = None
+
+        for p in range(min(OBJECTS_PER_MODULE, objects - m * OBJECTS_PER_MODULE)):
+            if p >= 40:
+                names["function"].append(f"{module}.function_{p}")
+                lines += ["", f"def function_{p}(value: int) -> int:", f'    """Function {p}"""', "    return value", ""]
+            elif p % 5 == 0:
+                cls = f"Class{m}x{p // 5}"
+                names["class"].append(f"{module}.{cls}")
+                lines += ["", f"class {cls}:", f'    """Class {cls}"""', ""]
+            else:
+                names["method"].append(f"{module}.{cls}.method_{p % 5}")
+                lines += [f"    def method_{p % 5}(self, value: int) -> int:", f'        """Method {p % 5}"""', "        return value", ""]
+
+        (pkg / f"module_{m}.py").write_text("\n".join(lines), encoding="utf-8")
+        names["module"].append(module)
+
+    return names
+
+
+def generate_pages(docs_dir: Path, documents: int, depth: int) -> None:
+    """Generates documents which are nested by toctrees up to the given depth
+
+    :param docs_dir: the source directory of the project
+    :param documents: the number of documents to generate
+    :param depth: the maximum depth of the toctrees
+    """
+    pages = docs_dir / "pages"
+    pages.mkdir()
+    branches = 1
+
+    while sum(branches ** level for level in range(max(depth, 1))) < documents:
+        branches += 1
+
+    for n in range(documents):
+        children = [c for c in range(n * branches + 1, n * branches + branches + 1) if c < documents]
+        parent = f"See :ref:`page-{(n - 1) // branches}` for the parent page." if n else "This is the root page."
+        lines = [
+            f".. _page-{n}:", "", f"Page {n}", "=" * len(f"Page {n}"), "", parent, "",
+            f".. _page-{n}-section:", "", f"Section {n}", "-" * len(f"Section {n}"), "",
+            "Some ``inline literal`` text, and a paragraph of plain text.", "",
+        ]
+        if children:
+            lines += [".. toctree::", ""] + [f"   page_{c}" for c in children] + [""]
+
+        (pages / f"page_{n}.rst").write_text("\n".join(lines), encoding="utf-8")
+
+
+def get_xrefs(names: Dict[str, List[str]], documents: int, count: int) -> List[str]:
+    """Returns cross-references of each supported type to the generated objects and documents
+
+    :param names: the qualified names of the generated objects, by object type
+    :param documents: the number of generated documents
+    :param count: the number of cross-references to return
+    """
+    kinds: List[Callable[[int], str]] = [
+        lambda i: f":class:`{pick(names['class'], i)}`",
+        lambda i: f":meth:`~.{'.'.join(pick(names['method'], i).split('.')[-2:])}`",
+        lambda i: f":func:`{'.'.join(pick(names['function'] or names['method'], i).split('.')[-2:])}`",
+        lambda i: f":meth:`the method <{pick(names['method'], i)}>`",
+        lambda i: f":mod:`{pick(names['module'], i)}`",
+        lambda i: f":ref:`page-{i % documents}`",
+        lambda i: f":ref:`page-{i % documents}-section`",
+        lambda i: f":doc:`pages/page_{i % documents}`",
+        lambda i: f":class:`missing.Object{i}`",
+    ]
+    return [kinds[i % len(kinds)](i) for i in range(count)]
+
+
+def pick(items: List[str], i: int) -> str:
+    return items[(i * 7919) % len(items)]
+
+
+def generate_readme(docs_dir: Path, xrefs: List[str], depth: int, admonitions: int, admonition_lines: int, includes: int) -> None:
+    """Generates the README source file and the files it includes
+
+    :param docs_dir: the source directory of the project
+    :param xrefs: the cross-references to add to the README
+    :param depth: the maxdepth of the README toctree
+    :param admonitions: the number of admonitions to add
+    :param admonition_lines: the number of lines in the body of each admonition
+    :param includes: the number of files to include
+    """
+    lines = ["Benchmark Project", "=================", "", ".. image:: _static/logo.svg", ""]
+    xrefs = iter(xrefs)
+
+    def paragraph(size: int = 10) -> str:
+        return " and ".join(xref for _, xref in zip(range(size), xrefs)) or "No more cross-references"
+
+    for a in range(admonitions):
+        body = [f"Line {i} of the admonition with ``inline markup`` and {paragraph(1)}" for i in range(admonition_lines)]
+        directive = [".. note::"] if a % 2 else [".. admonition:: Admonition Title", "   :class: tip"]
+        lines += directive + [""] + [f"   {line}" for line in body] + [""]
+
+        if a % 5 == 0:
+            lines += ["   .. warning:: Nested admonition", ""]
+
+        lines += [f".. rubric:: Rubric {a}", "", paragraph(), ""]
+
+    include_dir = docs_dir / "includes"
+    include_dir.mkdir()
+
+    for i in range(includes):
+        (include_dir / f"part_{i}.rst").write_text(
+            f"Included paragraph {i} with {paragraph(2)}\n\n.. tip:: Included tip {i}\n", encoding="utf-8")
+        lines += [f".. include:: includes/part_{i}.rst", ""]
+
+    lines += [".. only:: readme", "", "   Only included in the README", ""]
+
+    while (text := paragraph()) != "No more cross-references":
+        lines += [text, ""]
+
+    lines += [".. image:: _static/logo.svg", "", ".. toctree::", f"   :maxdepth: {depth}", "", "   pages/page_0", ""]
+    (docs_dir / "README.rst").write_text("\n".join(lines), encoding="utf-8")
+
+
+def generate_project(
+        root: Path,
+        objects: int = 1000,
+        documents: int = 50,
+        xrefs: int = 500,
+        depth: int = 4,
+        admonitions: int = 20,
+        admonition_lines: int = 20,
+        includes: int = 10,
+        docs_url_type: str = "html"
+) -> Path:
+    """Generates a synthetic Sphinx project
+
+    :param root: the directory to generate the project in
+    :param objects: the number of Python objects to document
+    :param documents: the number of documents, which are nested by toctrees
+    :param xrefs: the number of cross-references in the README
+    :param depth: the maximum depth of the toctrees
+    :param admonitions: the number of admonitions in the README
+    :param admonition_lines: the number of lines in each admonition
+    :param includes: the number of files included by the README
+    :param docs_url_type: the value of :confval:`readme_docs_url_type`
+    :return: the source directory of the project
+    """
+    if objects < OBJECTS_PER_MODULE or documents < 1:
+        raise ValueError(f"at least {OBJECTS_PER_MODULE} objects and one document are needed")
+
+    docs_dir = root / "docs"
+    (docs_dir / "_static").mkdir(parents=True)
+    (docs_dir / "api").mkdir()
+    (docs_dir / "_static" / "logo.svg").write_text('<svg xmlns="http://www.w3.org/2000/svg"/>\n')
+    (docs_dir / "conf.py").write_text(CONF_PY.format(
+        package_dir=str(root), docs_url_type=docs_url_type, out_dir=str(root / "out")))
+
+    names = generate_package(root, objects)
+
+    for module in names["module"]:
+        (docs_dir / "api" / f"{module}.rst").write_text(
+            f"{module}\n{'=' * len(module)}\n\n.. automodule:: {module}\n   :members:\n", encoding="utf-8")
+
+    generate_pages(docs_dir, documents, depth)
+    generate_readme(docs_dir, get_xrefs(names, documents, xrefs), depth, admonitions, admonition_lines, includes)
+    (docs_dir / "index.rst").write_text("\n".join([
+        "Index", "=====", "", ".. toctree::", "   :glob:", "", "   README", "   api/*", "   pages/page_0", ""
+    ]), encoding="utf-8")
+    return docs_dir
+
+
+def install_timers(obj: object, names: Sequence[str], stats: Dict[str, List[float]]) -> None:
+    """Replaces methods of an object with wrappers that record their total time and number of calls
+
+    :param obj: the object to time the methods of
+    :param names: the names of the methods
+    :param stats: the mapping to record the ``[seconds, calls]`` of each method in
+    """
+    for name in names:
+        method = getattr(obj, name)
+        stats[name] = [0.0, 0]
+
+        def timed(*args, __method=method, __stats=stats[name], **kwargs):
+            start = time.perf_counter()
+            try:
+                return __method(*args, **kwargs)
+            finally:
+                __stats[0] += time.perf_counter() - start
+                __stats[1] += 1
+
+        setattr(obj, name, functools.wraps(method)(timed))
+
+
+def run_benchmark(root: Path, repeat: int = 5, **options) -> Dict:
+    """Generates a synthetic project, then times each phase of the :class:`~.READMEParser`
+
+    :param root: an empty directory in a git repository, to generate the project in
+    :param repeat: the number of times to run each phase
+    :param options: the options for :func:`generate_project`
+    :return: the results of the benchmark
+    """
+    start = time.perf_counter()
+    docs_dir = generate_project(root, **options)
+    generate_time = time.perf_counter() - start
+    cwd = os.getcwd()
+    os.chdir(root)  # The repository is found from the working directory
+
+    try:
+        with patch_docutils(docs_dir), docutils_namespace():
+            app = Sphinx(
+                srcdir=str(docs_dir),
+                confdir=str(docs_dir),
+                outdir=str(root / "_build" / "html"),
+                doctreedir=str(root / "_build" / "doctrees"),
+                buildername="html",
+                status=None,
+                warning=None,
+                freshenv=True
+            )
+            start = time.perf_counter()
+            app.build()
+            build_time = time.perf_counter() - start
+
+            parser = get_conf_val(app, 'READMEParser')
+            runs = []
+
+            for _ in range(repeat):
+                stats = {}
+                install_timers(parser, PARSER_PHASES, stats)
+                install_timers(parser.doctrees, ["get"], stats)
+
+                parser.parse_env(app.env)
+                parser.parse_sources(app)
+
+                for src in parser.sources:
+                    parser.get_fingerprint(src)
+                    parser.resolve_source(src)
+
+                runs.append(stats)
+                vars(parser.doctrees).pop("get")
+
+                for name in PARSER_PHASES:
+                    delattr(parser, name)
+
+            project = {
+                'py_refs': len(parser.py_refs),
+                'documents': len(app.env.all_docs),
+                'ref_map': sum(len(refs) for refs in parser.ref_map.values()),
+                'source_bytes': sum(len(rst.encode('utf-8')) for rst in parser.sources.values()),
+            }
+    finally:
+        os.chdir(cwd)
+
+    phases = {}
+
+    for name in [*PARSER_PHASES, "get"]:
+        times = [stats[name][0] for stats in runs]
+        phases["doctrees.get" if name == "get" else name] = {
+            'calls': runs[0][name][1],
+            'min': min(times),
+            'median': statistics.median(times),
+            'max': max(times),
+        }
+
+    return {
+        'sphinx_readme': __version__,
+        'sphinx': sphinx.__display_version__,
+        'python': platform.python_version(),
+        'options': {**options, 'repeat': repeat},
+        'project': project,
+        'generate': generate_time,
+        'sphinx_build': build_time,
+        'phases': phases,
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float = 1.25, min_time: float = 0.001) -> List[str]:
+    """Compares the median time of each phase with the results of a previous benchmark
+
+    :param results: the current results
+    :param baseline: the results to compare against
+    :param threshold: the ratio of the current and previous time which is considered a regression
+    :param min_time: phases that take less time than this, in seconds, are ignored
+    :return: a description of each phase that regressed
+    """
+    regressions = []
+
+    for name, phase in results['phases'].items():
+        if not (previous := baseline.get('phases', {}).get(name)):
+            continue
+
+        if max(phase['median'], previous['median']) < min_time:
+            continue
+
+        if (ratio := phase['median'] / max(previous['median'], 1e-9)) > threshold:
+            regressions.append(f"{name}: {previous['median'] * 1000:.2f}ms -> {phase['median'] * 1000:.2f}ms ({ratio:.2f}x)")
+
+    return regressions
+
+
+def format_results(results: Dict) -> str:
+    """Formats the median time and number of calls of each phase as a table"""
+    rows = [f"{'phase':<28}{'calls':>8}{'median (ms)':>14}"]
+    rows += [
+        f"{name:<28}{phase['calls']:>8}{phase['median'] * 1000:>14.2f}"
+        for name, phase in results['phases'].items()
+    ]
+    rows.append(f"{'sphinx_build':<28}{1:>8}{results['sphinx_build'] * 1000:>14.2f}")
+    return "\n".join(rows)
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """Returns the argument parser for the command line interface"""
+    parser = argparse.ArgumentParser(description="Benchmark each phase of the READMEParser on a synthetic project")
+    parser.add_argument("--objects", type=int, default=1000, help="number of Python objects (default: 1000)")
+    parser.add_argument("--docs", dest="documents", type=int, default=50, help="number of documents (default: 50)")
+    parser.add_argument("--xrefs", type=int, default=500, help="number of cross-references in the README (default: 500)")
+    parser.add_argument("--depth", type=int, default=4, help="maximum toctree depth (default: 4)")
+    parser.add_argument("--admonitions", type=int, default=20, help="number of admonitions in the README (default: 20)")
+    parser.add_argument("--admonition-lines", type=int, default=20, help="lines in each admonition (default: 20)")
+    parser.add_argument("--includes", type=int, default=10, help="number of included files (default: 10)")
+    parser.add_argument("--docs-url-type", choices=["html", "code"], default="html", help="value of readme_docs_url_type (default: html)")
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs of each phase (default: 5)")
+    parser.add_argument("-o", "--output", help="file to write the JSON results to (default: stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON results of a previous benchmark to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio that counts as a regression (default: 1.25)")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Runs the benchmark from the command line
+
+    :param argv: the command line arguments (default: :data:`sys.argv`)
+    :return: the exit code
+    """
+    args = vars(get_parser().parse_args(argv))
+    output, baseline, threshold = args.pop("output"), args.pop("compare"), args.pop("threshold")
+
+    # Generate the project inside the repository, so links to images can be resolved
+    with tempfile.TemporaryDirectory(dir=BENCHMARKS_DIR) as root:
+        results = run_benchmark(Path(root), **args)
+
+    print(format_results(results), file=sys.stderr)
+    data = json.dumps(results, indent=2)
+
+    if output:
+        Path(output).write_text(data + "\n", encoding="utf-8")
+    else:
+        print(data)
+
+    if baseline:
+        baseline = json.loads(Path(baseline).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, threshold)
+
+        if baseline.get('options') != results['options']:
+            print("Warning: the baseline was run with different options", file=sys.stderr)
+
+        for regression in regressions:
+            print(f"Regression in {regression}", file=sys.stderr)
+
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
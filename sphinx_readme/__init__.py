@@ -3,11 +3,10 @@ import sphinx
 
 from pathlib import Path
 from typing import Dict, Any
-from docutils.nodes import document
 from sphinx.application import Sphinx
 from sphinx.environment import BuildEnvironment
 
-from sphinx_readme.utils.sphinx import get_conf_val, set_conf_val
+from sphinx_readme.utils.sphinx import get_conf_val, set_conf_val, TitleCollector
 from sphinx_readme.utils.git import get_repo_dir
 from sphinx_readme.parser import READMEParser
 
@@ -20,9 +19,10 @@ def setup(app: Sphinx) -> Dict[str, Any]:
     if os.environ.get("READTHEDOCS") == "True":
         return {}
 
+    app.add_env_collector(TitleCollector)
     app.connect("builder-inited", add_readme_parser)
-    app.connect('env-check-consistency', parse_env)
-    app.connect('doctree-resolved', parse_doctree)
+    app.connect('env-updated', parse_env)
+    app.connect('env-updated', parse_sources)
     app.connect('build-finished', resolve)
 
     app.add_config_value("readme_src_files", [], True, types=[list, str])
@@ -37,8 +37,18 @@ def setup(app: Sphinx) -> Dict[str, Any]:
     app.add_config_value("readme_default_admonition_icon", "📄", True, types=str)
     app.add_config_value("readme_tags", ["readme"], True, types=list)
     app.add_config_value("readme_blob", 'head', True, types=str)
+    app.add_config_value("readme_parallel", False, '', types=[bool, int])
+    app.add_config_value("readme_linkcode_static", False, True, types=bool)
+    app.add_config_value("readme_index", False, '', types=bool)
+    app.add_config_value("readme_profile", None, '', types=[bool, str])
+    app.add_config_value("readme_memory_report", False, '', types=bool)
 
-    return {'version': sphinx.__display_version__, 'parallel_read_safe': True}
+    return {
+        'version': sphinx.__display_version__,
+        'env_version': 1,
+        'parallel_read_safe': True,
+        'parallel_write_safe': True
+    }
 
 
 def add_readme_parser(app: Sphinx):
@@ -50,9 +60,9 @@ def parse_env(app: Sphinx, env: BuildEnvironment):
     parser.parse_env(env)
 
 
-def parse_doctree(app: Sphinx, doctree: document, docname: str):
+def parse_sources(app: Sphinx, env: BuildEnvironment):
     parser = get_conf_val(app, 'READMEParser')
-    parser.parse_doctree(app, doctree, docname)
+    parser.parse_sources(app)
 
 
 def resolve(app: Sphinx, exception):
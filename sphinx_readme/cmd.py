@@ -0,0 +1,261 @@
+"""Regenerates README files using the environment from a previous Sphinx build
+
+Instead of running ``sphinx-build``, the pickled environment is loaded, and only the
+:confval:`readme_src_files` which changed since the previous build are reread.
+No other documents are read or written, making it fast enough for pre-commit hooks
+
+**Usage:**
+
+.. code-block:: shell
+
+   python -m sphinx_readme SOURCEDIR OUTPUTDIR [-c CONFDIR] [-d DOCTREEDIR] [-D setting=value] [-q] [-w]
+
+The arguments are the same as the ones used with ``sphinx-build`` for the previous build.
+With ``-w``, the process keeps running and regenerates the README files whenever
+the source files, or any files they include, are changed (see :func:`watch_readme`)
+
+.. caution:: Changes to any other documents aren't picked up until the next full build
+"""
+import os
+import sys
+import time
+import argparse
+
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+from sphinx.application import Sphinx, ENV_PICKLE_FILENAME
+from sphinx.errors import ExtensionError, SphinxError
+from sphinx.util.docutils import docutils_namespace, patch_docutils
+
+from sphinx_readme.utils.git import clear_repo_cache
+from sphinx_readme.utils.linkcode import find_module_file
+from sphinx_readme.utils.sphinx import get_conf_val, logger
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """Returns the argument parser for the command line interface"""
+    parser = argparse.ArgumentParser(
+        prog="python -m sphinx_readme",
+        description="Regenerate README files using the environment from a previous Sphinx build"
+    )
+    parser.add_argument("sourcedir", help="path to the documentation source files")
+    parser.add_argument("outputdir", help="path to the output directory of the previous build")
+    parser.add_argument("-c", dest="confdir", help="directory containing conf.py (default: SOURCEDIR)")
+    parser.add_argument("-d", dest="doctreedir", help="directory of the pickled environment and doctrees (default: OUTPUTDIR/.doctrees)")
+    parser.add_argument("-b", dest="builder", default="html", help="builder that was used for the previous build (default: html)")
+    parser.add_argument("-D", dest="define", metavar="setting=value", action="append", default=[], help="override a setting in conf.py")
+    parser.add_argument("-q", dest="quiet", action="store_true", help="don't output status messages from Sphinx")
+    parser.add_argument("-w", dest="watch", action="store_true", help="keep running and regenerate README files when source files change")
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between checks for changes in watch mode (default: 0.5)")
+    return parser
+
+
+def build_readme(src_dir: str | Path, out_dir: str | Path, doctree_dir: Optional[str | Path] = None,
+                 conf_dir: Optional[str | Path] = None, builder: str = "html",
+                 confoverrides: Optional[Dict] = None, quiet: bool = False,
+                 watch: bool = False, interval: float = 0.5) -> Sphinx:
+    """Regenerates README files using the pickled environment from a previous Sphinx build
+
+    The :confval:`readme_src_files` that changed since the previous build are reread into the
+    environment, then the :class:`~.READMEParser` parses the environment and resolves the source files,
+    the same as it does after ``env-updated`` and ``build-finished`` events in a full build
+
+    .. note:: The environment isn't saved, so the next full build still rereads the changed source files
+
+    :param src_dir: path to the documentation source files
+    :param out_dir: path to the output directory of the previous build
+    :param doctree_dir: path to the directory of the pickled environment (default: ``out_dir/.doctrees``)
+    :param conf_dir: path to the directory containing ``conf.py`` (default: ``src_dir``)
+    :param builder: the name of the builder that was used for the previous build
+    :param confoverrides: values to override in ``conf.py``
+    :param quiet: boolean indicating if status messages from Sphinx should be suppressed
+    :param watch: boolean indicating if the README files should be regenerated when source files change,
+       until the process is interrupted (see :func:`watch_readme`)
+    :param interval: the number of seconds between checks for changes, if ``watch`` is ``True``
+    :raises ExtensionError: if there's no environment to load, or it doesn't contain the source files
+    :return: the Sphinx application used to regenerate the files
+    """
+    src_dir = Path(src_dir).resolve()
+    out_dir = Path(out_dir).resolve()
+    doctree_dir = Path(doctree_dir).resolve() if doctree_dir else out_dir / ".doctrees"
+    conf_dir = Path(conf_dir).resolve() if conf_dir else src_dir
+
+    if not (doctree_dir / ENV_PICKLE_FILENAME).exists():
+        raise ExtensionError(
+            f"``sphinx_readme``: no pickled environment found in {doctree_dir}; "
+            "run ``sphinx-build`` before regenerating README files"
+        )
+
+    with patch_docutils(conf_dir), docutils_namespace():
+        app = Sphinx(
+            srcdir=str(src_dir),
+            confdir=str(conf_dir),
+            outdir=str(out_dir),
+            doctreedir=str(doctree_dir),
+            buildername=builder,
+            confoverrides=confoverrides or {},
+            status=None if quiet else sys.stdout,
+            freshenv=False
+        )
+        if not app.env.all_docs:
+            raise ExtensionError(
+                f"``sphinx_readme``: unable to load the pickled environment from {doctree_dir}"
+            )
+
+        parser = get_conf_val(app, 'READMEParser')
+        read_readme_sources(app, [app.env.path2doc(src) for src in parser.sources])
+
+        parser.parse_env(app.env)
+        parser.parse_sources(app)
+        parser.resolve()
+
+        if watch:
+            watch_readme(app, interval)
+
+    return app
+
+
+def watch_readme(app: Sphinx, interval: float = 0.5) -> None:
+    """Regenerates README files whenever their source files change, until the process is interrupted
+
+    The Sphinx application, |env| and :class:`~.READMEParser` stay loaded between changes, so only
+    the changed source files are reread, reparsed and resolved by :func:`update_readme`.
+    The files are checked for changes by polling their modification times. If regenerating
+    the files fails, the error is logged and the files keep being watched
+
+    :param app: the Sphinx application
+    :param interval: the number of seconds between checks for changes
+    """
+    mtimes = get_mtimes(app)
+    logger.info(f"``sphinx_readme``: watching {len(mtimes)} files for changes (press Ctrl+C to stop)")
+
+    try:
+        while True:
+            time.sleep(interval)
+
+            if (current := get_mtimes(app)) == mtimes:
+                continue
+
+            mtimes = current
+            start = time.perf_counter()
+
+            try:
+                if sources := update_readme(app):
+                    logger.info(f"``sphinx_readme``: regenerated {len(sources)} file(s) in {time.perf_counter() - start:.2f}s")
+            except Exception as e:  # Keep watching, ex. if a file was only partially saved
+                logger.error(f"``sphinx_readme``: unable to regenerate README files: {type(e).__name__}: {e}")
+
+    except KeyboardInterrupt:
+        pass
+
+
+def update_readme(app: Sphinx) -> List[str]:
+    """Regenerates the README files of any source files that changed since they were last read
+
+    :param app: the Sphinx application
+    :raises ExtensionError: if any of the source files weren't part of the previous build
+    :return: absolute paths of the source files that were regenerated
+    """
+    # Module files and repositories may have been added or changed since the last build
+    find_module_file.cache_clear()
+    clear_repo_cache()
+
+    parser = get_conf_val(app, 'READMEParser')
+    docnames = {app.env.path2doc(src): src for src in parser.sources}
+    sources = [docnames[docname] for docname in read_readme_sources(app, list(docnames))]
+
+    if sources:
+        parser.update_sources(app, sources)
+        parser.resolve(sources)
+
+    return sources
+
+
+def get_mtimes(app: Sphinx) -> Dict[str, Optional[int]]:
+    """Returns the modification times of the :confval:`readme_src_files` and the files they include
+
+    Included files are found using the dependencies that were recorded in the |env|
+    when the source files were read. The times of missing files are ``None``
+
+    :param app: the Sphinx application
+    """
+    parser = get_conf_val(app, 'READMEParser')
+    env = app.env
+    files = set(parser.sources)
+
+    for src in parser.sources:
+        if (docname := env.path2doc(src)) is not None:
+            files.update(os.path.join(env.srcdir, dep) for dep in env.dependencies.get(docname, ()))
+
+    mtimes = {}
+
+    for file in sorted(files):
+        try:
+            mtimes[file] = os.stat(file).st_mtime_ns
+        except OSError:
+            mtimes[file] = None
+
+    return mtimes
+
+
+def read_readme_sources(app: Sphinx, docnames: List[str]) -> List[str]:
+    """Rereads the source files that changed since the previous build into the environment
+
+    :param app: the Sphinx application
+    :param docnames: the docnames of the :confval:`readme_src_files`
+    :raises ExtensionError: if any of the source files weren't part of the previous build
+    :return: the docnames of the source files that were reread
+    """
+    env = app.env
+
+    if missing := [docname for docname in docnames if docname not in env.all_docs]:
+        raise ExtensionError(
+            f"``sphinx_readme``: {', '.join(map(str, missing))} not found in the environment; "
+            "run ``sphinx-build`` to add new source files"
+        )
+
+    _, changed, _ = env.get_outdated_files(config_changed=False)
+    outdated = sorted(set(docnames) & changed)
+
+    for docname in outdated:
+        app.events.emit('env-purge-doc', env, docname)
+        env.clear_doc(docname)
+        app.builder.read_doc(docname)
+
+        # Drop the doctree from the previous read, which the env caches in memory
+        getattr(env, '_pickled_doctree_cache', {}).pop(docname, None)
+        getattr(env, '_write_doc_doctree_cache', {}).pop(docname, None)
+
+    return outdated
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Runs the command line interface
+
+    :param argv: the command line arguments (default: :data:`sys.argv`)
+    :return: the exit code
+    """
+    args = get_parser().parse_args(argv)
+    confoverrides = {}
+
+    for define in args.define:
+        key, _, value = define.partition("=")
+        confoverrides[key] = value
+
+    try:
+        build_readme(
+            src_dir=args.sourcedir,
+            out_dir=args.outputdir,
+            doctree_dir=args.doctreedir,
+            conf_dir=args.confdir,
+            builder=args.builder,
+            confoverrides=confoverrides,
+            quiet=args.quiet,
+            watch=args.watch,
+            interval=args.interval
+        )
+    except SphinxError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    return 0
@@ -1,15 +1,16 @@
-import re
+import os
 from pathlib import Path
 from functools import cached_property
-from typing import Union, List, Dict, Iterable
+from typing import Union, List, Dict, Iterable, Optional, Tuple, Callable
 
 from sphinx.util.tags import Tags
 from sphinx.application import Sphinx
 from sphinx.errors import ExtensionError
 
 from sphinx_readme.utils.git import get_repo_url, get_blob_url, get_repo_host, get_repo_dir
-from sphinx_readme.utils.rst import replace_only_directives, remove_raw_directives
-from sphinx_readme.utils.linkcode import get_linkcode_url, get_linkcode_resolve
+from sphinx_readme.utils.cache import LRUCache
+from sphinx_readme.utils.rst import compile_regex, get_only_transforms, transform_directives, DirectiveBlock
+from sphinx_readme.utils.linkcode import get_linkcode_url, get_linkcode_resolve, get_static_linkcode_resolve
 from sphinx_readme.utils.sphinx import get_conf_val, set_conf_val, logger
 
 
@@ -18,6 +19,8 @@ class READMEConfig:
     def __init__(self, app: Sphinx):
         self.logger = logger
         self.src_dir = Path(app.srcdir)
+        self.build_dir = Path(app.outdir)
+        self.doctree_dir = Path(app.doctreedir)
         self.repo_dir = get_repo_dir()
         self.out_dir = get_conf_val(app, 'readme_out_dir')
         self.src_files = get_conf_val(app, 'readme_src_files')
@@ -34,6 +37,14 @@ class READMEConfig:
         self.admonition_icons = get_conf_val(app, 'readme_admonition_icons')
         self.include_directive = get_conf_val(app, 'readme_include_directive')
         self.default_admonition_icon = get_conf_val(app, 'readme_default_admonition_icon')
+        self.parallel = get_conf_val(app, 'readme_parallel')
+        self.linkcode_static = get_conf_val(app, 'readme_linkcode_static')
+        self.index = get_conf_val(app, 'readme_index')
+        self.profile = get_conf_val(app, 'readme_profile')
+        self.profile = {'0': False, '1': True}.get(self.profile, self.profile)  # From the command line
+        self.memory_report = get_conf_val(app, 'readme_memory_report')
+        #: Cache of the content of source and included files, with their mtimes
+        self.file_cache: Dict[Path, Tuple[int, str]] = LRUCache(maxsize=256)
 
         #: The git blob to use when linking to the project's repository
         self.repo_blob: str = get_conf_val(app, "readme_blob")
@@ -44,6 +55,8 @@ class READMEConfig:
             repo_url=self.repo_url,
             blob=self.repo_blob
         )
+        #: Identifies the default ``linkcode_resolve()`` function, if used (links are only cached for these)
+        self.linkcode_resolver: Optional[str] = None
         #: The URL to use when resolving :mod:`~.sphinx.ext.autodoc` cross-references
         self.docs_url: str = self.get_docs_url()
 
@@ -96,7 +109,13 @@ class READMEConfig:
             )
             # Get the template for linking to source code
             linkcode_url = get_linkcode_url(self.blob_url)
-            linkcode_func = get_linkcode_resolve(linkcode_url)
+
+            if self.linkcode_static:
+                self.linkcode_resolver = "static"
+                linkcode_func = get_static_linkcode_resolve(linkcode_url)
+            else:
+                self.linkcode_resolver = "default"
+                linkcode_func = get_linkcode_resolve(linkcode_url)
 
         set_conf_val(app, 'linkcode_resolve', linkcode_func)
 
@@ -105,13 +124,13 @@ class READMEConfig:
 
         .. tip::
 
-           Files are parsed as follows:
+           Directives are replaced in a single pass by :func:`~.transform_directives`:
 
            1. If ``replace_only`` is ``True``, only directives are replaced via
               :func:`~.replace_only_directives`
 
            2. If :confval:`readme_include_directive` is ``True``, include directives are
-              replaced with the content of the included file;
+              replaced with the content of the included file (at the same indentation);
               otherwise, the directives will be removed
 
            3. If :confval:`readme_raw_directive` is ``False``, raw directives are removed
@@ -119,58 +138,107 @@ class READMEConfig:
         :param rst_file: the ``rst`` file to read
         :param replace_only: specifies if :rst:dir:`only` directives should be replaced or not
         """
-        with open(rst_file, 'r', encoding='utf-8') as f:
-            rst = f.read()
+        return self.parse_rst(self.read_file(rst_file), rst_file, replace_only, is_included)
+
+    def parse_rst(
+            self,
+            rst: str,
+            rst_file: Union[str, Path],
+            replace_only: bool = True,
+            is_included: bool = False,
+            include_chain: Tuple[Path, ...] = ()
+    ) -> str:
+        """Partially parses the content of an ``rst`` file, as described in :meth:`read_rst`
+
+        :param rst: the content of the file
+        :param rst_file: the path of the file
+        :param replace_only: specifies if :rst:dir:`only` directives should be replaced or not
+        :param is_included: specifies if the content is from an included file
+        :param include_chain: the files that included this file, used to detect include cycles
+        """
+        include_chain = (*include_chain, Path(rst_file).resolve())
+        transforms = self.get_include_transforms(rst_file, replace_only, include_chain)
 
         if replace_only:
-            rst = replace_only_directives(rst, self.tags)
-
-        rst = self.parse_include_directives(rst, rst_file, replace_only)
+            get_only_transforms(self.tags, transforms)
 
         if self.raw_directive is False:
-            rst = remove_raw_directives(rst)
+            transforms['raw'] = lambda block: ''  # Remove the directive
+
+        # Replace all directives in a single pass
+        rst = transform_directives(rst, transforms)
 
         if not is_included:
             rst = f"{self.rst_prolog}\n{rst}\n{self.rst_epilog}"
 
         return rst
 
-    def parse_include_directives(self, rst: str, rst_file: Union[str, Path], replace_only: bool = True):
-        return re.sub(
-            pattern=r"\.\. include::\s+([./]*?[\w/-]+\.\w+)\s*?((?:^[ ]+:\S+:.*?$)*?)(?=\n*\S+|\Z)",
-            repl=lambda m: self._parse_include(m, rst_file, replace_only),
-            string=rst, flags=re.M | re.DOTALL
-        )
+    def read_file(self, file: Union[str, Path]) -> str:
+        """Returns the content of a file, which is cached until the file is modified
 
-    def _parse_include(self, match: re.Match, rst_file: Union[str, Path], replace_only: bool):
-        if self.include_directive is False:
-            return ''
+        :param file: the file to read
+        """
+        path = Path(file).resolve()
+        mtime = os.stat(path).st_mtime_ns
+
+        if (cached := self.file_cache.get(path)) and cached[0] == mtime:
+            return cached[1]
 
-        file, args = match.groups()
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
 
-        if start := re.match(r".*:start-line:\s+(\d+).*", args, re.DOTALL):
-            start = int(start.group(1))
+        self.file_cache[path] = (mtime, content)
+        return content
 
-        if end := re.match(r".*:end-line:\s+(\d+).*", args, re.DOTALL):
-            end = int(end.group(1))
+    def get_include_transforms(
+            self,
+            rst_file: Union[str, Path],
+            replace_only: bool = True,
+            include_chain: Tuple[Path, ...] = ()
+    ) -> Dict[str, Callable]:
+        """Returns the mapping of directive transforms for :func:`~.transform_directives` to parse include directives"""
+        return {'include': lambda block: self._parse_include(block, rst_file, replace_only, include_chain)}
+
+    def _parse_include(self, block: DirectiveBlock, rst_file: Union[str, Path], replace_only: bool, include_chain: Tuple[Path, ...] = ()):
+        file = block.argument
+
+        if not compile_regex(r"[./]*?[\w/-]+\.\w+").fullmatch(file):
+            return None  # Leave standard data files (ex. <isonum.txt>) as is
+
+        if self.include_directive is False:
+            return ''
+
+        start, end = (
+            int(value) if (value := block.options.get(option, '')).isdigit() else None
+            for option in ('start-line', 'end-line')
+        )
 
         # Determine abs path of included file
         if file.startswith("/"):
             # These paths are relative to source dir
             file = Path(f"{self.src_dir}{file}").resolve()
         else:
-            # These paths are relative to rst_file dir
-            file = (Path(rst_file).parent / Path(file)).resolve()
+            # These paths are relative to the dir of the document, even in included files (as in Sphinx)
+            document = include_chain[0] if include_chain else rst_file
+            file = (Path(document).parent / Path(file)).resolve()
 
-        if file.exists():
-            # Write corresponding lines of unparsed file to a temp file
-            lines = file.read_text(encoding='utf-8').split('\n')[start:end]
-            temp = Path(self.src_dir / (Path(rst_file).stem + "_temp.rst"))
-            temp.write_text('\n'.join(lines), "utf-8")
+        if file in include_chain:
+            repl = ''  # Remove the directive
+            self.logger.error(
+                f"``sphinx_readme``: include cycle detected: "
+                f"{' -> '.join(str(path) for path in (*include_chain, file))}"
+            )
 
-            # Replace directive with parsed file content
-            repl = self.read_rst(temp, replace_only, is_included=True).replace(r'\n', r'\\n')
-            temp.unlink()
+        elif file.exists():
+            # Parse the corresponding lines of the included file
+            lines = self.read_file(file).split('\n')[start:end]
+            repl = self.parse_rst(
+                '\n'.join(lines), file, replace_only,
+                is_included=True,
+                include_chain=include_chain
+            )
+            # Replace directive with parsed file content, at the same indentation
+            repl = '\n'.join(block.indent + line if line else line for line in repl.split('\n'))
 
         else:
             repl = ''  # Remove the directive
@@ -313,7 +381,7 @@ class READMEConfig:
 
     @property
     def admonition_template(self) -> str:
-        """The template to use when replacing admonitions with :meth:`~.replace_admonitions`"""
+        """The template to use when replacing admonitions with :meth:`~.replace_directives`"""
         if self.raw_directive is True:
             return r'''
 .. raw:: html
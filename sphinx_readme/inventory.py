@@ -0,0 +1,268 @@
+import os
+import json
+import uuid
+import sqlite3
+from pathlib import Path
+from contextlib import closing
+from functools import cached_property
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+from sphinx_readme.utils.xref_index import format_xref
+
+
+#: The schema of the README index
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID;
+CREATE TABLE prefixes (id INTEGER PRIMARY KEY, url TEXT NOT NULL UNIQUE);
+CREATE TABLE xrefs (
+    id INTEGER PRIMARY KEY,
+    domain TEXT NOT NULL,
+    role TEXT NOT NULL,
+    name TEXT NOT NULL,
+    reversed_name TEXT NOT NULL,
+    label TEXT,
+    is_callable INTEGER NOT NULL,
+    prefix INTEGER NOT NULL REFERENCES prefixes (id),
+    suffix TEXT NOT NULL
+);
+CREATE INDEX xrefs_by_name ON xrefs (domain, role, reversed_name);
+CREATE TABLE titles (name TEXT PRIMARY KEY, title TEXT NOT NULL) WITHOUT ROWID;
+CREATE TABLE sources (path TEXT PRIMARY KEY, data TEXT NOT NULL) WITHOUT ROWID;
+"""
+
+
+def reverse_name(name: str) -> str:
+    """Reverses the components of a dotted name
+
+    **Example:**
+
+    >>> reverse_name("pkg.module.Class.meth")
+    'meth.Class.module.pkg'
+
+    :param name: the name to reverse
+    """
+    return '.'.join(reversed(name.split('.')))
+
+
+def split_url(url: str) -> Tuple[str, str]:
+    """Splits a URL into the prefix that's shared by other pages in the same directory, and the rest
+
+    **Example:**
+
+    >>> split_url("https://pkg.readthedocs.io/en/latest/module.html#pkg.module.Class")
+    ('https://pkg.readthedocs.io/en/latest/', 'module.html#pkg.module.Class')
+
+    :param url: the URL to split
+    """
+    i = url.split('#', maxsplit=1)[0].rfind('/') + 1
+    return url[:i], url[i:]
+
+
+def write_index(
+        path: Union[str, Path],
+        meta: Dict[str, Any],
+        py_refs: Iterable[Tuple[str, str, bool]],
+        std_refs: Dict[str, Dict[str, Dict[str, str]]],
+        titles: Dict[str, str],
+        sources: Dict[str, Dict[str, Any]]
+) -> None:
+    """Atomically writes a README index, which can be read by the :class:`READMEIndex`
+
+    The index is an SQLite database. URL prefixes are stored once and referenced by each
+    cross-reference, and names are also stored in reverse, so that any partially qualified
+    name of an object can be looked up with the ``xrefs_by_name`` index
+
+    :param path: the file to write to
+    :param meta: information about the project; values must be JSON serializable
+    :param py_refs: the ``(qualified_name, target, is_callable)`` entries of |py_domain| objects, in order of precedence
+    :param std_refs: mapping of |std_domain| and |rst_domain| roles to their targets and replacement info
+    :param titles: mapping of docnames and labels to their titles
+    :param sources: mapping of source files, relative to the source directory, to their parsed directive data
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    prefixes = {}
+
+    def intern(url: str) -> Tuple[int, str]:
+        prefix, suffix = split_url(url)
+        return prefixes.setdefault(prefix, len(prefixes) + 1), suffix
+
+    rows = [
+        ("py", "", name, reverse_name(name), None, int(is_callable), *intern(target))
+        for name, target, is_callable in py_refs
+    ]
+    for role, refs in std_refs.items():
+        rows.extend(
+            ("std", role, ref_id, reverse_name(ref_id), str(info['replace']), 0, *intern(info['target']))
+            for ref_id, info in refs.items()
+        )
+    meta = {**meta, 'version': READMEIndex.version}
+
+    try:
+        with closing(sqlite3.connect(temp)) as connection:
+            connection.executescript(SCHEMA)
+            connection.executemany("INSERT INTO meta VALUES (?, ?)", (
+                (key, json.dumps(value)) for key, value in meta.items()))
+            connection.executemany("INSERT INTO prefixes VALUES (?, ?)", (
+                (prefix_id, prefix) for prefix, prefix_id in prefixes.items()))
+            connection.executemany(
+                "INSERT INTO xrefs (domain, role, name, reversed_name, label, is_callable, prefix, suffix) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            connection.executemany("INSERT INTO titles VALUES (?, ?)", (
+                (name, str(title)) for name, title in titles.items()))
+            connection.executemany("INSERT INTO sources VALUES (?, ?)", (
+                (src, json.dumps(data, sort_keys=True, default=str)) for src, data in sources.items()))
+            connection.commit()
+
+        os.replace(temp, path)
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+
+
+class READMEIndex:
+
+    """Read-only access to a README index written by :func:`write_index`
+
+    The parsed cross-reference, title and directive data from a build can be used without Sphinx,
+    and by other projects to resolve cross-references to the project, like an intersphinx inventory.
+    The database is opened on first use, and each lookup only reads the pages it needs, so
+    even a large index is loaded instantly
+
+    **Example:**
+
+    .. code-block:: python
+
+       from sphinx_readme.inventory import READMEIndex
+
+       with READMEIndex("docs/_build/html/readme_index.db") as index:
+           index.get("~.READMEParser.resolve")
+           # {'replace': '``resolve()``', 'target': 'https://github.com/...'}
+
+    :param path: the path of the index file
+    """
+
+    #: The version of the index format
+    version: int = 1
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """The read-only connection to the index, which is opened on first use
+
+        :raises ValueError: if the index was written with a different version of the format
+        """
+        if self._connection is None:
+            connection = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True)
+            row = connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+
+            if row is None or json.loads(row[0]) != self.version:
+                connection.close()
+                raise ValueError(f"``sphinx_readme``: unsupported README index version in {self.path}")
+
+            self._connection = connection
+        return self._connection
+
+    @cached_property
+    def meta(self) -> Dict[str, Any]:
+        """Information about the project that the index was written for"""
+        return {
+            key: json.loads(value)
+            for key, value in self.connection.execute("SELECT key, value FROM meta")
+        }
+
+    def lookup(self, ref_id: str) -> Optional[Tuple[str, str, bool]]:
+        """Returns the ``(qualified_name, target, is_callable)`` entry for a |py_domain| cross-reference target
+
+        Like the :class:`~.XrefIndex`, if more than one object matches a partially qualified
+        name, the one that was added to the index first is used
+
+        :param ref_id: the target of the cross-reference, for example ``"~.Class.meth"``
+        """
+        name = ref_id.removeprefix("~").removeprefix(".")
+
+        if not name:
+            return None
+
+        reversed_name = reverse_name(name)
+        row = self.connection.execute(
+            "SELECT name, url || suffix, is_callable FROM xrefs JOIN prefixes ON prefixes.id = xrefs.prefix "
+            "WHERE domain = 'py' AND role = '' AND reversed_name >= :name AND reversed_name < :end "
+            "AND (length(reversed_name) = :length OR substr(reversed_name, :length + 1, 1) = '.') "
+            "ORDER BY xrefs.id LIMIT 1",
+            # Every name ending with the suffix sorts between "{reversed_name}" and "{reversed_name}/"
+            {'name': reversed_name, 'end': f"{reversed_name}/", 'length': len(reversed_name)}
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        qualified_name, target, is_callable = row
+        return qualified_name, target, bool(is_callable)
+
+    def get(self, ref_id: str) -> Optional[Dict[str, str]]:
+        """Resolves the target of a |py_domain| cross-reference
+
+        :param ref_id: the target of the cross-reference, for example ``"~.Class.meth"``
+        :return: a dict containing the replacement text and the target URL, or ``None`` if not found
+        """
+        if not (entry := self.lookup(ref_id)):
+            return None
+
+        return format_xref(entry, ref_id, self.meta.get('inline_markup', True))
+
+    def get_ref(self, role: str, ref_id: str) -> Optional[Dict[str, str]]:
+        """Resolves the target of a |std_domain| or |rst_domain| cross-reference
+
+        :param role: the cross-reference role, for example ``"ref"`` or ``"doc"``
+        :param ref_id: the target of the cross-reference, as it's stored in the :attr:`~.ref_map`
+        :return: a dict containing the replacement text and the target URL, or ``None`` if not found
+        """
+        row = self.connection.execute(
+            "SELECT label, url || suffix FROM xrefs JOIN prefixes ON prefixes.id = xrefs.prefix "
+            "WHERE domain = 'std' AND role = ? AND reversed_name = ? AND name = ?",
+            (role, reverse_name(ref_id), ref_id)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            'replace': row[0],
+            'target': row[1]
+        }
+
+    def get_title(self, name: str) -> Optional[str]:
+        """Returns the title of a document or label
+
+        :param name: the docname or label
+        """
+        row = self.connection.execute("SELECT title FROM titles WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def get_source(self, path: str) -> Optional[Dict[str, Any]]:
+        """Returns the parsed toctree, admonition and rubric data of a source file
+
+        :param path: the path of the source file, relative to the source directory
+        """
+        row = self.connection.execute("SELECT data FROM sources WHERE path = ?", (path,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def close(self) -> None:
+        """Closes the connection to the index, if it's open"""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self) -> "READMEIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM xrefs").fetchone()[0]
@@ -1,8 +1,11 @@
 import re
+import copy
+import json
 from pathlib import Path
 from collections import defaultdict
-from functools import cached_property
-from typing import Dict, List, Set, Union, Callable, Optional, Tuple, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property, partial
+from typing import Dict, List, Set, Union, Callable, Optional, Tuple, Iterable, Iterator
 
 from docutils import nodes
 from sphinx import addnodes
@@ -10,9 +13,15 @@ from sphinx.domains.python import ObjectEntry
 from sphinx.application import Sphinx, BuildEnvironment
 
 from sphinx_readme.config import READMEConfig
-from sphinx_readme.utils.docutils import get_doctree, parse_node_text
-from sphinx_readme.utils.sphinx import get_conf_val, ExternalRef
-from sphinx_readme.utils.rst import get_all_xref_variants, escape_rst, format_rst, replace_xrefs, format_hyperlink, BEFORE_XREF, AFTER_XREF
+from sphinx_readme.inventory import write_index
+from sphinx_readme.utils.docutils import DoctreeCache, parse_node_text
+from sphinx_readme.utils.sphinx import get_conf_val, get_env_titles, get_resolved_doctree, ExternalRef, InventoryIndex
+from sphinx_readme.utils.cache import BuildManifest, LRUCache, get_digest, write_file
+from sphinx_readme.utils.linkcode import LinkcodeCache
+from sphinx_readme.utils.memory import MemoryReport, traced
+from sphinx_readme.utils.profile import Profiler, profiled
+from sphinx_readme.utils.xref_index import XrefIndex
+from sphinx_readme.utils.rst import format_rst, replace_xrefs, format_hyperlink, compile_regex, compile_xref_regex, find_directive_spans, DirectiveBlock, XREF_TARGET
 
 
 class READMEParser:
@@ -21,8 +30,10 @@ class READMEParser:
         #: The :class:`~.READMEConfig` for the parser
         self.config: READMEConfig = READMEConfig(app)
         self.logger = self.config.logger
-        #: Mapping of info for standard and :mod:`sphinx.ext.autodoc` cross-references
-        self.ref_map: Dict[str, Union[List, Dict]] = {}
+        #: Mapping of roles to info for |std_domain| and |rst_domain| cross-references
+        self.ref_map: Dict[str, Dict[str, Dict]] = {}
+        #: Suffix index of info for :mod:`sphinx.ext.autodoc` cross-references
+        self.py_refs: XrefIndex = XrefIndex(self.config.inline_markup)
         #: Mapping of source files to their content
         self.sources: Dict[str, str] = self.config.sources
         #: Mapping of source files to their toctree data
@@ -30,9 +41,13 @@ class READMEParser:
         #: Mapping of source files to their admonition data
         self.admonitions: Dict[str, List[Dict]] = {}
         #: Mapping of source files to their rubric data
-        self.rubrics: Dict[str, List[str]] = {}
+        self.rubrics: Dict[str, List[Dict]] = {}
         #: Mapping of source files to cross-reference substitution definitions
         self.substitutions: Dict[str, Dict[str, List[str]]] = defaultdict(dict)
+        #: Mapping of source files to their pre-resolved cross-references (used by worker processes)
+        self.xref_tables: Dict[str, Dict[str, Optional[Tuple]]] = {}
+        #: Cache of doctrees generated from the content of source files
+        self.doctrees: DoctreeCache = DoctreeCache()
         #: Mapping of docnames to their parsed titles
         self.titles: Dict[str, str] = {}
         #: Tuple of currently supported Sphinx domains
@@ -47,40 +62,74 @@ class READMEParser:
         self.inventory: Dict[str, Dict] = {}
         #: Easy access to intersphinx named inventory
         self.named_inventory: Dict[str, Dict] = {}
-
+        #: Reverse index of the intersphinx inventories
+        self.inventory_index: InventoryIndex = InventoryIndex({}, {}, {})
+        #: Cache of external cross-reference lookups from the current build
+        self.external_xrefs: Dict[Tuple, Optional[ExternalRef]] = LRUCache(maxsize=4096)
+        #: Cache of the repository links to images in the source files
+        self.image_urls: Dict[str, str] = LRUCache(maxsize=1024)
+        #: Targets of the |py_domain| and |std_domain| cross-references in the source files
+        self.references: Dict[str, Set] = {"py": set(), "std": set()}
+        #: Cross-reference data of the project's own objects, for the :confval:`readme_index`
+        self.index_refs: Dict[str, Union[List, Dict]] = {}
+        #: Records the time and counters of each phase, if :confval:`readme_profile` is enabled
+        self.profiler: Profiler = Profiler(enabled=bool(self.config.profile))
+        #: Takes memory snapshots around each phase, if :confval:`readme_memory_report` is enabled
+        self.memory_report: MemoryReport = MemoryReport(enabled=self.config.memory_report)
+
+    @traced
+    @profiled
     def parse_env(self, env: BuildEnvironment) -> None:
-        """Parses domain data and document titles from the |env|"""
+        """Parses domain data and document titles from the |env|
+
+        Only objects that are referenced by the source files are added to the
+        :attr:`ref_map` and :attr:`py_refs` (see :meth:`parse_references`),
+        unless the :confval:`readme_index` is enabled
+        """
+        self.ref_map = {}
+        self.py_refs = XrefIndex(self.config.inline_markup)
         self.parse_titles(env)
         self.parse_roles(env)
         self.parse_objtypes(env)
+        self.parse_references()
         self.parse_py_domain(env)
         self.parse_std_domain(env)
 
+        if self.config.index:
+            # Intersphinx references are added to the ref_map and py_refs later
+            self.index_refs = {
+                'py': list(self.py_refs),
+                'std': {role: dict(refs) for role, refs in self.ref_map.items()}
+            }
+
         # Add access to data from intersphinx, if applicable
-        self.inventory = getattr(env, 'intersphinx_inventory', {})
-        self.named_inventory = getattr(env, 'intersphinx_named_inventory', {})
-        self.intersphinx_pkgs = list(getattr(env, 'intersphinx_named_inventory', {}))
+        inventory = getattr(env, 'intersphinx_inventory', {})
 
+        if inventory is not self.inventory:
+            # Keep the lookups from the reverse index if the inventory hasn't changed
+            self.inventory = inventory
+            self.named_inventory = getattr(env, 'intersphinx_named_inventory', {})
+            self.intersphinx_pkgs = list(self.named_inventory)
+            self.inventory_index = InventoryIndex(self.inventory, self.named_inventory, self.objtypes)
+
+        self.external_xrefs.clear()
+        self.profiler.set("ref_map", sum(len(refs) for refs in self.ref_map.values()))
+        self.profiler.set("py_refs", len(self.py_refs))
+
+    @profiled
     def parse_titles(self, env: BuildEnvironment) -> None:
-        """Parses document and section titles from the |env|"""
-        for docname in env.found_docs:
-            doctree = env.get_doctree(docname)
-            sections = list(doctree.findall(nodes.section))
-
-            for section in sections:
-                # Parse titles of sections referenced with :ref:
-                if getattr(section, "expect_referenced_by_name", None):
-                    ref_id = list(section.expect_referenced_by_name)[0]
-                    title = section.next_node(nodes.title).rawsource
-                    self.titles[ref_id] = replace_xrefs(title)
+        """Parses document and section titles from the |env|
 
-            try:
-                # Parse title of document for :doc: refs
-                h1 = sections[0].next_node(nodes.title).rawsource
-                self.titles[docname] = replace_xrefs(h1)
+        .. tip:: Titles are collected while documents are read, by the :class:`~.TitleCollector`
+        """
+        for docname, titles in get_env_titles(env).items():
+            # Parse titles of sections referenced with :ref:
+            for ref_id, title in titles['labels'].items():
+                self.titles[ref_id] = replace_xrefs(title)
 
-            except IndexError:
-                continue  # Document without title
+            # Parse title of document for :doc: refs
+            if titles['title'] is not None:
+                self.titles[docname] = replace_xrefs(titles['title'])
 
     def parse_roles(self, env: BuildEnvironment) -> None:
         """Parses the available roles for cross-referencing objects in the
@@ -104,12 +153,54 @@ class READMEParser:
                     for objtype in env.get_domain(domain).objtypes_for_role(role, [])
                 ]
 
+    @profiled
+    def parse_references(self) -> None:
+        """Collects the targets of all |py_domain|, |std_domain| and |rst_domain| cross-references in the source files
+
+        * For the |py_domain|, the ``~`` and ``.`` prefixes are removed from each target, since they
+          can match any object with the same qualified name suffix (see :meth:`is_py_referenced`)
+        * For the |std_domain| and |rst_domain|, each target is normalized to its key in the :attr:`ref_map`
+        """
+        self.references = {"py": set(), "std": set()}
+        patterns = (
+            ("std", self.get_xref_regex(domains=["rst", "std"], xref_type="any")),
+            ("py", self.get_xref_regex("py", xref_type="any"))
+        )
+        for src, rst in self.sources.items():
+            for domain, pattern in patterns:
+                for match in pattern.finditer(rst):
+                    _, external, role, _, ref_id = match.groups()
+
+                    if domain == "py":
+                        self.references["py"].add(ref_id.removeprefix("~").removeprefix("."))
+
+                    elif not self.is_external_xref(external, role, ref_id):
+                        try:
+                            self.references["std"].add((role, self.normalize_ref_id(src, role, ref_id)))
+                        except ValueError:
+                            continue  # Document outside the source directory
+
+    def is_py_referenced(self, qualified_name: str) -> bool:
+        """Checks if any cross-reference in the source files can match a |py_domain| object
+
+        :param qualified_name: the fully qualified name of the object
+        """
+        parts = qualified_name.split(".")
+        return any(".".join(parts[i:]) in self.references["py"] for i in range(len(parts)))
+
+    @profiled
     def parse_std_domain(self, env: BuildEnvironment) -> None:
         """Parses cross-reference data from the |std_domain|
 
         :param env: the |env|
         """
         for ref_id, text, role, docname, anchor, _ in env.get_domain("std").get_objects():
+            if role == "label":
+                role = "ref"
+
+            if not self.config.index and (role, ref_id) not in self.references["std"]:
+                continue
+
             replace = self.titles.get(ref_id) or text
             target = f"{self.config.html_baseurl}/{docname}.html"
 
@@ -119,29 +210,44 @@ class READMEParser:
             if role == "confval" and self.config.inline_markup:
                 replace = f"``{replace}``"
 
-            elif role == "label":
-                role = "ref"
-
             self.ref_map.setdefault(role, {})[ref_id] = {
                 "replace": replace,
                 "target": target
             }
 
+    @profiled
     def parse_py_domain(self, env: BuildEnvironment) -> None:
         """Parses cross-reference data for |py_domain| objects
 
         :param env: the |env|
         """
         py_objects = env.domaindata.get('py', {}).get("objects", {})
-        linkcode_resolve = get_conf_val(env, "linkcode_resolve")
+        linkcode_resolve = self.profiler.wrap(get_conf_val(env, "linkcode_resolve"), "linkcode_resolve")
+        linkcode_cache = None
+
+        if self.config.docs_url_type == "code" and self.config.linkcode_resolver:
+            # Reuse links to source code from previous builds
+            linkcode_cache = LinkcodeCache(
+                path=self.config.doctree_dir / "readme_linkcode.json",
+                blob_url=self.config.blob_url,
+                resolver=self.config.linkcode_resolver,
+                repo_dir=self.config.repo_dir
+            )
+            linkcode_resolve = linkcode_cache.wrap(linkcode_resolve)
 
         for qualname, entry in py_objects.items():
+            if not (self.config.index or self.is_py_referenced(qualname)):
+                continue
+
             if target := self.get_py_target(entry, linkcode_resolve):
                 self.add_variants(
                     qualified_name=qualname,
                     target=target,
                     is_callable=entry.objtype in ("method", "function"))
 
+        if linkcode_cache:
+            linkcode_cache.save()
+
     def get_py_target(self, entry: ObjectEntry, linkcode_resolve: Optional[Callable] = None) -> Optional[str]:
         """Resolves the target for a cross-reference to an object in the |py_domain|
 
@@ -176,48 +282,74 @@ class READMEParser:
         return link
 
     def add_variants(self, qualified_name: str, target: str, is_callable: bool = False) -> None:
-        """Adds substitution information for an object to the :attr:`ref_map`
+        """Adds substitution information for an object to the :attr:`py_refs`
 
         This data is used to replace any :mod:`~sphinx.ext.autodoc` cross-reference to
         the object with a substitution, hyperlinked to the corresponding
         source code or documentation entry
 
-        .. tip:: See :func:`~.get_all_xref_variants` and :meth:`replace_autodoc_refs`
+        .. tip:: Every variant from :func:`~.get_all_xref_variants` is resolved by the
+           :class:`~.XrefIndex`, without being stored individually
 
         :param qualified_name: the fully qualified name of an object (ex. ``"sphinx_readme.parser.add_variants"``)
         :param target: the refuri of the object's corresponding source code or documentation entry
         :param is_callable: specifies if the object is a method or function
         """
-        short_ref = qualified_name.split('.')[-1]
-        variants = get_all_xref_variants(qualified_name)
+        self.py_refs.add(qualified_name, target, is_callable)
+
+    @profiled
+    def parse_sources(self, app: Sphinx) -> None:
+        """Parses the doctree of each source file with :meth:`parse_doctree`
 
-        for variant in variants:
-            if variant in self.ref_map:
+        This runs in the main process once the |env| is updated, so the data is
+        parsed on every build, even if the source files weren't rewritten or
+        were written by parallel processes
+        """
+        self.toctrees.clear()
+
+        for src in self.sources:
+            if (docname := app.env.path2doc(src)) is None:
                 continue
 
-            if variant.startswith("~"):
-                replace = short_ref
-            else:
-                replace = variant.lstrip('.')
+            self.parse_doctree(app, get_resolved_doctree(app, docname), docname)
 
-            if is_callable:
-                replace += "()"
+    def update_sources(self, app: Sphinx, sources: List[str]) -> None:
+        """Rereads and reparses source files that changed after the |env| was parsed
 
-            if self.config.inline_markup:
-                replace = f"``{replace}``"
+        The |env| is reparsed, since the files may reference objects that weren't parsed before,
+        but only the doctrees of the given source files are parsed again by :meth:`parse_doctree`
 
-            self.ref_map[variant] = {
-                'replace': replace,
-                'target': target
-            }
+        .. note:: The source files must already be reread into the |env|
+
+        :param sources: absolute paths of the source files that changed
+        """
+        for src in sources:
+            self.sources[src] = self.config.read_rst(src)
+
+        self.parse_env(app.env)
 
+        for src in sources:
+            self.toctrees.pop(src, None)
+
+            if (docname := app.env.path2doc(src)) is not None:
+                self.parse_doctree(app, get_resolved_doctree(app, docname), docname)
+
+    @traced
     def parse_doctree(self, app: Sphinx, doctree: nodes.document, docname: str) -> None:
-        """Parses cross-reference, admonition, rubric, and toctree data from a resolved doctree"""
-        if doctree.get('source') in self.sources:
-            self.parse_admonitions(app, doctree, docname)
-            self.parse_rubrics(app, doctree, docname)
-            self.parse_toctrees(app, doctree, docname)
-            self.parse_intersphinx_nodes(app, doctree, docname)
+        """Parses cross-reference, admonition, rubric, and toctree data from a resolved doctree
+
+        The content of the source file is reparsed once, then shared by each parsing step
+        """
+        if (src := doctree.get('source')) in self.sources:
+            try:
+                with self.profiler.phase("get_doctree", src):
+                    self.doctrees.get(app, self.sources[src], docname)
+
+                for collector in (self.parse_admonitions, self.parse_rubrics, self.parse_toctrees, self.parse_intersphinx_nodes):
+                    with self.profiler.phase(collector.__name__, src):
+                        collector(app, doctree, docname)
+            finally:
+                self.doctrees.release(self.sources[src], docname)
 
     def parse_admonitions(self, app: Sphinx, doctree: nodes.document, docname: str) -> None:
         """Parses data from generic and specific admonitions
@@ -229,7 +361,9 @@ class READMEParser:
         admonitions = []
 
         # Generate new doctree to account for only directives
-        doctree = get_doctree(app, rst, docname)
+        doctree = self.doctrees.get(app, rst, docname)
+        spans = find_directive_spans(rst)
+        lines = rst.split('\n')
 
         for admonition in list(doctree.findall(nodes.Admonition)):
             info = {
@@ -240,14 +374,16 @@ class READMEParser:
                 info.update({
                     'type': 'generic',
                     'class': admonition.get('classes')[0],
-                    'title': admonition.children[0].rawsource
+                    'title': admonition.children[0].rawsource,
+                    'span': self.get_directive_span(lines, spans, 'admonition', admonition.rawsource)
                 })
             else:
                 # Specific Admonition (for example, .. note::)
                 info.update({
                     'type': 'specific',
                     'class': admonition.tagname,
-                    'title': admonition.tagname.title()
+                    'title': admonition.tagname.title(),
+                    'span': self.get_directive_span(lines, spans, admonition.tagname, admonition.rawsource)
                 })
             admonitions.append(info)
 
@@ -276,7 +412,7 @@ class READMEParser:
                 nodes_to_parse.append(node.children[0])
 
         # Generate new doctree to account for only directives, then add problematic nodes
-        problematic_nodes = get_doctree(app, rst, docname).findall(nodes.problematic)
+        problematic_nodes = self.doctrees.get(app, rst, docname).findall(nodes.problematic)
         nodes_to_parse.extend(problematic_nodes)
 
         # Parse xrefs from nodes
@@ -293,13 +429,8 @@ class READMEParser:
             self.parse_external_node(external, role, ref_id.lstrip('~.'))
 
     def parse_external_node(self, external, role, ref_id) -> None:
-        objtypes = self.objtypes[role]
-
-        for objtype in objtypes:  # Check intersphinx inventory for applicable objtypes
-            if xref := self.get_external_ref(external, objtype, ref_id):
-                break
-
-        if xref is None:
+        # Check intersphinx inventory for applicable objtypes
+        if (xref := self.get_external_xref(external, role, ref_id)) is None:
             return
 
         if xref.objtype.startswith("py"):
@@ -307,11 +438,13 @@ class READMEParser:
             self.add_variants(xref.id, xref.target, is_callable)
 
         else:
+            label = xref.label
+
             if self.config.inline_markup and xref.objtype not in ('std:label', 'std:doc'):
-                xref.label = f"``{xref.label}``"
+                label = f"``{label}``"
 
             self.ref_map.setdefault(role, {}).setdefault(xref.id, {
-                "replace": xref.label,
+                "replace": label,
                 "target": xref.target
             })
 
@@ -323,10 +456,19 @@ class READMEParser:
         :param doctree: the doctree from one of the :attr:`~.src_files`
         """
         source = doctree.get('source')
+        rst = self.sources[source]
         tocs = app.env.tocs
 
+        # Generate new doctree to account for only directives
+        doctree = self.doctrees.get(app, rst, docname)
+        spans = find_directive_spans(rst)
+        lines = rst.split('\n')
+
         for toctree in list(doctree.findall(addnodes.toctree)):
             toc = self._parse_toctree(toctree, docname, tocs)
+            toc['span'] = self.get_directive_span(
+                lines, spans, 'toctree', line=toctree.line, options={'caption': toctree.get('caption')}
+            )
             self.toctrees[source].append(toc)
 
     def _parse_toctree(self, toctree, docname, tocs, is_subtoc=False):
@@ -402,22 +544,92 @@ class READMEParser:
         rubrics = []
 
         # Generate new doctree to account for only directives
-        doctree = get_doctree(app, rst, docname)
+        doctree = self.doctrees.get(app, rst, docname)
+        spans = find_directive_spans(rst)
+        lines = rst.split('\n')
 
         for rubric in doctree.findall(nodes.rubric):
-            rubrics.append(rubric.rawsource)
+            rubrics.append({
+                'text': rubric.rawsource,
+                'span': self.get_directive_span(lines, spans, 'rubric', rubric.rawsource)
+            })
 
         self.rubrics[source] = rubrics
 
-    def get_external_ref(self, external: str, objtype: str, ref_id: str) -> Optional[ExternalRef]:
-        """Retrieves external cross-reference data from the :mod:`sphinx.ext.intersphinx` inventory
+    @staticmethod
+    def get_directive_span(
+            lines: List[str],
+            spans: Dict[str, List[Tuple[int, int]]],
+            name: str,
+            rawsource: Optional[str] = None,
+            line: Optional[int] = None,
+            options: Optional[Dict[str, Optional[str]]] = None
+    ) -> Optional[Tuple[int, int]]:
+        """Returns the line span of the next directive with the given name, then removes it from ``spans``
+
+        Since the reparsed doctree and :func:`~.find_directive_spans` both go through the source in document
+        order, nodes are matched to the first remaining span of their directive. If the ``rawsource`` of the node
+        is given, the span is only matched if the directive has the same content, which skips over nodes that
+        weren't created from a directive in the source file (ex. from docstrings). Nodes without a ``rawsource``,
+        like toctrees, can be matched by their ``line`` and ``options`` instead, which skips over
+        directives that don't create a node (ex. in comments)
+
+        :param lines: the lines of the source file
+        :param spans: the remaining directive spans from :func:`~.find_directive_spans`
+        :param name: the name of the directive
+        :param rawsource: the ``rawsource`` of the node created by the directive
+        :param line: the line number of the node created by the directive, if known
+        :param options: mapping of directive options to their expected values (``None`` if not set)
+        :return: the ``(start, end)`` line indices of the directive, or ``None`` if it wasn't found
+        """
+        text = ' '.join(rawsource.split()) if rawsource is not None else None
+
+        for i, (start, end) in enumerate(spans.get(name, [])):
+            if line is not None and start != line - 1:
+                continue
+
+            if text is not None or options:
+                block = DirectiveBlock(lines[start:end])
+
+                if options and any(block.options.get(option) != value for option, value in options.items()):
+                    continue
+
+            if text is not None:
+                content = ' '.join(' '.join(block.content).split())
+
+                if text not in (content, f"{block.argument} {content}".strip()):
+                    continue
+
+            return spans[name].pop(i)
+
+        return None
+
+    def get_external_xref(self, external: str, role: str, ref_id: str) -> Optional[ExternalRef]:
+        """Retrieves external cross-reference data for a role from the :attr:`inventory_index`
+
+        Lookups are cached in :attr:`external_xrefs` for the rest of the build
 
         :param external: the ``:external:`` or ``:external+pkg:`` portion of the xref, if present
-        :param objtype: the name of the object type being referenced
+        :param role: the cross-reference role
         :param ref_id: the target of the cross-reference
         :return: an :class:`~.ExternalRef` object if the lookup was successful, otherwise ``None``
         """
-        pkg = None  # First, attempt to constrain lookup to specific package
+        key = (external, role, ref_id)
+
+        if key not in self.external_xrefs:
+            pkg, target = self.split_external_id(external, ref_id)
+            self.external_xrefs[key] = self.inventory_index.get(pkg, role, target)
+
+        return self.external_xrefs[key]
+
+    def split_external_id(self, external: str, ref_id: str) -> Tuple[Optional[str], str]:
+        """Splits the package to constrain an external lookup to from the target of a cross-reference
+
+        :param external: the ``:external:`` or ``:external+pkg:`` portion of the xref, if present
+        :param ref_id: the target of the cross-reference
+        :return: the package (or ``None``) and the target without a ``pkg:`` prefix
+        """
+        pkg = None
 
         # Check for :external+pkg:role:`ref_id` syntax
         if external and "+" in external:
@@ -431,20 +643,12 @@ class READMEParser:
             if tokens[0] in self.intersphinx_pkgs:
                 pkg, ref_id = tokens
 
-        if objtype == "std:label":
-            ref_id = nodes.fully_normalize_name(ref_id)
-
-        # Lookup reference in intersphinx named or regular inventory
-        inventory = self.named_inventory.get(pkg, self.inventory)
-
-        if xref := inventory.get(objtype, {}).get(ref_id):
-            return ExternalRef(objtype, *xref, ref_id)
+        return pkg, ref_id
 
     def get_external_id(self, external: str, role: str, ref_id: str) -> Optional[str]:
         """Helper function to get the ``ref_id`` when replacing external xrefs"""
-        for objtype in self.objtypes[role]:
-            if xref := self.get_external_ref(external, objtype, ref_id):
-                return xref.id
+        if xref := self.get_external_xref(external, role, ref_id):
+            return xref.id
 
     def is_external_xref(self, external: str, role: str, ref_id: str) -> bool:
         """Helper function to check if a cross-reference is explicitly external"""
@@ -454,40 +658,268 @@ class READMEParser:
             ":" in ref_id and ref_id.split(":", maxsplit=1)[0] in self.intersphinx_pkgs
         ))
 
-    def resolve(self) -> None:
+    def resolve(self, sources: Optional[List[str]] = None) -> None:
         """Uses parsed data from to replace cross-references and directives in the :attr:`~.src_files`
 
         Once resolved, files are written to the :attr:`~.out_dir`.
+
+        .. tip:: Source files are skipped if their :meth:`fingerprint <get_fingerprint>` and output file
+           haven't changed since the last build, and output files are only written if their content changes
+
+        :param sources: absolute paths of the source files to resolve (default: all source files)
         """
-        for src, rst in self.sources.items():
-            # Replace everything using parsed data
-            rst = self.replace_admonitions(src, rst)
-            rst = self.replace_rst_images(src, rst)
-            rst = self.replace_toctrees(src, rst)
-            rst = self.replace_rubrics(src, rst)
-            rst = self.replace_xrefs(src, rst)
-            rst = self.replace_py_xrefs(src, rst)
-            rst = self.replace_unresolved_xrefs(rst)
+        with self.profiler.phase("resolve"), self.memory_report.phase("resolve"):
+            manifest = BuildManifest(self.config.build_dir / "readme_manifest.json")
+            fingerprints = {}
 
-            # Prepend substitution definitions for cross-reference
-            substitutions = self.substitutions[src]
-            header_vals = []
+            for src in self.sources if sources is None else sources:
+                rst_out = self.config.src_files[src]
+                fingerprint = self.get_fingerprint(src)
 
-            for target in sorted(substitutions, key=lambda t: (t.lower().lstrip("`~."), t.lower())):
-                header_vals.append('\n'.join(substitutions[target]))
+                if manifest.is_current(src, fingerprint, rst_out):
+                    self.logger.verbose(f'``sphinx_readme``: generated file {rst_out} is up to date')
+                else:
+                    fingerprints[src] = fingerprint
 
-            # Write the final output
-            rst_out = self.config.src_files[src]
-            rst_out.parent.mkdir(parents=True, exist_ok=True)
+            for src, output in self.resolve_sources(list(fingerprints)):
+                rst_out = self.config.src_files[src]
 
-            output = "\n".join(header_vals) + "\n\n" + rst
-            rst_out.write_text(output, encoding='utf-8')
+                if write_file(rst_out, output):
+                    self.logger.info(f'``sphinx_readme``: saved generated file to {rst_out}')
+                    self.profiler.count("bytes_written", len(output.encode('utf-8')), src=src)
+                else:
+                    self.logger.verbose(f'``sphinx_readme``: generated file {rst_out} is unchanged')
+
+                manifest.update(src, fingerprints[src], rst_out)
+
+            manifest.save()
+
+            if self.config.index:
+                self.write_index()
+
+        if self.config.profile:
+            self.write_profile()
+
+        if self.config.memory_report:
+            self.write_memory_report()
+
+    def write_profile(self) -> None:
+        """Writes the :class:`~.Profiler` report to the build directory and logs a summary
+
+        The recorded phases are then discarded, so each report only covers a single build
+        """
+        report = self.profiler.write(self.config.build_dir, trace=self.config.profile == "trace")
+        self.logger.info(self.profiler.get_summary(report))
+        self.profiler.reset()
+
+    def write_memory_report(self) -> None:
+        """Writes the :class:`~.MemoryReport` to the build directory and logs a summary
+
+        The retained size of each of the parser's data structures is measured once the files are resolved
+        """
+        structures = {
+            name: getattr(self, name) for name in (
+                "sources", "ref_map", "py_refs", "titles", "toctrees", "admonitions", "rubrics",
+                "substitutions", "references", "inventory", "named_inventory", "inventory_index",
+                "external_xrefs", "image_urls", "doctrees", "index_refs"
+            )
+        }
+        structures["file_cache"] = self.config.file_cache
+        report = self.memory_report.write(self.config.build_dir, structures)
+        self.logger.info(self.memory_report.get_summary(report))
+        self.memory_report.reset()
+
+    def write_index(self) -> None:
+        """Writes the parsed data to ``readme_index.db`` in the build directory
+
+        .. tip:: The index can be loaded without Sphinx using the :class:`~.READMEIndex`
+        """
+        from sphinx_readme import __version__
+
+        config = self.config
+        write_index(
+            path=config.build_dir / "readme_index.db",
+            meta={
+                'sphinx_readme': __version__,
+                'html_baseurl': config.html_baseurl,
+                'docs_url_type': config.docs_url_type,
+                'blob_url': config.blob_url,
+                'inline_markup': config.inline_markup
+            },
+            py_refs=self.index_refs.get('py', []),
+            std_refs=self.index_refs.get('std', {}),
+            titles=self.titles,
+            sources={
+                Path(src).relative_to(config.src_dir.resolve()).as_posix(): {
+                    'toctrees': self.toctrees.get(src, []),
+                    'admonitions': self.admonitions.get(src, []),
+                    'rubrics': self.rubrics.get(src, [])
+                } for src in self.sources
+            }
+        )
+
+    def resolve_sources(self, sources: List[str]) -> Iterator[Tuple[str, str]]:
+        """Resolves each of the given source files, in parallel if :confval:`readme_parallel` is enabled
+
+        Each worker process is sent a :meth:`slice <get_worker_parser>` of the parser for its
+        source file. Results are yielded in the order of ``sources``, and the substitutions
+        from each worker are merged back into the :attr:`substitutions`
+
+        :param sources: absolute paths of the source files to resolve
+        :return: an iterator of each source file and its generated output
+        """
+        if not (self.config.parallel and len(sources) > 1):
+            for src in sources:
+                yield src, self.resolve_source(src)
+            return
+
+        max_workers = None if self.config.parallel is True else self.config.parallel
+        parsers = [self.get_worker_parser(src) for src in sources]
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(_resolve_source, parsers, sources)
+
+            for src, (output, substitutions) in zip(sources, results):
+                self.substitutions[src] = substitutions
+                yield src, output
+
+    @profiled
+    def resolve_source(self, src: str) -> str:
+        """Replaces cross-references and directives in a single source file
+
+        :param src: absolute path of the source file
+        :return: the generated ``rst`` to write to the output file
+        """
+        # Replace everything using parsed data
+        self.substitutions[src] = {}
+        rst = self.sources[src]
+        rst = self.replace_directives(src, rst)
+        rst = self.replace_rst_images(src, rst)
+        rst = self.replace_xrefs(src, rst)
+        rst = self.replace_py_xrefs(src, rst)
+        rst = self.replace_unresolved_xrefs(rst)
+
+        # Prepend substitution definitions for cross-reference
+        substitutions = self.substitutions[src]
+        header_vals = []
+
+        for target in sorted(substitutions, key=lambda t: (t.lower().lstrip("`~."), t.lower())):
+            header_vals.append('\n'.join(substitutions[target]))
+
+        return "\n".join(header_vals) + "\n\n" + rst
+
+    def get_worker_parser(self, src: str) -> "READMEParser":
+        """Returns a copy of the parser with only the data needed to resolve a single source file
+
+        Instead of the full :attr:`ref_map`, :attr:`py_refs` and intersphinx inventories, the
+        copy has the :attr:`xref_tables` entry for the source file, which contains the target
+        of each cross-reference in the file, already looked up by :meth:`get_xref_table`.
+        Its :class:`~.READMEConfig` is also a copy, with only the content of the source file
+
+        :param src: absolute path of the source file
+        """
+        parser = copy.copy(self)
+        parser.config = copy.copy(self.config)
+        parser.config.sources = {src: self.sources[src]}
+        parser.config.file_cache = LRUCache(maxsize=self.config.file_cache.maxsize)
+        parser.sources = parser.config.sources
+        parser.admonitions = {src: self.admonitions.get(src, [])}
+        parser.rubrics = {src: self.rubrics.get(src, [])}
+        parser.toctrees = defaultdict(list, {src: self.toctrees.get(src, [])})
+        parser.substitutions = defaultdict(dict)
+        parser.xref_tables = {src: self.get_xref_table(src)}
+        parser.doctrees = DoctreeCache()
+        parser.py_refs = XrefIndex(self.config.inline_markup)
+        parser.ref_map = {}
+        parser.titles = {}
+        parser.inventory = {}
+        parser.named_inventory = {}
+        parser.inventory_index = InventoryIndex({}, {}, {})
+        parser.external_xrefs = {}
+        parser.index_refs = {}
+        parser.profiler = Profiler()
+        parser.memory_report = MemoryReport()
+        return parser
+
+    @profiled
+    def get_fingerprint(self, src: str) -> str:
+        """Returns a hash of all data used to generate the output file of a source file
+
+        This includes the source file content (with included files), the relevant configuration
+        values, the parsed directive data, and the resolved target of each cross-reference
+        in the file. The cross-references are resolved without making any replacements
+
+        :param src: absolute path of the source file
+        """
+        from sphinx_readme import __version__
+
+        config = self.config
+        data = {
+            'version': __version__,
+            'config': [
+                str(config.src_files[src]), str(config.src_dir), str(config.repo_dir),
+                config.html_baseurl, config.docs_url_type, config.blob_url, config.image_baseurl,
+                config.inline_markup, config.raw_directive, config.rubric_heading,
+                config.replace_attrs, config.icon_map, self.roles
+            ],
+            'source': self.sources[src],
+            'admonitions': self.admonitions.get(src),
+            'rubrics': self.rubrics.get(src),
+            'toctrees': self.toctrees.get(src),
+            'xrefs': self.get_resolved_xrefs(src)
+        }
+        return get_digest(json.dumps(data, sort_keys=True, default=str))
+
+    def get_resolved_xrefs(self, src: str) -> List[Tuple[str, Optional[Tuple[str, str, List[str]]]]]:
+        """Resolves each unique cross-reference in a source file, without replacing them
+
+        :param src: absolute path of the source file
+        :return: a list of each cross-reference and its substitution data, or ``None`` if it's unresolved
+        """
+        rst = self.sources[src]
+        resolved = {}
+        resolvers = (
+            (self.get_xref_regex(domains=["rst", "std"], xref_type="any"), partial(self.get_xref_link, src)),
+            (self.get_xref_regex("py", xref_type="any"), partial(self.get_py_xref_link, src))
+        )
+        for pattern, get_link in resolvers:
+            for match in pattern.finditer(rst):
+                if (full_xref := match.group(1)) not in resolved:
+                    resolved[full_xref] = get_link(*match.groups()[1:])
 
-            print(f'``sphinx_readme``: saved generated file to {rst_out}')
+        return list(resolved.items())
 
-    def replace_admonitions(self, rst_src: str, rst: str) -> str:
-        """Replaces generic and specific admonition directives with HTML tables or ``list-table``
-        directives, depending on the value of :confval:`readme_raw_directive`
+    def get_xref_table(self, src: str) -> Dict[Tuple, Optional[Tuple[str, Dict]]]:
+        """Looks up the target of each unique cross-reference in a source file
+
+        The table is keyed by the domain, external package, role and target of each cross-reference,
+        so it still applies after directives are replaced and xref titles are reformatted
+
+        :param src: absolute path of the source file
+        :return: a mapping of cross-references to the return value of :meth:`lookup_xref`
+        """
+        rst = self.sources[src]
+        table = {}
+        patterns = (
+            ("std", self.get_xref_regex(domains=["rst", "std"], xref_type="any")),
+            ("py", self.get_xref_regex("py", xref_type="any"))
+        )
+        for domain, pattern in patterns:
+            for match in pattern.finditer(rst):
+                _, external, role, _, ref_id = match.groups()
+
+                if (key := (domain, external, role, ref_id)) not in table:
+                    table[key] = self.lookup_xref(src, *key)
+
+        return table
+
+    @profiled
+    def replace_directives(self, rst_src: str, rst: str) -> str:
+        """Replaces admonition, :rst:dir:`rubric` and :rst:dir:`toctree` directives in a single pass
+
+        Each directive is replaced using the line span that was recorded when it was parsed, so the
+        directives don't need to be searched for. Directives that are nested within an admonition
+        are replaced as part of its body
 
         .. admonition:: Customizing Admonitions
            :class: about
@@ -497,82 +929,162 @@ class READMEParser:
            * See :confval:`readme_admonition_icons` and :confval:`readme_default_admonition_icon`
 
         :param rst_src: absolute path of the source file
-        :param rst: content of the source file
+        :param rst: content of the source file, before any other replacements are made
         """
-        for admonition in self.admonitions[rst_src]:
-            pattern = self.get_admonition_regex(admonition)
-            icon = self.get_admonition_icon(admonition)
-            if not self.config.raw_directive:
-                rst = re.sub(
-                    pattern=pattern,
-                    repl=lambda match: self._replace_admonition(
-                        match, rst_src, admonition, icon),
-                    string=rst,
-                )
+        blocks = [
+            *((info['span'], 'admonition', info) for info in self.admonitions.get(rst_src, [])),
+            *((info['span'], 'rubric', info) for info in self.rubrics.get(rst_src, [])),
+            *((info['span'], 'toctree', info) for info in self.toctrees.get(rst_src, [])),
+        ]
+        blocks = sorted((block for block in blocks if block[0]), key=lambda block: block[0])
+        return '\n'.join(self._replace_directives(rst_src, rst.split('\n'), 0, blocks))
+
+    def _replace_directives(self, rst_src: str, lines: List[str], offset: int, blocks: List[Tuple], force_markup: bool = False) -> List[str]:
+        """Helper function to replace the directive ``blocks`` within ``lines``
+
+        :param rst_src: absolute path of the source file
+        :param lines: the lines to replace directives in, starting from line ``offset`` of the source file
+        :param offset: the index of the first line in the source file
+        :param blocks: the sorted line spans, directive types and parsed data of the directives within ``lines``
+        :param force_markup: boolean indicating if rubrics should be replaced with bold text regardless of :confval:`readme_rubric_heading`
+        """
+        output = []
+        i = 0
+
+        while blocks:
+            (start, end), directive, info = blocks[0]
+            # Blocks are sorted by start line, so any nested directives immediately follow
+            nested = [block for block in blocks[1:] if block[0][0] < end]
+            blocks = blocks[1 + len(nested):]
+
+            output.extend(lines[i:start - offset])
+            block = DirectiveBlock(lines[start - offset:end - offset])
+
+            if directive == 'admonition':
+                output.append(self._replace_admonition(rst_src, block, info, start, nested))
+            elif directive == 'rubric':
+                output.append(self._replace_rubric(rst_src, block, info, force_markup))
             else:
-                rst = re.sub(
-                    pattern=pattern,
-                    repl=self.config.admonition_template.format(
-                        title=admonition['title'],
-                        text=admonition['body'],
-                        icon=icon),
-                    string=rst
-                )
-        return rst
+                output.append(self._replace_toctree(rst_src, block, info))
+
+            i = end - offset
+
+        output.extend(lines[i:])
+        return output
 
-    def _replace_admonition(self, match, rst_src, admonition: dict, icon: str) -> str:
-        """Helper function for formatting ``list-table`` admonitions"""
-        body = match.group(2)
-        if all((
-                ".. rubric::" in body,
-                self.config.rubric_heading,
-                self.config.raw_directive is False
-        )):
-            body = self.replace_rubrics(rst_src, body, force_markup=True)
+    def _replace_admonition(self, rst_src: str, block: DirectiveBlock, admonition: dict, start: int, nested: List[Tuple]) -> str:
+        """Replaces an admonition with an HTML table or ``list-table`` directive, depending on the value of :confval:`readme_raw_directive`
+
+        :param rst_src: absolute path of the source file
+        :param block: the admonition directive
+        :param admonition: a dict of admonition data
+        :param start: the index of the first line of the directive in the source file
+        :param nested: the directives nested within the admonition
+        """
+        # For example, .. note:: This is a note
+        has_argument = admonition['type'] == 'specific' and bool(block.argument)
+
+        if has_argument:
+            body = [block.argument, *block.lines[1:]]
+            body_start = start
+        else:
+            body = block.content
+            body_start = start + len(block.lines) - len(block.content)
+
+        icon = self.get_admonition_icon(admonition)
+
+        if self.config.raw_directive:
+            # Dedent the body, since the HTML template places it at the start of each line
+            indents = [len(line) - len(line.lstrip()) for line in body[has_argument:] if line.strip()]
+            dedent = min(indents, default=0)
+            body = body[:has_argument] + [line[dedent:] if line.strip() else '' for line in body[has_argument:]]
+            body = self._replace_directives(rst_src, body, body_start, nested)
+
+            return block.indent + self.config.admonition_template.format(
+                title=admonition['title'],
+                text='\n'.join(body),
+                icon=icon
+            )
+
+        # Nested rubrics can't be section headings within a list-table
+        body = [body[0].lstrip(), *body[1:]] if body else []
+        body = '\n'.join(self._replace_directives(rst_src, body, body_start, nested, force_markup=True))
 
         # Add extra indentation to ensure body lines up with directive
-        body = re.sub(pattern=r"(\n+)", repl=r"\1    ", string=body)
+        body = re.sub(pattern=r"(\n+)(?=[^\n])", repl=r"\1    ", string=body)
         template = self.config.admonition_template.format(
             title=admonition['title'],
             icon=icon
-        ).replace(
-            r'\2', body
-        ).replace(
-            r'\1', match.group(1)
         )
-        return template
+        return template.replace(r'\1', block.indent).replace(r'\2', body)
 
-    def replace_toctrees(self, rst_src: str, rst: str) -> str:
-        """Replaces :rst:dir:`toctree` directives with hyperlinked bullet lists
+    def _replace_rubric(self, rst_src: str, block: DirectiveBlock, rubric: dict, force_markup: bool = False) -> str:
+        """Replaces a :rst:dir:`rubric` directive with the section heading
+        character specified by :confval:`readme_rubric_heading`
 
-        .. note:: Entries will link to HTML documentation regardless of the
-           value of :confval:`readme_docs_url_type`
+        If :confval:`readme_rubric_heading` is not specified, the rubric
+        will be replaced with bold text instead
+
+        ...
+
+        **Example:**
+
+        Consider a source file that contains
+        :rst:`.. rubric:: This is a \`\`rubric\`\` directive`
+
+        * Replacement without specifying ``readme_rubric_heading``::
+
+              **This is a** ``rubric`` **directive**
+
+        * Replacement if :code:`readme_rubric_heading = "^"`::
+
+              This is a ``rubric`` directive
+              ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
 
         :param rst_src: absolute path of the source file
-        :param rst: content of the source file
+        :param block: the rubric directive
+        :param rubric: a dict of rubric data
+        :param force_markup: boolean indicating if the rubric should be replaced with bold text regardless of :confval:`readme_rubric_heading`
         """
-        pattern = r"\.\. toctree::\s*?\n+?(?:^[ ]+.+?$|^\s*$)+?(?=\n*\S+|\Z)"
-        toctrees = re.findall(pattern, rst, re.M | re.DOTALL)
+        heading_chars = '!"#$%&\'()*+,-./:;<=>?@[\\]^_`{|}~'
+        text = ' '.join(line.strip() for line in rubric['text'].split('\n'))
+
+        if heading := self.config.rubric_heading:
+            if heading not in heading_chars:
+                heading = None
 
-        for toctree, info in zip(toctrees, self.toctrees[rst_src]):
-            titles_only = info.get('titles_only')
-            maxdepth = info.get('maxdepth', 1)
-            repl = ""
+        if heading and not force_markup:
+            return block.indent + text + "\n" + (len(text) * heading)
 
-            if info['caption']:
-                repl += f"**{info['caption']}**\n\n"
+        text = self.replace_xrefs(rst_src, text)
+        text = self.replace_py_xrefs(rst_src, text)
+        return block.indent + format_rst("bold", text)
 
-            for entry in info['entries']:
-                repl = self._replace_toctree_entry(rst_src, entry, repl, maxdepth, titles_only)
+    def _replace_toctree(self, rst_src: str, block: DirectiveBlock, info: dict) -> str:
+        """Replaces a :rst:dir:`toctree` directive with a hyperlinked bullet list
 
-            last_line = repl.strip().split('\n')[-1]
-            last_indent = len(last_line) - len(last_line.lstrip())
-            repl += f"\n{(last_indent + 2) * ' '}|\n\n"  # Add line break at next indent to improve spacing
+        .. note:: Entries will link to HTML documentation regardless of the
+           value of :confval:`readme_docs_url_type`
 
-            # Replace toctree directive with substitutions
-            rst = rst.replace(toctree, repl)
+        :param rst_src: absolute path of the source file
+        :param block: the toctree directive
+        :param info: a dict of toctree data
+        """
+        titles_only = info.get('titles_only')
+        maxdepth = info.get('maxdepth', 1)
+        repl = ""
 
-        return rst
+        if info['caption']:
+            repl += f"**{info['caption']}**\n\n"
+
+        for entry in info['entries']:
+            repl = self._replace_toctree_entry(rst_src, entry, repl, maxdepth, titles_only)
+
+        last_line = repl.strip().split('\n')[-1]
+        last_indent = len(last_line) - len(last_line.lstrip())
+        repl += f"\n{(last_indent + 2) * ' '}|\n\n"  # Add line break at next indent to improve spacing
+
+        return block.indent + repl
 
     def _replace_toctree_entry(self, rst_src, entry, repl, maxdepth, titles_only, indentation = "", depth = 0):
         if depth == maxdepth:
@@ -602,8 +1114,9 @@ class READMEParser:
             repl += "\n"
         return repl
 
+    @profiled
     def replace_rst_images(self, rst_src: str, rst: str) -> str:
-        """Replaces filepaths in ``image`` directives with repository links
+        """Replaces filepaths in ``image`` and ``figure`` directives with repository links
 
         **Example:**
 
@@ -616,159 +1129,157 @@ class READMEParser:
         .. note:: Your repository will be used as the image source regardless of the
            value of :confval:`readme_docs_url_type`
 
+        The ``rst`` is scanned once, including ``image`` substitution definitions like
+        :rst:`.. |logo| image:: /_static/logo_readme.png`, and each filepath is replaced
+        with the link from :meth:`get_image_url`
+
         :param rst_src: absolute path of the source file
         :param rst: content of the source file
         """
-        src_dir = self.config.src_dir
-        repo_dir = self.config.repo_dir
-        rst_src_dir = Path(rst_src).parent
-        relpath_to_src_dir = src_dir.relative_to(repo_dir)
+        img_pattern = compile_regex(r"(\.\. (?:\|[^|\n]+\| )?image:: |\.\. figure:: )([./\w-]+\.\w{3,4})")
+        return img_pattern.sub(
+            lambda match: match.group(1) + self.get_image_url(rst_src, match.group(2)),
+            rst
+        )
+
+    def get_image_url(self, rst_src: str, img_path: str) -> str:
+        """Returns the repository link to an image
+
+        Links are cached in :attr:`image_urls`, since the same image is often used many times
+
+        :param rst_src: absolute path of the source file
+        :param img_path: the filepath of the image, relative to either the
+           :attr:`~.src_dir` (if it starts with ``/``) or the source file
+        """
+        if img_path.startswith("/"):
+            key = img_path
+        else:
+            key = (Path(rst_src).parent / img_path).as_posix()
 
-        # Find the targets of all image directives
-        img_pattern = r"\.\. image:: ([./\w-]+\.\w{3,4})"
-        img_paths = re.findall(img_pattern, rst)
+        if key not in self.image_urls:
+            repo_dir = self.config.repo_dir
 
-        for img_path in img_paths:
             if img_path.startswith("/"):
                 # These paths are relative to source dir
+                relpath_to_src_dir = self.config.src_dir.relative_to(repo_dir)
                 path_to_img = Path(f"{relpath_to_src_dir}{img_path}").as_posix()
 
             else:
-                # These paths are relative to rst_file dir
-                abs_img_path = (rst_src_dir / Path(img_path)).resolve()
-
-                # Find path of image relative to the repo directory
-                path_to_img = abs_img_path.relative_to(repo_dir).as_posix()
-
-            # Sub that hoe in!!!
-            rst = re.sub(
-                pattern=rf"\.\. image:: {img_path}",
-                repl=fr".. image:: {self.config.image_baseurl}/{path_to_img}",
-                string=rst
-            )
-        return rst
-
-    def replace_rubrics(self, rst_src: str, rst: str, force_markup: bool = False) -> str:
-        """Replaces :rst:dir:`rubric` directives with the section heading
-        character specified by :confval:`readme_rubric_heading`
+                # These paths are relative to rst_file dir, so find the path relative to the repo directory
+                path_to_img = Path(key).resolve().relative_to(repo_dir).as_posix()
 
-        If :confval:`readme_rubric_heading` is not specified, the rubric
-        will be replaced with bold text instead
-
-        ...
-
-        **Example:**
-
-        Consider a source file that contains
-        :rst:`.. rubric:: This is a \`\`rubric\`\` directive`
+            self.image_urls[key] = f"{self.config.image_baseurl}/{path_to_img}"
 
-        * Replacement without specifying ``readme_rubric_heading``::
+        return self.image_urls[key]
 
-              **This is a** ``rubric`` **directive**
+    @profiled
+    def replace_xrefs(self, rst_src: str, rst: str) -> str:
+        """Replaces cross-references from the |std_domain| and |rst_domain| with substitutions or inline links
 
-        * Replacement if :code:`readme_rubric_heading = "^"`::
+        .. tip:: This includes cross-references for any custom objects added by
+           :meth:`Sphinx.add_object_type() <sphinx.application.Sphinx.add_object_type>`
 
-              This is a ``rubric`` directive
-              ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+        The ``rst`` is scanned once; each unique cross-reference is resolved by
+        :meth:`get_xref_link` the first time it's found
 
         :param rst_src: absolute path of the source file
         :param rst: content of the source file
+        :return: the ``rst`` with all applicable cross-references replaced by links/substitutions
         """
-        rubric_pattern = r'\.\. rubric:: ({body})(?=\n?$(?:\n+?^\s*$|\Z))'
-        heading_chars = '!"#$%&\'()*+,-./:;<=>?@[\\]^_`{|}~'
+        pattern = self.get_xref_regex(domains=["rst", "std"], xref_type="any")
+        return self._replace_xrefs(rst_src, rst, pattern, partial(self.get_xref_link, rst_src))
 
-        if heading := self.config.rubric_heading:
-            if heading not in heading_chars:
-                heading = None
+    def get_xref_link(self, rst_src: str, external: Optional[str], role: str, title: Optional[str], ref_id: str) -> Optional[Tuple[str, str, List[str]]]:
+        """Resolves a cross-reference from the |std_domain| or |rst_domain|
 
-        for rubric in self.rubrics[rst_src]:
-            pattern = rubric_pattern.format(body=re.escape(rubric).replace("\\\n", "\\\n[ ]+"))
-            text = ' '.join(line.strip() for line in rubric.split('\n'))
+        :param rst_src: absolute path of the source file
+        :param external: the ``:external:`` or ``:external+pkg:`` portion of the xref, if present
+        :param role: the cross-reference role
+        :param title: the explicit title of the xref, if present
+        :param ref_id: the target of the cross-reference
+        :return: a tuple containing the substitution name, link, and substitution definitions,
+           or ``None`` if the cross-reference can't be resolved
+        """
+        if not (ref := self.lookup_xref(rst_src, "std", external, role, ref_id)):
+            return None
 
-            if heading and not force_markup:
-                repl = text + "\n" + (len(text) * heading)
-            else:
-                text = self.replace_xrefs(rst_src, text)
-                text = self.replace_py_xrefs(rst_src, text)
-                repl = format_rst("bold", text)
+        ref_id, info = ref
 
-            repl = repl.replace("\\", r"\\")
-            rst = re.sub(pattern, repl, rst, flags=re.M)
+        if title:  # Include explicit title in substitution name
+            ref_id = f"{ref_id}+{title}"
 
-        return rst
+            # Add inline markup if replacement had it
+            if info['replace'].startswith("`"):
+                title = f"``{title}``"
 
-    def replace_xrefs(self, rst_src: str, rst: str) -> str:
-        """Replaces cross-references from the |std_domain| and |rst_domain| with substitutions or inline links
+        link, subs = format_hyperlink(
+            target=info['target'],
+            text=title or info['replace'],
+            sub_override=f".{ref_id}",
+            force_subs=True
+        )
+        return ref_id, link, subs
 
-        .. tip:: This includes cross-references for any custom objects added by
-           :meth:`Sphinx.add_object_type() <sphinx.application.Sphinx.add_object_type>`
+    def lookup_xref(self, rst_src: str, domain: str, external: Optional[str], role: str, ref_id: str) -> Optional[Tuple[str, Dict]]:
+        """Looks up the target data of a cross-reference, using the :attr:`xref_tables` if possible
 
         :param rst_src: absolute path of the source file
-        :param rst: content of the source file
-        :return: the ``rst`` with all applicable cross-references replaced by links/substitutions
+        :param domain: either ``"py"`` for the :attr:`py_refs` or ``"std"`` for the :attr:`ref_map`
+        :param external: the ``:external:`` or ``:external+pkg:`` portion of the xref, if present
+        :param role: the cross-reference role
+        :param ref_id: the target of the cross-reference
+        :return: a tuple containing the resolved ``ref_id`` and its target data, or ``None`` if not found
         """
-        xrefs = set()
+        table = self.xref_tables.get(rst_src, {})
 
-        for pattern in self.get_xref_regex(domains=["rst", "std"]):
-            xrefs.update(re.findall(
-                pattern=pattern,
-                string=rst))
+        if (key := (domain, external, role, ref_id)) in table:
+            return table[key]
 
-        for xref in xrefs:
-            if len(xref) == 5:  # From title pattern
-                full_xref, external, role, title, ref_id = xref
-            else:
-                full_xref, external, role, ref_id, *title = xref
+        if domain == "py":
+            return (ref_id, info) if (info := self.py_refs.get(ref_id)) else None
 
-            # If xref is explicitly external, force resolve with external lookup
-            if is_explicitly_external := self.is_external_xref(external, role, ref_id):
-                ref_id = self.get_external_id(external, role, ref_id)
+        # If xref is explicitly external, force resolve with external lookup
+        if is_explicitly_external := self.is_external_xref(external, role, ref_id):
+            ref_id = self.get_external_id(external, role, ref_id)
 
-            elif role == "ref":  # Normalize ref_id to ensure match in ref_map
-                ref_id = nodes.fully_normalize_name(ref_id)
+        else:  # Normalize ref_id to ensure match in ref_map
+            ref_id = self.normalize_ref_id(rst_src, role, ref_id)
 
-            elif role == "doc":
-                if ref_id.startswith("/"):
-                    # These document paths are relative to source dir
-                    ref_id = ref_id.lstrip('/')
-                else:
-                    # These document paths are relative to rst_src dir
-                    abs_doc_path = (Path(rst_src).parent/Path(ref_id)).resolve()
-                    ref_id = abs_doc_path.relative_to(self.config.src_dir).as_posix()
+        # Match the xref with target data in the ref_map
+        ref_map = self.ref_map.get(role, {})
 
-            # Match the xref with target data in the ref_map
-            ref_map = self.ref_map.get(role, {})
+        if ref_id not in ref_map and not is_explicitly_external:
+            # If data is missing and the xref isn't explicitly external, check
+            # intersphinx since it's also used as a fallback resolution
+            ref_id = self.get_external_id(external, role, ref_id)
 
-            if ref_id not in ref_map and not is_explicitly_external:
-                # If data is missing and the xref isn't explicitly external, check
-                # intersphinx since it's also used as a fallback resolution
-                ref_id = self.get_external_id(external, role, ref_id)
+        if not (info := ref_map.get(ref_id)):
+            return None
 
-            if not (info := ref_map.get(ref_id)):
-                continue
+        return ref_id, info
 
-            if title:  # Include explicit title in substitution name
-                ref_id = f"{ref_id}+{title}"
+    def normalize_ref_id(self, rst_src: str, role: str, ref_id: str) -> str:
+        """Normalizes the target of a |std_domain| or |rst_domain| cross-reference to its key in the :attr:`ref_map`
 
-                # Add inline markup if replacement had it
-                if info['replace'].startswith("`"):
-                    title = f"``{title}``"
+        :param rst_src: absolute path of the source file
+        :param role: the cross-reference role
+        :param ref_id: the target of the cross-reference
+        """
+        if role == "ref":
+            return nodes.fully_normalize_name(ref_id)
 
-            link, subs = format_hyperlink(
-                target=info['target'],
-                text=title or info['replace'],
-                sub_override=f".{ref_id}",
-                force_subs=True
-            )
-            self.substitutions[rst_src][ref_id] = subs
+        if role == "doc":
+            if ref_id.startswith("/"):
+                # These document paths are relative to source dir
+                return ref_id.lstrip('/')
+            else:
+                # These document paths are relative to rst_src dir
+                abs_doc_path = (Path(rst_src).parent/Path(ref_id)).resolve()
+                return abs_doc_path.relative_to(self.config.src_dir).as_posix()
 
-            rst = re.sub(  # Replace cross-ref with substitution
-                pattern = rf"(?<![^\s{BEFORE_XREF}]){escape_rst(full_xref)}(?=[\s{AFTER_XREF}]|\Z)",
-                repl=link,
-                string=rst
-            )
-        return rst
+        return ref_id
 
+    @profiled
     def replace_py_xrefs(self, rst_src: str, rst: str) -> str:
         """Replace |py_domain| cross-references with substitutions
 
@@ -782,60 +1293,75 @@ class READMEParser:
         :param rst_src: absolute path of the source file
         :param rst: content of the source file
         """
-        xrefs = set()
-        targets = {
-            'regular': {
-                'xrefs': [],
-                'repl': r"|.\4|_"  # Replace with |.{ref_id}|_
-            },
-            'title': {
-                'xrefs': [],
-                'repl': r"|.\5+\4|_"  # Replace with |.{ref_id}+{title}|_
-            }
-        }
-        # Find all :ref_role:`ref_id` or :ref_role:`title <ref_id>` cross-refs
-        for pattern in self.get_xref_regex("py"):
-            xrefs.update(re.findall(
-                pattern=pattern,
-                string=rst))
+        # Find all :ref_role:`ref_id` or :ref_role:`title <ref_id>` cross-refs,
+        # then look up each target in the py_refs instead of matching against every target
+        pattern = self.get_xref_regex("py", xref_type="any")
+        return self._replace_xrefs(rst_src, rst, pattern, partial(self.get_py_xref_link, rst_src))
 
-        for xref in xrefs:
-            if len(xref) == 5:  # From title pattern
-                full_xref, external, role, title, ref_id = xref
-            else:
-                full_xref, external, role, ref_id, *title = xref
+    def get_py_xref_link(self, rst_src: str, external: Optional[str], role: str, title: Optional[str], ref_id: str) -> Optional[Tuple[str, str, List[str]]]:
+        """Resolves a cross-reference from the |py_domain|
 
-            if not (info := self.ref_map.get(ref_id)):
-                continue
+        :param rst_src: absolute path of the source file
+        :param external: the ``:external:`` or ``:external+pkg:`` portion of the xref, if present
+        :param role: the cross-reference role
+        :param title: the explicit title of the xref, if present
+        :param ref_id: the target of the cross-reference
+        :return: a tuple containing the substitution name, link, and substitution definitions,
+           or ``None`` if the cross-reference can't be resolved
+        """
+        if not (ref := self.lookup_xref(rst_src, "py", external, role, ref_id)):
+            return None
 
-            if title:  # Include explicit title in substitution name
-                targets['title']['xrefs'].append(ref_id)
-                ref_id = f"{ref_id}+{title}"
+        ref_id, info = ref
 
-                if self.config.inline_markup:
-                    title = f"``{title}``"
+        if title:  # Include explicit title in substitution name
+            ref_id = f"{ref_id}+{title}"
 
-            else:
-                targets['regular']['xrefs'].append(ref_id)
+            if self.config.inline_markup:
+                title = f"``{title}``"
 
-            link, subs = format_hyperlink(
-                target=info['target'],
-                text=title or info['replace'],
-                sub_override=f".{ref_id}",
-                force_subs=True
-            )
-            self.substitutions[rst_src][ref_id] = subs
+        link, subs = format_hyperlink(
+            target=info['target'],
+            text=title or info['replace'],
+            sub_override=f".{ref_id}",
+            force_subs=True
+        )
+        return ref_id, link, subs
 
-        # Replace cross-refs with substitutions
-        for xref_type, xref_data in targets.items():
-            if xrefs := xref_data['xrefs']:
-                rst = re.sub(
-                    pattern=self.get_xref_regex("py", targets=xrefs, xref_type=xref_type),
-                    repl=xref_data['repl'],
-                    string=rst
-                )
-        return rst
+    def _replace_xrefs(self, rst_src: str, rst: str, pattern: re.Pattern, get_link: Callable) -> str:
+        """Replaces cross-references matched by ``pattern`` in a single pass over the ``rst``
+
+        Each unique cross-reference is resolved once by ``get_link``, and
+        its substitution definitions are added to the :attr:`substitutions`
+
+        :param rst_src: absolute path of the source file
+        :param rst: content of the source file
+        :param pattern: the ``"any"`` type regex from :meth:`get_xref_regex`
+        :param get_link: the function to resolve cross-references with
+        """
+        resolved = {}
 
+        def replace(match: re.Match) -> str:
+            full_xref = match.group(1)
+
+            if full_xref not in resolved:
+                if xref := get_link(*match.groups()[1:]):
+                    ref_id, link, subs = xref
+                    self.substitutions[rst_src][ref_id] = subs
+                    resolved[full_xref] = link
+                else:
+                    resolved[full_xref] = None
+
+            self.profiler.count("xrefs_found", src=rst_src)
+
+            if resolved[full_xref]:
+                self.profiler.count("xrefs_resolved", src=rst_src)
+
+            return resolved[full_xref] or full_xref
+
+        return pattern.sub(replace, rst)
+
+    @profiled
     def replace_unresolved_xrefs(self, rst: str) -> str:
         """Replaces any unresolved cross-references from all domains with inline literals"""
         # Replace unresolved Python cross-refs
@@ -859,7 +1385,7 @@ class READMEParser:
                        domains: str | Iterable[str],
                        roles: Optional[str | Iterable[str]] = None,
                        targets: Optional[str | Iterable[str]] = None,
-                       xref_type: Optional[str] = None) -> str | Tuple[str, str]:
+                       xref_type: Optional[str] = None) -> re.Pattern | Tuple[re.Pattern, re.Pattern]:
         """Returns the regex to match cross-references
 
         .. note:: The patterns have the following match groups:
@@ -879,20 +1405,26 @@ class READMEParser:
               4. The explicit title
               5. The cross-reference target
 
+           :Any Cross-Reference:
+
+              1. The full cross-reference
+              2. The external role, if present
+              3. The cross-reference role
+              4. The explicit title, if present
+              5. The cross-reference target
+
         :param domains: an individual or list of Sphinx object domains to match
         :param roles: an individual or list of cross-reference roles to match; matches all domain roles if not provided
         :param targets: an individual or list of targets to match; matches all xrefs if not provided
-        :param xref_type: the xref type to match (``"regular"`` or ``"title"``); returns both if not specified
-        :return: the regex pattern to match regular xrefs, xrefs with explicit titles, or a tuple containing both
+        :param xref_type: the xref type to match (``"regular"``, ``"title"`` or ``"any"``); returns both if not specified
+        :return: the regex pattern to match regular xrefs, xrefs with explicit titles, either type, or a tuple containing both
         """
         if targets is None:  # Match every cross-reference
-            targets = r"~?\.?[\w./: -]+"
+            targets = XREF_TARGET
 
         if isinstance(targets, str):
             targets = [targets]
 
-        targets = f"({'|'.join(targets)})"
-
         if isinstance(domains, str):
             domains = [domains]
 
@@ -904,49 +1436,8 @@ class READMEParser:
             if "py" in domains and self.config.replace_attrs is False:
                 roles.remove("attr")
 
-        roles = "|".join(roles)
-        domains = "|".join(domains)
-
-        xref_pattern = fr"(?<![^\s{BEFORE_XREF}])(:(?:(external(?:\+\w+)?):)?(?:(?:{domains}):)?({roles}):`{targets}`)(?=[\s{AFTER_XREF}]|\Z)"
-        xref_title_pattern = fr"(?<![^\s{BEFORE_XREF}])(:(?:(external(?:\+\w+)?):)?(?:(?:{domains}):)?({roles}):`([^`]+?)\s<{targets}>`)(?=[\s{AFTER_XREF}]|\Z)"
-
-        if xref_type == "regular":
-            return xref_pattern
-        elif xref_type == "title":
-            return xref_title_pattern
-        else:
-            return xref_pattern, xref_title_pattern
-
-    def get_admonition_regex(self, admonition: Dict[str, str]) -> str:
-        """Returns the regex to match a specific admonition directive
-
-        :param admonition: a dict containing admonition data
-        """
-        body = escape_rst(admonition['body']).replace('\n', r'\n\s*')
-        title = escape_rst(admonition['title'])
-
-        if admonition['type'] == 'specific':
-            # For example, .. note:: This is a note
-            pattern = fr"\.\. {admonition['class']}::\n*?\s+"
-
-        else:  # Generic admonition directives with/without class option
-            pattern = rf"\.\. admonition::\s+{title}" + r"\n"
-
-            if cls := admonition['class']:
-                if 'admonition-' not in cls:
-                    pattern += rf"\s+:class: {cls}" + r"\n"
-
-            pattern += r"\n*?\s+"
-
-        if not self.config.raw_directive:
-            # list-table template body uses match group
-            pattern = rf"([ ]*){pattern}({body})(?=\n*(?:\1)?"
-        else:
-            # raw html template body uses string formatting
-            pattern += rf"{body}(?=\n*"
-
-        pattern += r"(?:\S+|\Z))"
-        return pattern
+        # Compiled patterns are cached, since the same xref regex is used by many parsing steps
+        return compile_xref_regex(tuple(domains), tuple(roles), tuple(targets), xref_type)
 
     def get_admonition_icon(self, admonition: dict) -> str:
         """Returns the icon to use for an admonition
@@ -957,3 +1448,14 @@ class READMEParser:
             return icon
         else:
             return self.config.default_admonition_icon
+
+
+def _resolve_source(parser: READMEParser, src: str) -> Tuple[str, Dict[str, List[str]]]:
+    """Resolves a source file in a worker process
+
+    :param parser: the :meth:`worker parser <READMEParser.get_worker_parser>` for the source file
+    :param src: absolute path of the source file
+    :return: the generated output and the substitution definitions used by it
+    """
+    output = parser.resolve_source(src)
+    return output, dict(parser.substitutions[src])
@@ -0,0 +1,156 @@
+import os
+import json
+import uuid
+import hashlib
+from pathlib import Path
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterator, MutableMapping, Union
+
+
+def get_digest(content: Union[str, bytes]) -> str:
+    """Returns the SHA-256 hex digest of a string or bytes
+
+    :param content: the content to hash
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.sha256(content).hexdigest()
+
+
+def write_file(path: Union[str, Path], text: str, encoding: str = 'utf-8') -> bool:
+    """Atomically writes text to a file, but only if the file content would change
+
+    The text is written to a temporary file in the same directory,
+    which then replaces the original file
+
+    :param path: the file to write to
+    :param text: the text to write
+    :param encoding: the encoding to write the text with
+    :return: ``True`` if the file was written, ``False`` if it already had the same content
+    """
+    path = Path(path)
+    data = text.replace('\n', os.linesep).encode(encoding)
+
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass  # File doesn't exist or can't be read
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+
+    try:
+        with open(temp, 'xb') as f:
+            f.write(data)
+        os.replace(temp, path)
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+
+    return True
+
+
+class LRUCache(MutableMapping):
+
+    """Mapping that evicts its least recently used item once it exceeds a maximum size
+
+    Items are marked as used whenever they're set or retrieved. This lets caches
+    in long-running processes, like the :func:`~.watch_readme` loop, stay bounded
+
+    :param maxsize: the maximum number of items to keep
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self._data[key]
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __delitem__(self, key: Hashable) -> None:
+        del self._data[key]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class BuildManifest:
+
+    """Manifest of the fingerprints and output of files generated by previous builds
+
+    If the fingerprint of a source file hasn't changed, and its output file still exists
+    with the same content, the file doesn't need to be generated again
+
+    :param path: the path of the manifest file
+    """
+
+    #: The version of the manifest format
+    version: int = 1
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, str]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, str]]:
+        try:
+            manifest = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(manifest, dict) or manifest.get('version') != self.version:
+            return {}
+
+        return manifest.get('entries', {})
+
+    def is_current(self, src: str, fingerprint: str, out_file: Union[str, Path]) -> bool:
+        """Checks if the output file of a source file is up to date
+
+        :param src: absolute path of the source file
+        :param fingerprint: the current fingerprint of the source file
+        :param out_file: absolute path of the output file
+        """
+        entry = self.entries.get(src)
+
+        if not entry or entry['fingerprint'] != fingerprint or entry['output'] != str(out_file):
+            return False
+
+        try:
+            return get_digest(Path(out_file).read_bytes()) == entry['digest']
+        except OSError:
+            return False
+
+    def update(self, src: str, fingerprint: str, out_file: Union[str, Path]) -> None:
+        """Records the fingerprint and output of a source file
+
+        :param src: absolute path of the source file
+        :param fingerprint: the fingerprint of the source file
+        :param out_file: absolute path of the generated output file
+        """
+        self.entries[src] = {
+            'fingerprint': fingerprint,
+            'output': str(out_file),
+            'digest': get_digest(Path(out_file).read_bytes())
+        }
+
+    def save(self) -> None:
+        """Writes the manifest to its :attr:`path`"""
+        write_file(self.path, json.dumps({
+            'version': self.version,
+            'entries': self.entries
+        }, indent=2, sort_keys=True))
@@ -1,7 +1,11 @@
+import hashlib
+from typing import Tuple
 from docutils import nodes
 from docutils.core import publish_doctree
 from sphinx.application import Sphinx
 
+from sphinx_readme.utils.cache import LRUCache
+
 
 def get_doctree(app: Sphinx, rst: str, docname: str = 'index') -> nodes.document:
     """Generate doctree from a string of reStructuredText using Sphinx application."""
@@ -17,6 +21,45 @@ def get_doctree(app: Sphinx, rst: str, docname: str = 'index') -> nodes.document
         app.env.temp_data.pop('docname', None)
 
 
+class DoctreeCache:
+
+    """Cache of doctrees generated by :func:`get_doctree`, keyed by content hash and docname
+
+    This allows each source file to be parsed once, then shared by every step
+    that needs its doctree. Doctrees should be released once they're no longer needed,
+    but the least recently used ones are also evicted once the cache is full
+
+    :param maxsize: the maximum number of doctrees to keep
+    """
+
+    def __init__(self, maxsize: int = 16):
+        self._doctrees: LRUCache = LRUCache(maxsize)
+
+    def get(self, app: Sphinx, rst: str, docname: str = 'index') -> nodes.document:
+        """Returns the doctree for a string of reStructuredText, generating it if it isn't cached"""
+        key = self._get_key(rst, docname)
+
+        if (doctree := self._doctrees.get(key)) is None:
+            doctree = self._doctrees[key] = get_doctree(app, rst, docname)
+
+        return doctree
+
+    def release(self, rst: str, docname: str = 'index') -> None:
+        """Removes the doctree for a string of reStructuredText from the cache"""
+        self._doctrees.pop(self._get_key(rst, docname), None)
+
+    def clear(self) -> None:
+        """Removes all doctrees from the cache"""
+        self._doctrees.clear()
+
+    def __len__(self) -> int:
+        return len(self._doctrees)
+
+    @staticmethod
+    def _get_key(rst: str, docname: str) -> Tuple[str, str]:
+        return hashlib.sha256(rst.encode('utf-8')).hexdigest(), docname
+
+
 def parse_node_text(node: nodes.Node) -> str:
     """Parses the text from a node, preserving inline literals"""
     parts = []
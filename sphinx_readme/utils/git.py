@@ -1,8 +1,12 @@
+import os
 import re
+import zlib
+import struct
 import subprocess
 from pathlib import Path
 from subprocess import DEVNULL
-from typing import Dict, Optional
+from functools import cached_property, lru_cache
+from typing import Dict, Optional, Tuple, Union
 from sphinx.errors import ExtensionError
 
 
@@ -164,22 +168,9 @@ def get_head() -> str:
 
     :raises RuntimeError: if the most recent commit can't be found
     """
-    cmd = "git log -n1 --pretty=%H"
-    try:
-        # get most recent commit hash
-        head = subprocess.check_output(cmd.split()).strip().decode('utf-8')
-
-        # if head is a tag, use tag as reference
-        cmd = "git describe --exact-match --tags " + head
-        try:
-            tag = subprocess.check_output(cmd.split(" "), stderr=DEVNULL).strip().decode('utf-8')
-            return tag
-
-        except subprocess.CalledProcessError:
-            return head
-
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError("Failed to get head") from e  # so no head?
+    repo = get_repo()
+    head = repo.head
+    return repo.get_tag(head) or head
 
 
 def get_last_tag() -> str:
@@ -187,12 +178,7 @@ def get_last_tag() -> str:
 
     :raises RuntimeError: if there are no tagged commits
     """
-    try:
-        cmd = "git describe --tags --abbrev=0"
-        return subprocess.check_output(cmd.split(" ")).strip().decode('utf-8')
-
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError("No tags exist for the repo") from e
+    return get_repo().last_tag
 
 
 def get_repo_dir() -> Path:
@@ -201,11 +187,339 @@ def get_repo_dir() -> Path:
     :return: A Path object representing the working directory of the repository.
     :raises RuntimeError: if the directory can't be determined
     """
-    try:
-        cmd = "git rev-parse --show-toplevel"
-        repo_dir = Path(subprocess.check_output(cmd.split(" ")).strip().decode('utf-8'))
+    return get_repo().root
+
+
+def get_repo(path: Optional[Union[str, Path]] = None) -> "GitRepo":
+    """Returns the :class:`GitRepo` for a directory, which is only created once per process
+
+    :param path: a directory in the repository; defaults to the current working directory
+    """
+    return _get_repo(Path(path or os.getcwd()).resolve())
+
+
+@lru_cache(maxsize=16)
+def _get_repo(path: Path) -> "GitRepo":
+    return GitRepo(path)
+
+
+def clear_repo_cache() -> None:
+    """Discards the :class:`GitRepo` objects created by :func:`get_repo`, so that repositories are read again"""
+    _get_repo.cache_clear()
+
+
+class GitRepo:
+
+    """Repository metadata, read from the ``.git`` directory without running ``git``
+
+    Each value is computed the first time it's accessed, then cached. The ``git``
+    command line is only used when the metadata can't be determined from the files,
+    for example if objects are packed or several tags point to the same commit
+
+    :param path: a directory in the repository
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    @cached_property
+    def git_dir(self) -> Optional[Path]:
+        """The ``.git`` directory of the repository, or ``None`` if it can't be found
+
+        For worktrees and submodules, this is the directory that the ``.git`` file points to
+        """
+        if os.environ.get("GIT_DIR") or os.environ.get("GIT_WORK_TREE"):
+            return None  # Let git handle the environment overrides
+
+        for directory in (self.path, *self.path.parents):
+            git = directory / ".git"
+
+            if git.is_dir():
+                return git
+
+            if git.is_file():
+                content = git.read_text(encoding="utf-8").strip()
+
+                if content.startswith("gitdir:"):
+                    return (directory / content.removeprefix("gitdir:").strip()).resolve()
+                return None
+
+        return None
+
+    @cached_property
+    def common_dir(self) -> Optional[Path]:
+        """The directory containing the refs and objects shared by all worktrees"""
+        if self.git_dir is None:
+            return None
+
+        if (commondir := self.git_dir / "commondir").is_file():
+            return (self.git_dir / commondir.read_text(encoding="utf-8").strip()).resolve()
+
+        return self.git_dir
+
+    @cached_property
+    def root(self) -> Path:
+        """The root directory of the repository's working tree
+
+        :raises RuntimeError: if the directory can't be determined
+        """
+        if self.git_dir is not None:
+            for directory in (self.path, *self.path.parents):
+                if (directory / ".git").exists():
+                    return directory
+        try:
+            return Path(self._run("git rev-parse --show-toplevel"))
+
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError("Unable to determine the repository directory") from e
+
+    @cached_property
+    def head(self) -> str:
+        """The hash of the most recent commit
+
+        :raises RuntimeError: if the most recent commit can't be found
+        """
+        if self.git_dir is not None:
+            if head := self.read_ref("HEAD"):
+                return head
+        try:
+            return self._run("git log -n1 --pretty=%H")
+
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError("Failed to get head") from e  # so no head?
+
+    @cached_property
+    def tags(self) -> Optional[Dict[str, Optional[str]]]:
+        """Mapping of tag names to the hash of the commit they point to
+
+        A hash is ``None`` if the tag object couldn't be read. If the
+        ``.git`` directory can't be found, the mapping is ``None``
+        """
+        if self.common_dir is None:
+            return None
+
+        tags = {}
+
+        for ref, (sha, peeled) in self.packed_refs.items():
+            if ref.startswith("refs/tags/"):
+                tags[ref.removeprefix("refs/tags/")] = peeled or self._peel(sha)
+
+        tag_dir = self.common_dir / "refs" / "tags"
+
+        for file in (tag_dir.rglob("*") if tag_dir.is_dir() else ()):
+            if file.is_file():
+                sha = file.read_text(encoding="utf-8").strip()
+                tags[file.relative_to(tag_dir).as_posix()] = self._peel(sha)
+
+        return tags
+
+    @cached_property
+    def last_tag(self) -> str:
+        """The most recent tag that's reachable from the most recent commit
+
+        :raises RuntimeError: if there are no tagged commits
+        """
+        if self.tags == {}:
+            raise RuntimeError("No tags exist for the repo")
+
+        if self.tags is not None and (tag := self.get_tag(self.head)):
+            return tag
+        try:
+            return self._run("git describe --tags --abbrev=0")
+
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError("No tags exist for the repo") from e
+
+    def get_tag(self, commit: str) -> Optional[str]:
+        """Returns the tag that points to a commit, if there is one
+
+        :param commit: the hash of the commit
+        """
+        if self.tags is not None and None not in self.tags.values():
+            matches = [tag for tag, sha in self.tags.items() if sha == commit]
+
+            if len(matches) < 2:
+                return matches[0] if matches else None
+        try:
+            return self._run(f"git describe --exact-match --tags {commit}", stderr=DEVNULL)
+
+        except subprocess.CalledProcessError:
+            return None
+
+    def read_ref(self, ref: str) -> Optional[str]:
+        """Resolves a ref (like ``HEAD`` or ``refs/heads/main``) to a commit hash, following symbolic refs
+
+        :param ref: the name of the ref
+        :return: the hash, or ``None`` if the ref can't be resolved from the ``.git`` directory
+        """
+        for _ in range(10):  # Limit the depth of symbolic refs
+            for directory in dict.fromkeys((self.git_dir, self.common_dir)):
+                if (file := directory / ref).is_file():
+                    content = file.read_text(encoding="utf-8").strip()
+                    break
+            else:
+                return self.packed_refs.get(ref, (None,))[0]
+
+            if not content.startswith("ref:"):
+                return content if is_object_id(content) else None
+
+            ref = content.removeprefix("ref:").strip()
+
+        return None
+
+    @cached_property
+    def packed_refs(self) -> Dict[str, Tuple[str, Optional[str]]]:
+        """Mapping of refs in the ``packed-refs`` file to their hash and peeled commit hash
+
+        The peeled hash is ``None`` unless the file specifies it
+        """
+        refs = {}
+
+        if not (file := self.common_dir / "packed-refs").is_file():
+            return refs
+
+        lines = file.read_text(encoding="utf-8").splitlines()
+        fully_peeled = bool(lines) and "fully-peeled" in lines[0]
+        ref = None
+
+        for line in lines:
+            if line.startswith("#") or not line.strip():
+                continue
+
+            if line.startswith("^"):  # Commit that the previous tag points to
+                refs[ref] = (refs[ref][0], line[1:].strip())
+                continue
+
+            sha, ref = line.split(maxsplit=1)
+            # If refs are fully peeled, those without a peeled line aren't tag objects
+            refs[ref] = (sha, sha if fully_peeled else None)
+
+        return refs
+
+    def _peel(self, sha: str) -> Optional[str]:
+        """Follows annotated tag objects to the commit they point to
+
+        :param sha: the hash of a commit or tag object
+        :return: the hash of the commit, or ``None`` if an object can't be read
+        """
+        for _ in range(10):  # Limit the depth of nested tags
+            if (obj := self._read_object(sha)) is None:
+                return None
+
+            obj_type, content = obj
+
+            if obj_type != b"tag":
+                return sha
+
+            if not (match := re.match(rb"object ([0-9a-f]+)", content)):
+                return None
+
+            sha = match.group(1).decode()
+
+        return None
+
+    def _read_object(self, sha: str) -> Optional[Tuple[bytes, bytes]]:
+        """Reads the type and content of an object
+
+        :return: the object type and content, or ``None`` if the object can't be read
+        """
+        file = self.common_dir / "objects" / sha[:2] / sha[2:]
+        try:
+            data = zlib.decompress(file.read_bytes())
+        except (OSError, zlib.error):
+            return self._read_packed_object(sha)
+
+        header, _, content = data.partition(b"\0")
+        return header.split(b" ")[0], content
+
+    def _read_packed_object(self, sha: str) -> Optional[Tuple[bytes, bytes]]:
+        """Reads the type and content of an object from a packfile, using its version 2 ``.idx`` file
+
+        .. note:: Deltified objects aren't supported, since tags and commits are rarely stored as deltas
+
+        :return: the object type and content, or ``None`` if the object can't be read
+        """
+        if not is_object_id(sha) or len(sha) != 40:
+            return None
+
+        obj_id = bytes.fromhex(sha)
+
+        for idx in (self.common_dir / "objects" / "pack").glob("*.idx"):
+            try:
+                if (offset := _find_pack_offset(idx, obj_id)) is None:
+                    continue
+
+                with open(idx.with_suffix(".pack"), "rb") as f:
+                    f.seek(offset)
+                    data = f.read(1024)
+                    byte = data[0]
+                    obj_type = PACK_OBJECT_TYPES.get((byte >> 4) & 7)
+                    pos = 1
+
+                    while byte & 0x80:  # Skip the variable length size
+                        byte = data[pos]
+                        pos += 1
+
+                    if obj_type is None:
+                        return None
+
+                    if obj_type == b"commit":  # Only the type is needed
+                        return obj_type, b""
+
+                    decompressor = zlib.decompressobj()
+                    content = decompressor.decompress(data[pos:])
+
+                    while not decompressor.eof and (chunk := f.read(4096)):
+                        content += decompressor.decompress(chunk)
+
+                    return obj_type, content
+
+            except (OSError, IndexError, zlib.error):
+                return None
+
+        return None
+
+    def _run(self, cmd: str, **kwargs) -> str:
+        return subprocess.check_output(cmd.split(" "), cwd=self.path, **kwargs).strip().decode('utf-8')
+
+
+#: Object types in packfiles, excluding deltas
+PACK_OBJECT_TYPES = {1: b"commit", 2: b"tree", 3: b"blob", 4: b"tag"}
+
+
+def _find_pack_offset(idx: Path, obj_id: bytes) -> Optional[int]:
+    """Binary searches a version 2 pack ``.idx`` file for the offset of an object in its packfile"""
+    with open(idx, "rb") as f:
+        if f.read(8) != b"\xfftOc\x00\x00\x00\x02":
+            return None
+
+        fanout = struct.unpack(">256I", f.read(1024))
+        total = fanout[-1]
+        lo = fanout[obj_id[0] - 1] if obj_id[0] else 0
+        hi = fanout[obj_id[0]]
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            f.seek(1032 + mid * 20)
+
+            if (current := f.read(20)) == obj_id:
+                f.seek(1032 + total * 24 + mid * 4)  # Skip object ids and CRCs
+                offset, = struct.unpack(">I", f.read(4))
+
+                if offset & 0x80000000:  # Index into the table of large offsets
+                    f.seek(1032 + total * 28 + (offset & 0x7FFFFFFF) * 8)
+                    offset, = struct.unpack(">Q", f.read(8))
+
+                return offset
+
+            if current < obj_id:
+                lo = mid + 1
+            else:
+                hi = mid
+
+    return None
 
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError("Unable to determine the repository directory") from e
 
-    return repo_dir
+def is_object_id(value: str) -> bool:
+    """Checks if a string is a SHA-1 or SHA-256 object hash"""
+    return bool(re.fullmatch(r"[0-9a-f]{40}|[0-9a-f]{64}", value))
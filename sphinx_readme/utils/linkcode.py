@@ -1,13 +1,17 @@
 import os
+import ast
 import sys
+import importlib
+import json
 import inspect
 from pathlib import Path
-from functools import cached_property
+from functools import cached_property, lru_cache
 
-from typing import Dict, Optional, Callable
+from typing import Dict, List, Optional, Callable, Tuple, Union
 from sphinx.errors import ExtensionError
 
 from sphinx_readme.utils.git import get_repo_url, get_blob_url, get_repo_dir
+from sphinx_readme.utils.cache import get_digest, write_file
 from sphinx_readme.utils.sphinx import logger
 
 
@@ -68,7 +72,10 @@ def get_linkcode_resolve(linkcode_url: str) -> Callable:
 
         submod = sys.modules.get(modname)
         if submod is None:
-            return None
+            try:  # Modules are only imported by reader processes in parallel builds
+                submod = importlib.import_module(modname)
+            except Exception:
+                return None
 
         obj = submod
         for part in fullname.split('.'):
@@ -83,19 +90,18 @@ def get_linkcode_resolve(linkcode_url: str) -> Callable:
             obj = obj.func
 
         try:
-            modpath = inspect.getsourcefile(inspect.unwrap(obj))
+            obj = inspect.unwrap(obj)
+            modpath = inspect.getsourcefile(obj)
             filepath = Path(modpath).relative_to(repo_dir)
             if filepath is None:
                 return
         except Exception:
             return None
 
-        try:
-            source, lineno = inspect.getsourcelines(obj)
-        except Exception:
+        if not (lines := get_source_lines(obj, modpath)):
             return None
 
-        linestart, linestop = lineno, lineno + len(source) - 1
+        linestart, linestop = lines
 
         # Example: https://github.com/TDKorn/my-magento/blob/docs/magento/models/model.py#L28-L59
         final_link = linkcode_url.format(
@@ -107,3 +113,474 @@ def get_linkcode_resolve(linkcode_url: str) -> Callable:
         return final_link
 
     return linkcode_resolve
+
+
+def get_source_lines(obj: object, modpath: str) -> Optional[Tuple[int, int]]:
+    """Returns the first and last line of an object's source code
+
+    The lines are looked up by qualified name in the :func:`get_line_spans` of the module file,
+    which is only parsed once. If the object isn't found there, or if the name is defined more than
+    once and the definition can't be identified, :func:`inspect.getsourcelines` is used instead
+
+    :param obj: the unwrapped function, method, or class
+    :param modpath: the path of the module file that defines the object
+    """
+    qualname = getattr(obj, "__qualname__", None)
+    spans = get_line_spans(modpath).get(qualname, []) if isinstance(qualname, str) else []
+
+    if code := getattr(obj, "__code__", None):
+        # Functions can be matched to their definition by first line
+        spans = [span for span in spans if span[0] == code.co_firstlineno]
+
+    if len(spans) == 1:
+        return spans[0]
+
+    try:
+        source, lineno = inspect.getsourcelines(obj)
+    except Exception:
+        return None
+
+    return lineno, lineno + len(source) - 1
+
+
+def get_line_spans(modpath: Union[str, Path]) -> Dict[str, List[Tuple[int, int]]]:
+    """Returns a mapping of qualified names to the line spans of their definitions in a module file
+
+    The index includes classes, functions and methods (including properties). Each span
+    contains the first and last line of a definition, starting from its first decorator.
+    Results are cached until the file is modified
+
+    :param modpath: the path of the module file
+    """
+    return get_module_index(modpath).spans
+
+
+def get_module_index(modpath: Union[str, Path]) -> "ModuleIndex":
+    """Returns the :class:`ModuleIndex` of a module file, which is cached until the file is modified
+
+    :param modpath: the path of the module file
+    """
+    try:
+        mtime = os.stat(modpath).st_mtime_ns
+    except OSError:
+        return ModuleIndex()
+
+    return _parse_module(str(modpath), mtime)
+
+
+class ModuleIndex:
+
+    """Index of the definitions and module-level imports in a module file
+
+    :param spans: mapping of qualified names to the line spans of their definitions
+    :param imports: mapping of imported names to the level, module, and name of the import
+       (the name is ``None`` for ``import module`` statements)
+    :param star_imports: the level and module of each ``from module import *`` statement
+    :param num_lines: the number of lines in the file
+    """
+
+    def __init__(
+            self,
+            spans: Optional[Dict[str, List[Tuple[int, int]]]] = None,
+            imports: Optional[Dict[str, Tuple[int, str, Optional[str]]]] = None,
+            star_imports: Optional[List[Tuple[int, str]]] = None,
+            num_lines: int = 0
+    ):
+        self.spans = spans or {}
+        self.imports = imports or {}
+        self.star_imports = star_imports or []
+        self.num_lines = num_lines
+
+
+@lru_cache(maxsize=256)
+def _parse_module(modpath: str, mtime: int) -> ModuleIndex:
+    try:
+        with open(modpath, "rb") as f:
+            source = f.read()
+        tree = ast.parse(source, filename=modpath)
+    except (OSError, SyntaxError, ValueError):
+        return ModuleIndex()
+
+    index = ModuleIndex(num_lines=len(source.splitlines()))
+    lines = source.decode("utf-8", errors="replace").splitlines()
+    _add_line_spans(tree, "", index.spans, lines)
+    _add_imports(tree, index)
+    return index
+
+
+def _add_imports(node: ast.AST, index: ModuleIndex) -> None:
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, ast.ImportFrom):
+            for alias in child.names:
+                if alias.name == "*":
+                    index.star_imports.append((child.level, child.module or ""))
+                else:
+                    index.imports[alias.asname or alias.name] = (child.level, child.module or "", alias.name)
+
+        elif isinstance(child, ast.Import):
+            for alias in child.names:
+                if alias.asname:
+                    index.imports[alias.asname] = (0, alias.name, None)
+                else:  # Binds the top-level package
+                    name = alias.name.split(".")[0]
+                    index.imports[name] = (0, name, None)
+
+        elif isinstance(child, (ast.If, ast.Try, ast.With)):
+            # Imports in if/try/with blocks are still at module level
+            _add_imports(child, index)
+
+
+def _add_line_spans(node: ast.AST, prefix: str, spans: Dict[str, List[Tuple[int, int]]], lines: List[str]) -> None:
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            qualname = prefix + child.name
+
+            # Overload stubs aren't the definition, and property setters/deleters don't replace the getter
+            if not (_is_overload(child) or qualname in spans and _is_property_accessor(child)):
+                start = min([child.lineno, *(decorator.lineno for decorator in child.decorator_list)])
+                stop = _get_block_end(child, lines)
+                spans.setdefault(qualname, []).append((start, stop))
+
+            if isinstance(child, ast.ClassDef):
+                _add_line_spans(child, qualname + ".", spans, lines)
+            else:
+                _add_line_spans(child, qualname + ".<locals>.", spans, lines)
+
+        elif not isinstance(child, (ast.expr, ast.Lambda)):
+            # Definitions in if/try/with blocks have the same qualified name
+            _add_line_spans(child, prefix, spans, lines)
+
+
+def _get_block_end(node: Union[ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef], lines: List[str]) -> int:
+    """Returns the last line of a definition, including trailing comments indented like its body
+
+    This matches the block found by :func:`inspect.getsourcelines`
+    """
+    stop = node.end_lineno
+    body_col = node.body[0].col_offset
+
+    for lineno in range(node.end_lineno + 1, len(lines) + 1):
+        line = lines[lineno - 1]
+
+        if not (stripped := line.lstrip()):
+            continue
+
+        if not stripped.startswith("#") or len(line) - len(stripped) < body_col:
+            break
+
+        stop = lineno
+
+    return stop
+
+
+def _is_overload(node: Union[ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef]) -> bool:
+    return any(
+        getattr(decorator, "id", getattr(decorator, "attr", None)) == "overload"
+        for decorator in node.decorator_list
+    )
+
+
+def _is_property_accessor(node: Union[ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef]) -> bool:
+    return any(
+        isinstance(decorator, ast.Attribute) and decorator.attr in ("setter", "deleter")
+        for decorator in node.decorator_list
+    )
+
+
+def get_static_linkcode_resolve(linkcode_url: str) -> Callable:
+    """Defines and returns a ``linkcode_resolve()`` function that doesn't import your package
+
+    Instead of inspecting the imported objects, modules are located on :data:`sys.path`
+    and the source lines of objects are found with :func:`get_static_source`
+
+    :param linkcode_url: the template URL for linking to source code (see :meth:`~get_linkcode_url`)
+    """
+    repo_dir = get_repo_dir()
+
+    def linkcode_resolve(domain, info):
+        """Returns a link to the source code of an object, with the appropriate lines highlighted"""
+        if domain != 'py' or not info['module']:
+            return None
+
+        fullname = info['fullname']
+        search_paths = _get_search_paths(tuple(sys.path))
+
+        if not (source := get_static_source(info['module'], fullname, search_paths)):
+            return None
+
+        modpath, linestart, linestop = source
+
+        try:
+            filepath = modpath.relative_to(repo_dir)
+        except ValueError:
+            return None
+
+        final_link = linkcode_url.format(
+            filepath=filepath.as_posix(),
+            linestart=linestart,
+            linestop=linestop
+        )
+        logger.debug(f"Final Link for {fullname}: {final_link}")
+        return final_link
+
+    return linkcode_resolve
+
+
+def get_static_source(module: str, fullname: str, search_paths: Tuple[Path, ...]) -> Optional[Tuple[Path, int, int]]:
+    """Finds the file and line span that define an object, without importing it
+
+    If the object isn't defined in the module, it's looked up through
+
+    * names imported by the module, which includes re-exports from a package's ``__init__.py``
+    * submodules of the package
+    * modules imported with ``from module import *``
+
+    :param module: the name of the module containing the object
+    :param fullname: the qualified name of the object in the module; an empty string for the module itself
+    :param search_paths: the directories to search for modules in
+    :return: the path of the file, and the first and last line of the object's definition
+    """
+    return _get_static_source(module, fullname, search_paths, frozenset())
+
+
+def _get_static_source(module: str, fullname: str, search_paths: Tuple[Path, ...], seen: frozenset) -> Optional[Tuple[Path, int, int]]:
+    if (module, fullname) in seen:
+        return None
+
+    seen = seen | {(module, fullname)}
+    modpath = find_module_file(module, search_paths)
+    index = get_module_index(modpath) if modpath else ModuleIndex()
+
+    if not fullname:
+        return (modpath, 1, index.num_lines) if modpath else None
+
+    if spans := index.spans.get(fullname):
+        return modpath, *spans[0]
+
+    head, _, rest = fullname.partition(".")
+    candidates = []
+
+    if head in index.imports:
+        level, source, name = index.imports[head]
+        source = _resolve_import(module, modpath, level, source)
+
+        if name is None:
+            candidates.append((source, rest))
+        else:
+            candidates.append((source, f"{name}.{rest}".rstrip(".")))
+
+    # Attributes of a package can also be its submodules
+    candidates.append((f"{module}.{head}", rest))
+
+    for level, source in index.star_imports:
+        candidates.append((_resolve_import(module, modpath, level, source), fullname))
+
+    for candidate in candidates:
+        if result := _get_static_source(*candidate, search_paths, seen):
+            return result
+
+    return None
+
+
+def _resolve_import(module: str, modpath: Optional[Path], level: int, source: str) -> str:
+    """Returns the absolute name of the module in an import statement"""
+    if not level:
+        return source
+
+    package = module if modpath and modpath.name == "__init__.py" else module.rpartition(".")[0]
+    parts = package.split(".")
+
+    if level > 1:
+        parts = parts[:-(level - 1)]
+
+    return ".".join(filter(None, (*parts, source)))
+
+
+@lru_cache(maxsize=1024)
+def find_module_file(module: str, search_paths: Tuple[Path, ...]) -> Optional[Path]:
+    """Finds the source file of a module without importing it
+
+    :param module: the full name of the module
+    :param search_paths: the directories to search for the module in
+    :return: the path of the module or package ``__init__.py`` file, if found
+    """
+    parts = module.split(".")
+
+    for directory in search_paths:
+        path = directory.joinpath(*parts)
+
+        if (init := path / "__init__.py").is_file():
+            return init
+
+        if (file := path.with_name(path.name + ".py")).is_file():
+            return file
+
+    return None
+
+
+@lru_cache(maxsize=8)
+def _get_search_paths(sys_path: Tuple[str, ...]) -> Tuple[Path, ...]:
+    return tuple(dict.fromkeys(Path(path or os.getcwd()).resolve() for path in sys_path))
+
+
+def get_module_file(module: str) -> Optional[Path]:
+    """Returns the source file of a module, preferring the file of the imported module if it's loaded
+
+    :param module: the full name of the module
+    """
+    if modfile := getattr(sys.modules.get(module), "__file__", None):
+        return Path(modfile).resolve()
+
+    return find_module_file(module, _get_search_paths(tuple(sys.path)))
+
+
+class LinkcodeCache:
+
+    """Persistent cache of the links resolved by a ``linkcode_resolve()`` function
+
+    Each link is stored relative to the blob URL, along with the module file and linked file
+    that it depends on. Cached links are reused until either file is modified, which is detected
+    by its mtime and, if that changed, the hash of its content. If the :confval:`readme_blob` changes,
+    cached links are rewritten with the new blob URL, without needing to be resolved again.
+    Objects that can't be resolved aren't cached, so they're resolved again on every build
+
+    :param path: the path of the cache file
+    :param blob_url: the base URL for the current blob of the repository
+    :param resolver: identifies the ``linkcode_resolve()`` function that the links are resolved by
+    :param repo_dir: the root directory of the repository, which links are relative to
+    """
+
+    #: The version of the cache format
+    version: int = 1
+
+    def __init__(self, path: Union[str, Path], blob_url: str, resolver: str, repo_dir: Optional[Path] = None):
+        self.path = Path(path)
+        self.blob_url = blob_url.rstrip("/")
+        self.repo_dir = Path(repo_dir or get_repo_dir())
+        self.key = {"resolver": resolver, "repo_dir": str(self.repo_dir)}
+        #: Mapping of files to their mtime and content hash when links were resolved
+        self.files: Dict[str, Dict] = {}
+        #: Mapping of ``"module:fullname"`` to cached links and the files they depend on
+        self.entries: Dict[str, Dict] = {}
+        self._load()
+        self._current: Dict[str, bool] = {}
+        self._stamps: Dict[Path, Optional[Dict]] = {}
+        self._used: Dict[str, Dict] = {}
+
+    def _load(self) -> None:
+        try:
+            cache = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+
+        if not isinstance(cache, dict) or cache.get("version") != self.version or cache.get("key") != self.key:
+            return
+
+        self.files = cache.get("files", {})
+        self.entries = cache.get("entries", {})
+
+    def wrap(self, linkcode_resolve: Callable) -> Callable:
+        """Returns a ``linkcode_resolve()`` function that uses the cache
+
+        :param linkcode_resolve: the function to resolve links that aren't cached
+        """
+        def cached_linkcode_resolve(domain, info):
+            return self.resolve(linkcode_resolve, domain, info)
+
+        return cached_linkcode_resolve
+
+    def resolve(self, linkcode_resolve: Callable, domain: str, info: Dict) -> Optional[str]:
+        """Returns the cached link for an object, or resolves and caches it if needed
+
+        :param linkcode_resolve: the function to resolve links that aren't cached
+        :param domain: the domain of the object
+        :param info: the ``module`` and ``fullname`` of the object
+        """
+        if domain != "py" or not info.get("module"):
+            return linkcode_resolve(domain, info)
+
+        name = f"{info['module']}:{info['fullname']}"
+        entry = self.entries.get(name)
+
+        if entry is None or not all(map(self.is_current, entry["files"])):
+            link = linkcode_resolve(domain, info)
+
+            if (entry := self._get_entry(info["module"], link)) is None:
+                return link  # Can't be cached
+
+        self._used[name] = entry
+        return self.blob_url + entry["link"]
+
+    def _get_entry(self, module: str, link: Optional[str]) -> Optional[Dict]:
+        files = [get_module_file(module)]
+
+        if link is None:  # Resolution may only fail temporarily, like before the module is imported
+            return None
+
+        if link.startswith(self.blob_url + "/"):
+            suffix = link[len(self.blob_url):]
+            filepath = suffix[1:].split("#")[0]
+            files.append(self.repo_dir / filepath)
+
+        else:  # Link isn't to the repository
+            return None
+
+        if None in files:
+            return None
+
+        for file in (files := list(dict.fromkeys(files))):
+            if (stamp := self._get_stamp(file)) is None:
+                return None
+
+            self.files[str(file)] = stamp
+
+        return {"link": suffix, "files": [str(file) for file in files]}
+
+    def _get_stamp(self, file: Path) -> Optional[Dict]:
+        if file not in self._stamps:
+            try:
+                self._stamps[file] = {
+                    "mtime": os.stat(file).st_mtime_ns,
+                    "digest": get_digest(file.read_bytes())
+                }
+            except OSError:
+                self._stamps[file] = None
+
+        return self._stamps[file]
+
+    def is_current(self, file: str) -> bool:
+        """Checks if a file is unchanged since the links that depend on it were resolved
+
+        :param file: the path of the file
+        """
+        if file in self._current:
+            return self._current[file]
+
+        stamp = self.files.get(file)
+
+        try:
+            mtime = os.stat(file).st_mtime_ns
+        except OSError:
+            stamp = None
+
+        if stamp is None:
+            current = False
+
+        elif stamp["mtime"] == mtime:
+            current = True
+
+        elif current := get_digest(Path(file).read_bytes()) == stamp["digest"]:
+            stamp["mtime"] = mtime  # Content is the same
+
+        self._current[file] = current
+        return current
+
+    def save(self) -> None:
+        """Writes the links that were used to the cache file, discarding any others"""
+        files = {file for entry in self._used.values() for file in entry["files"]}
+        write_file(self.path, json.dumps({
+            "version": self.version,
+            "key": self.key,
+            "files": {file: self.files[file] for file in files},
+            "entries": self._used
+        }, indent=2, sort_keys=True))
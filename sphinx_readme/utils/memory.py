@@ -0,0 +1,234 @@
+import sys
+import json
+import types
+import inspect
+import functools
+import tracemalloc
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from sphinx_readme.utils.cache import write_file
+
+
+#: Attributes that refer back to a parent or to shared application state, which aren't followed by :func:`get_deep_size`
+SKIPPED_ATTRS = frozenset({
+    'parent', 'document', 'settings', 'reporter', 'transformer',
+    'app', 'env', 'config', 'logger', 'profiler', 'memory_report'
+})
+
+#: Types which aren't counted by :func:`get_deep_size`
+SKIPPED_TYPES = (type, types.ModuleType, types.FunctionType, types.MethodType, types.BuiltinFunctionType)
+
+#: Filters to exclude allocations made by :mod:`tracemalloc` and the import system from snapshots
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def get_deep_size(obj: Any) -> int:
+    """Returns the size of an object and every object it references, in bytes
+
+    Each object is only counted once. Classes, modules and functions aren't counted,
+    and attributes in :data:`SKIPPED_ATTRS` aren't followed, so that a doctree node
+    doesn't count its whole document, or the |env| it refers to
+
+    :param obj: the object to measure
+    """
+    seen = set()
+    stack = [obj]
+    size = 0
+
+    while stack:
+        obj = stack.pop()
+
+        if id(obj) in seen or isinstance(obj, SKIPPED_TYPES):
+            continue
+
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+
+        if isinstance(obj, (str, bytes, int, float)):
+            continue
+
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+
+        else:
+            if (attrs := getattr(obj, '__dict__', None)) is not None:
+                seen.add(id(attrs))
+                size += sys.getsizeof(attrs)
+                stack.extend(value for name, value in attrs.items() if name not in SKIPPED_ATTRS)
+
+            for cls in type(obj).__mro__:
+                for name in getattr(cls, '__slots__', ()):
+                    if name not in SKIPPED_ATTRS and hasattr(obj, name):
+                        stack.append(getattr(obj, name))
+
+    return size
+
+
+class MemoryReport:
+
+    """Takes :mod:`tracemalloc` snapshots around phases of generating README files
+
+    For each phase, the memory that's still allocated after the phase (retained),
+    the peak memory used during the phase, and the lines of code which retained the most
+    memory are recorded. Tracing starts with the first phase and stops when the report is
+    :meth:`reset`, unless it was already started elsewhere, like with ``python -X tracemalloc``
+
+    .. caution:: Tracing memory allocations slows down the whole build considerably
+
+    :param enabled: specifies if snapshots should be taken
+    :param limit: the number of allocation sites to record for each phase
+    """
+
+    #: The version of the report format
+    version: int = 1
+
+    def __init__(self, enabled: bool = False, limit: int = 10):
+        self.enabled = enabled
+        self.limit = limit
+        #: The recorded phases, in the order they finished
+        self.phases: List[Dict[str, Any]] = []
+        self._started = False
+
+    @contextmanager
+    def phase(self, name: str, docname: Optional[str] = None) -> Iterator[None]:
+        """Context manager that takes a snapshot before and after the code it runs
+
+        :param name: the name of the phase
+        :param docname: the document that the phase is for, if any
+        """
+        if not self.enabled:
+            yield
+            return
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+
+        before = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+        try:
+            yield
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+            stats = after.compare_to(before, 'lineno')
+
+            self.phases.append({
+                'phase': name,
+                'docname': docname,
+                'retained': sum(stat.size_diff for stat in stats),
+                'peak': peak - start,
+                'top': [
+                    {
+                        'file': stat.traceback[0].filename,
+                        'line': stat.traceback[0].lineno,
+                        'size': stat.size_diff,
+                        'count': stat.count_diff
+                    } for stat in stats[:self.limit] if stat.size_diff > 0
+                ]
+            })
+
+    def get_report(self, structures: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Returns the recorded phases, along with the size of each data structure
+
+        :param structures: mapping of names to the data structures to measure with :func:`get_deep_size`
+        """
+        sizes = {name: get_deep_size(obj) for name, obj in (structures or {}).items()}
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            'version': self.version,
+            'traced': {'current': current, 'peak': peak},
+            'structures': dict(sorted(sizes.items(), key=lambda item: -item[1])),
+            'phases': self.phases
+        }
+
+    def write(self, build_dir: Union[str, Path], structures: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Writes the :meth:`report <get_report>` to ``readme_memory.json`` in the build directory
+
+        :param build_dir: the build directory
+        :param structures: mapping of names to the data structures to measure with :func:`get_deep_size`
+        :return: the report
+        """
+        report = self.get_report(structures)
+        write_file(Path(build_dir) / "readme_memory.json", json.dumps(report, indent=2))
+        return report
+
+    @staticmethod
+    def get_summary(report: Dict[str, Any], limit: int = 5) -> str:
+        """Formats the size of the largest data structures and the memory used by each phase as text
+
+        :param report: the report to summarize
+        :param limit: the maximum number of data structures and allocation sites to include
+        """
+        lines = [f"``sphinx_readme``: memory report (peak traced: {format_size(report['traced']['peak'])})"]
+        lines += [
+            f"    {name:<28}{format_size(size):>12}"
+            for name, size in list(report['structures'].items())[:limit]
+        ]
+        for phase in report['phases']:
+            name = f"{phase['phase']} ({phase['docname']})" if phase['docname'] else phase['phase']
+            lines.append(f"    {name:<28}{format_size(phase['retained']):>12} retained{format_size(phase['peak']):>12} peak")
+
+        if report['phases'] and (top := max(report['phases'], key=lambda phase: phase['peak'])['top']):
+            lines.append("    Top allocation sites of the phase with the highest peak:")
+            lines += [
+                f"        {site['file']}:{site['line']}: {format_size(site['size'])}"
+                for site in top[:limit]
+            ]
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        """Discards all recorded phases, and stops tracing if the report started it"""
+        self.phases.clear()
+
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+
+def format_size(size: int) -> str:
+    """Formats a number of bytes as a human readable string
+
+    >>> format_size(123456)
+    '120.6 KiB'
+
+    :param size: the number of bytes
+    """
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} B"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def traced(method: Callable) -> Callable:
+    """Decorator that takes memory snapshots around each call to a method of the :class:`~.READMEParser`
+
+    If the method has a ``docname`` parameter, its value is recorded with the phase
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.memory_report.enabled:
+            return method(self, *args, **kwargs)
+
+        docname = signature.bind(self, *args, **kwargs).arguments.get('docname')
+
+        with self.memory_report.phase(method.__name__, docname):
+            return method(self, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,196 @@
+import os
+import json
+import time
+import functools
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from sphinx_readme.utils.cache import write_file
+
+
+class Profiler:
+
+    """Records the wall time, call counts and counters of each phase of generating README files
+
+    Phases are recorded overall and for each source file. If the profiler isn't enabled,
+    nothing is recorded and the overhead is a single attribute check per phase
+
+    :param enabled: specifies if phases and counters should be recorded
+    """
+
+    #: The version of the report format
+    version: int = 1
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        #: Mapping of phases to their total time in seconds and number of calls
+        self.phases: Dict[str, Dict[str, Union[float, int]]] = {}
+        #: Mapping of counters to their values
+        self.counters: Dict[str, int] = {}
+        #: Mapping of source files to the time of each phase and their counters
+        self.sources: Dict[str, Dict[str, Dict]] = {}
+        #: Completed phases in the Chrome trace event format
+        self.events: List[Dict[str, Any]] = []
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str, src: Optional[str] = None) -> Iterator[None]:
+        """Context manager that records the code it runs as a phase
+
+        :param name: the name of the phase
+        :param src: the source file that the phase is for, if any
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            phase = self.phases.setdefault(name, {'time': 0.0, 'calls': 0})
+            phase['time'] += elapsed
+            phase['calls'] += 1
+
+            if src is not None:
+                phases = self._get_source(src)['phases']
+                phases[name] = phases.get(name, 0.0) + elapsed
+
+            self.events.append({
+                'name': name,
+                'cat': 'sphinx_readme',
+                'ph': 'X',
+                'ts': round((start - self._start) * 1e6, 3),
+                'dur': round(elapsed * 1e6, 3),
+                'pid': os.getpid(),
+                'tid': threading.get_ident(),
+                'args': {'source': src} if src else {}
+            })
+
+    def wrap(self, func: Callable, name: Optional[str] = None) -> Callable:
+        """Wraps a function to record each call to it as a phase
+
+        :param func: the function to wrap
+        :param name: the name of the phase (default: the name of the function)
+        :return: the wrapped function, or ``func`` itself if the profiler isn't enabled
+        """
+        if not self.enabled or func is None:
+            return func
+
+        name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def count(self, name: str, value: int = 1, src: Optional[str] = None) -> None:
+        """Increments a counter
+
+        :param name: the name of the counter
+        :param value: the amount to increment the counter by
+        :param src: the source file to also increment the counter for, if any
+        """
+        if not self.enabled:
+            return
+
+        self.counters[name] = self.counters.get(name, 0) + value
+
+        if src is not None:
+            counters = self._get_source(src)['counters']
+            counters[name] = counters.get(name, 0) + value
+
+    def set(self, name: str, value: int) -> None:
+        """Sets the value of a counter, like the size of a data structure
+
+        :param name: the name of the counter
+        :param value: the value to set
+        """
+        if self.enabled:
+            self.counters[name] = value
+
+    def _get_source(self, src: str) -> Dict[str, Dict]:
+        return self.sources.setdefault(src, {'phases': {}, 'counters': {}})
+
+    def get_report(self) -> Dict[str, Any]:
+        """Returns the recorded phases and counters, with phases sorted by their total time
+
+        The ``elapsed`` time is measured from when the profiler was created or reset,
+        so it also includes time spent by Sphinx and other extensions
+        """
+        return {
+            'version': self.version,
+            'elapsed': time.perf_counter() - self._start,
+            'phases': dict(sorted(self.phases.items(), key=lambda item: -item[1]['time'])),
+            'counters': self.counters,
+            'sources': self.sources
+        }
+
+    def write(self, build_dir: Union[str, Path], trace: bool = False) -> Dict[str, Any]:
+        """Writes the :meth:`report <get_report>` to ``readme_profile.json`` in the build directory
+
+        :param build_dir: the build directory
+        :param trace: specifies if the phases should also be written to ``readme_profile.trace.json``,
+           which can be opened in ``chrome://tracing`` or `Perfetto <https://ui.perfetto.dev>`_
+        :return: the report
+        """
+        build_dir = Path(build_dir)
+        report = self.get_report()
+        write_file(build_dir / "readme_profile.json", json.dumps(report, indent=2))
+
+        if trace:
+            write_file(build_dir / "readme_profile.trace.json", json.dumps({
+                'traceEvents': self.events,
+                'displayTimeUnit': 'ms'
+            }))
+
+        return report
+
+    def get_summary(self, report: Optional[Dict[str, Any]] = None, limit: int = 10) -> str:
+        """Formats the slowest phases and the counters of a report as text
+
+        :param report: the report to summarize (default: the current :meth:`report <get_report>`)
+        :param limit: the maximum number of phases to include
+        """
+        report = report or self.get_report()
+        lines = [f"``sphinx_readme``: slowest phases ({report['elapsed']:.3f}s elapsed)"]
+
+        for name, phase in list(report['phases'].items())[:limit]:
+            lines.append(f"    {name:<28}{phase['time'] * 1000:>10.2f}ms {phase['calls']:>8} calls")
+
+        if report['counters']:
+            lines.append("    " + ", ".join(f"{name}={value}" for name, value in report['counters'].items()))
+
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        """Discards all recorded phases and counters"""
+        self.phases.clear()
+        self.counters.clear()
+        self.sources.clear()
+        self.events.clear()
+        self._start = time.perf_counter()
+
+
+def profiled(method: Callable) -> Callable:
+    """Decorator that records each call to a method of the :class:`~.READMEParser` as a phase
+
+    If the first argument is one of the parser's source files, the phase is also recorded for that file
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.profiler.enabled:
+            return method(self, *args, **kwargs)
+
+        src = args[0] if args and isinstance(args[0], str) and args[0] in self.sources else None
+
+        with self.profiler.phase(method.__name__, src):
+            return method(self, *args, **kwargs)
+
+    return wrapper
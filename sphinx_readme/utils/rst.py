@@ -1,19 +1,58 @@
 import re
-from typing import List, Optional, Tuple
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 import sphinx.util.tags
 
 
-def escape_rst(rst: str) -> str:
-    """Escape regex special characters from the content of an ``rst`` file"""
-    for char in ".+?*|()<>{}^$[]":
-        rst = rst.replace(char, rf"\{char}")
-    return rst
-
-
 #: Characters that are allowed directly before a cross-reference
 BEFORE_XREF = re.escape(":[{(/\"'-")
 #: Characters that are allowed directly after a cross-reference
 AFTER_XREF = re.escape(".:;!?,\"'/\\])}-")
+#: Pattern to match the target of any cross-reference
+XREF_TARGET = r"~?\.?[\w./: -]+"
+
+
+@lru_cache(maxsize=256)
+def compile_regex(pattern: str, flags: int = 0) -> re.Pattern:
+    """Compiles a regex pattern, caching the result
+
+    .. tip:: Cache statistics are available through ``compile_regex.cache_info()``
+
+    :param pattern: the regex pattern to compile
+    :param flags: the regex flags to compile the pattern with
+    """
+    return re.compile(pattern, flags)
+
+
+@lru_cache(maxsize=128)
+def compile_xref_regex(domains: Tuple[str, ...], roles: Tuple[str, ...], targets: Tuple[str, ...], xref_type: Optional[str] = None) -> re.Pattern | Tuple[re.Pattern, re.Pattern]:
+    """Compiles and caches the regex to match cross-references
+
+    .. tip:: See :meth:`~.READMEParser.get_xref_regex` for the match groups of each pattern
+
+    :param domains: the Sphinx object domains to match
+    :param roles: the cross-reference roles to match
+    :param targets: the cross-reference targets to match
+    :param xref_type: the xref type to match (``"regular"``, ``"title"`` or ``"any"``); returns both if not specified
+    """
+    targets = f"({'|'.join(targets)})"
+    roles = "|".join(roles)
+    domains = "|".join(domains)
+
+    xref_pattern = fr"(?<![^\s{BEFORE_XREF}])(:(?:(external(?:\+\w+)?):)?(?:(?:{domains}):)?({roles}):`{targets}`)(?=[\s{AFTER_XREF}]|\Z)"
+    xref_title_pattern = fr"(?<![^\s{BEFORE_XREF}])(:(?:(external(?:\+\w+)?):)?(?:(?:{domains}):)?({roles}):`([^`]+?)\s<{targets}>`)(?=[\s{AFTER_XREF}]|\Z)"
+
+    if xref_type == "regular":
+        return compile_regex(xref_pattern)
+    elif xref_type == "title":
+        return compile_regex(xref_title_pattern)
+    elif xref_type == "any":
+        # The title group is optional; the closing ">" is only required if it matched
+        return compile_regex(
+            fr"(?<![^\s{BEFORE_XREF}])(:(?:(external(?:\+\w+)?):)?(?:(?:{domains}):)?({roles}):`(?:([^`]+?)\s<)?{targets}(?(4)>)`)(?=[\s{AFTER_XREF}]|\Z)"
+        )
+    else:
+        return compile_regex(xref_pattern), compile_regex(xref_title_pattern)
 
 
 def format_hyperlink(target: str, text: str, sub_override: Optional[str] = None, force_subs: bool = False) -> Tuple[str, List[Optional[str]]]:
@@ -159,26 +198,27 @@ def replace_only_directives(rst: str, tags: sphinx.util.tags.Tags) -> str:
     :param rst: the content of an ``rst`` file
     :param tags: the :class:`sphinx.util.tags.Tags` object
     """
-    # Match all ``only`` directives
-    pattern = r"\.\. only::\s+(\S.*?)\n+?((?:^[ ]+.+?$|^\s*$)+?)(?=\n*\S+|\Z)"
-    directives = re.findall(pattern, rst, re.M | re.DOTALL)
+    return transform_directives(rst, get_only_transforms(tags))
 
-    for expression, content in directives:
-        # Pattern to match each block exactly
-        pattern = rf"\.\. only:: {expression}\n+?{escape_rst(content)}\n*?"
 
-        if tags.eval_condition(expression):
-            # For replacement, remove preceding indent (3 spaces) from each line
-            content = '\n'.join(line[3:] for line in content.split('\n'))
+def get_only_transforms(tags: sphinx.util.tags.Tags, transforms: Optional[Dict[str, Callable]] = None) -> Dict[str, Callable]:
+    """Adds the transform for :rst:dir:`only` directives to a mapping of directive transforms
 
-            # Replace directive with content
-            rst = re.sub(pattern, rf"{content}", rst)
+    The content of included directives is transformed with the same mapping, so that
+    any nested directives are also transformed
 
-        else:
-            # Remove directive
-            rst = re.sub(pattern, '', rst)
+    :param tags: the :class:`sphinx.util.tags.Tags` object
+    :param transforms: the mapping of directive names to transforms for :func:`transform_directives`
+    """
+    transforms = {} if transforms is None else transforms
 
-    return rst
+    def replace_only(block: DirectiveBlock) -> str:
+        if not tags.eval_condition(block.argument):
+            return ''  # Remove directive
+        return transform_directives('\n'.join(block.get_content()), transforms)
+
+    transforms['only'] = replace_only
+    return transforms
 
 
 def remove_raw_directives(rst: str) -> str:
@@ -186,10 +226,179 @@ def remove_raw_directives(rst: str) -> str:
 
     :param rst: the rst to remove ``raw`` directives from
     """
-    return re.sub(
-        pattern=r"(\.\. raw::\s+\S.*?\n+?(?:^[ ]+.+?$|^\s*$)+?)(?=\n*\S+|\Z)",
-        repl='', string=rst, flags=re.M | re.DOTALL
-    )
+    return transform_directives(rst, {'raw': lambda block: ''})
+
+
+#: Pattern to match the first line of a directive
+DIRECTIVE_START = r"([ ]*)\.\. ([\w:-]+)::(?:\s+(.*?))?\s*$"
+#: Pattern to match a directive option
+DIRECTIVE_OPTION = r"\s+:([^:\s]+):(?:\s+(.*?))?\s*$"
+
+
+class DirectiveBlock:
+
+    """A directive and its options and content, from :func:`split_directive_blocks`
+
+    :param lines: the first line of the directive, followed by the lines which are blank or
+       indented further than it, without any trailing blank lines
+    """
+
+    def __init__(self, lines: List[str]):
+        indent, name, argument = compile_regex(DIRECTIVE_START).match(lines[0]).groups()
+        #: The lines of the directive block
+        self.lines = lines
+        #: The name of the directive
+        self.name: str = name
+        #: The indentation of the directive
+        self.indent: str = indent
+        #: The text following the directive on its first line
+        self.argument: str = argument or ''
+        #: Mapping of the directive's options to their values
+        self.options: Dict[str, str] = {}
+
+        pattern = compile_regex(DIRECTIVE_OPTION)
+
+        for line in lines[1:]:
+            if not (match := pattern.match(line)):
+                break
+            self.options[match.group(1)] = match.group(2) or ''
+
+        #: The content of the directive, without leading blank lines
+        self.content: List[str] = lines[1 + len(self.options):]
+
+        while self.content and not self.content[0].strip():
+            self.content = self.content[1:]
+
+    @property
+    def text(self) -> str:
+        """The original text of the directive block"""
+        return '\n'.join(self.lines)
+
+    def get_content(self) -> List[str]:
+        """Returns the content of the directive, dedented to the indentation of the directive itself"""
+        indents = [len(line) - len(line.lstrip()) for line in self.content if line.strip()]
+        dedent = min(indents, default=0)
+
+        return [
+            self.indent + line[dedent:] if line.strip() else ''
+            for line in self.content
+        ]
+
+
+def split_directive_blocks(rst: str, names: Iterable[str]) -> List[str | DirectiveBlock]:
+    """Splits the content of an ``rst`` file into lines and :class:`DirectiveBlock` objects
+
+    The ``rst`` is scanned once, line by line. Each directive with a name in ``names``,
+    at any indentation, becomes a block containing every following line that's blank or
+    indented further than the directive. Directives within a block aren't split
+
+    :param rst: the content of an ``rst`` file
+    :param names: the names of the directives to split into blocks
+    :return: a list of each line outside a block, and each block
+    """
+    names = set(names)
+    pattern = compile_regex(DIRECTIVE_START)
+    lines = rst.split('\n')
+    items = []
+    i = 0
+
+    while i < len(lines):
+        if not ((match := pattern.match(lines[i])) and match.group(2) in names):
+            items.append(lines[i])
+            i += 1
+            continue
+
+        end = get_block_end(lines, i, len(match.group(1)))
+        items.append(DirectiveBlock(lines[i:end]))
+        i = end
+
+    return items
+
+
+def get_block_end(lines: List[str], start: int, indent: int) -> int:
+    """Returns the index of the line after the end of an indented block
+
+    The block contains every line after ``start`` which is blank or indented further than ``indent``,
+    without any trailing blank lines
+
+    :param lines: the lines of an ``rst`` file
+    :param start: the index of the first line of the block, like a directive
+    :param indent: the indentation of the first line of the block
+    """
+    end = start + 1
+
+    for j in range(start + 1, len(lines)):
+        if not (line := lines[j]).strip():
+            continue  # Blank lines only belong to the block if more content follows
+        if len(line) - len(line.lstrip()) <= indent:
+            break
+        end = j + 1
+
+    return end
+
+
+#: Directives with literal content, which isn't scanned for nested directives
+LITERAL_DIRECTIVES = ("code", "code-block", "sourcecode", "parsed-literal", "raw", "math")
+
+
+def find_directive_spans(rst: str) -> Dict[str, List[Tuple[int, int]]]:
+    """Finds the line span of every directive in the content of an ``rst`` file
+
+    The ``rst`` is scanned once, line by line. Unlike :func:`split_directive_blocks`, directives
+    nested within other directives are also found, but literal blocks and the content of
+    :data:`LITERAL_DIRECTIVES` are skipped
+
+    :param rst: the content of an ``rst`` file
+    :return: a mapping of directive names to the ``(start, end)`` line indices of each
+       of their blocks, in document order
+    """
+    pattern = compile_regex(DIRECTIVE_START)
+    lines = rst.split('\n')
+    spans = {}
+    i = 0
+
+    while i < len(lines):
+        line = lines[i]
+        indent = len(line) - len(line.lstrip())
+
+        if match := pattern.match(line):
+            end = get_block_end(lines, i, indent)
+            spans.setdefault(match.group(2), []).append((i, end))
+
+            if match.group(2) in LITERAL_DIRECTIVES:
+                i = end
+                continue
+
+        elif line.rstrip().endswith('::'):
+            i = get_block_end(lines, i, indent)  # Skip literal block
+            continue
+
+        i += 1
+
+    return spans
+
+
+def transform_directives(rst: str, transforms: Dict[str, Callable[[DirectiveBlock], Optional[str]]]) -> str:
+    """Replaces directives in the content of an ``rst`` file in a single pass
+
+    .. tip:: This is used to replace or remove :rst:dir:`only`, ``include`` and ``raw`` directives
+
+    :param rst: the content of an ``rst`` file
+    :param transforms: a mapping of directive names to a function that returns the replacement
+       for a :class:`DirectiveBlock`, or ``None`` to leave the directive as is
+    :return: the ``rst`` with every applicable directive replaced
+    """
+    parts = []
+
+    for item in split_directive_blocks(rst, transforms):
+        if isinstance(item, DirectiveBlock):
+            if (repl := transforms[item.name](item)) is None:
+                repl = item.text
+            parts.append(repl)
+        else:
+            parts.append(item)
+
+    return '\n'.join(parts)
 
 
 # TODO: Is this needed anymore?
@@ -231,13 +440,13 @@ def replace_xrefs(rst: str, roles: Optional[str | List[str]] = None) -> str:
     for ref in (short_ref, long_ref):
         # Replace :attr:`~.Class.attr` => ``attr`` || :attr:`.Class.attr` => ``Class.attr``
         rst = re.sub(
-            pattern=xref_pattern % ref,
+            pattern=compile_regex(xref_pattern % ref),
             repl=repl,
             string=rst
         )
         # Replace :attr:`title <pkg.module.Class.attr>` => ``title``
         rst = re.sub(
-            pattern=xref_title_pattern % ref,
+            pattern=compile_regex(xref_title_pattern % ref),
             repl=repl,
             string=rst
         )
@@ -1,6 +1,11 @@
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
+from docutils import nodes
 from sphinx.application import Sphinx
-from sphinx.util.logging import getLogger
+from sphinx.environment import BuildEnvironment
+from sphinx.environment.collectors import EnvironmentCollector
+from sphinx.transforms import SphinxTransformer
+from sphinx.transforms.post_transforms import ReferencesResolver
+from sphinx.util.logging import getLogger, suppress_logging
 
 
 logger = getLogger(__name__)
@@ -39,6 +44,148 @@ class ExternalRef:
         self._label = label
 
 
+class InventoryIndex:
+
+    """Reverse index of :mod:`sphinx.ext.intersphinx` inventory entries by package, role, and target
+
+    The index for a package and role is built the first time it's used. Entries are ranked
+    by the order of the role's object types, so a lookup returns the same entry as checking
+    the inventory of each object type in turn
+
+    :param inventory: the intersphinx inventory
+    :param named_inventory: the intersphinx named inventory
+    :param objtypes: mapping of roles to the object types they can cross-reference
+    """
+
+    def __init__(self, inventory: Dict[str, Dict], named_inventory: Dict[str, Dict], objtypes: Dict[str, List[str]]):
+        self.inventory = inventory
+        self.named_inventory = named_inventory
+        self.objtypes = objtypes
+        self._indexes: Dict[Tuple[Optional[str], str], Tuple[Dict, Dict]] = {}
+
+    def get(self, pkg: Optional[str], role: str, ref_id: str) -> Optional[ExternalRef]:
+        """Retrieves the highest ranked inventory entry for the target of a cross-reference
+
+        :param pkg: the package to constrain the lookup to, or ``None`` to use the full inventory
+        :param role: the cross-reference role
+        :param ref_id: the target of the cross-reference
+        :return: an :class:`~.ExternalRef` object if the lookup was successful, otherwise ``None``
+        """
+        if pkg not in self.named_inventory:
+            pkg = None
+
+        if (index := self._indexes.get((pkg, role))) is None:
+            index = self._indexes[(pkg, role)] = self._build_index(pkg, role)
+
+        targets, labels = index
+        matches = []
+
+        if match := targets.get(ref_id):
+            matches.append((match, ref_id))
+
+        if labels:  # Labels are looked up by their normalized name
+            label_id = nodes.fully_normalize_name(ref_id)
+
+            if match := labels.get(label_id):
+                matches.append((match, label_id))
+
+        if not matches:
+            return None
+
+        (_, objtype, entry), ref_id = min(matches, key=lambda m: m[0][0])
+        return ExternalRef(objtype, *entry, ref_id)
+
+    def _build_index(self, pkg: Optional[str], role: str) -> Tuple[Dict, Dict]:
+        inventory = self.named_inventory.get(pkg, self.inventory)
+        targets, labels = {}, {}
+
+        for rank, objtype in enumerate(self.objtypes.get(role, [])):
+            index = labels if objtype == "std:label" else targets
+
+            for name, entry in inventory.get(objtype, {}).items():
+                index.setdefault(name, (rank, objtype, entry))
+
+        return targets, labels
+
+
+class TitleCollector(EnvironmentCollector):
+
+    """Collects the raw source of document and section titles when documents are read
+
+    The titles are stored in ``env.readme_titles``, which is pickled with the |env|,
+    so they're available without loading any doctrees. Each docname is mapped to
+
+    * ``"title"``: the title of the document, used for ``:doc:`` cross-references
+    * ``"labels"``: the titles of sections, mapped to the label used to ``:ref:`` them
+    """
+
+    def clear_doc(self, app: Sphinx, env: BuildEnvironment, docname: str) -> None:
+        get_env_titles(env).pop(docname, None)
+
+    def merge_other(self, app: Sphinx, env: BuildEnvironment, docnames: Set[str], other: BuildEnvironment) -> None:
+        titles, other_titles = get_env_titles(env), get_env_titles(other)
+
+        for docname in docnames:
+            if docname in other_titles:
+                titles[docname] = other_titles[docname]
+
+    def process_doc(self, app: Sphinx, doctree: nodes.document) -> None:
+        sections = list(doctree.findall(nodes.section))
+        titles = {
+            'title': None,
+            'labels': {}
+        }
+        for section in sections:
+            # Parse titles of sections referenced with :ref:
+            if getattr(section, "expect_referenced_by_name", None):
+                ref_id = list(section.expect_referenced_by_name)[0]
+                titles['labels'][ref_id] = section.next_node(nodes.title).rawsource
+
+        if sections:
+            # Parse title of document for :doc: refs
+            titles['title'] = sections[0].next_node(nodes.title).rawsource
+
+        get_env_titles(app.env)[app.env.docname] = titles
+
+
+def get_env_titles(env: BuildEnvironment) -> Dict[str, Dict]:
+    """Returns the titles collected by the :class:`TitleCollector`
+
+    :param env: the |env|
+    """
+    if not hasattr(env, 'readme_titles'):
+        env.readme_titles = {}
+    return env.readme_titles
+
+
+def get_resolved_doctree(app: Sphinx, docname: str) -> nodes.document:
+    """Loads the pickled doctree of a document and resolves its cross-references
+
+    Unlike :meth:`~.BuildEnvironment.get_and_resolve_doctree`, only the
+    :class:`~.ReferencesResolver` is applied, so toctree nodes are kept and
+    ``doctree-resolved`` isn't emitted. Warnings about unresolved cross-references
+    are suppressed, since they're already logged when the document is written
+
+    :param docname: the name of the document
+    """
+    env = app.env
+    doctree = env.get_doctree(docname)
+    backup = env.temp_data.copy()
+
+    try:
+        env.temp_data['docname'] = docname
+        transformer = SphinxTransformer(doctree)
+        transformer.set_environment(env)
+        transformer.add_transforms([ReferencesResolver])
+
+        with suppress_logging():
+            transformer.apply_transforms()
+    finally:
+        env.temp_data = backup
+
+    return doctree
+
+
 def set_conf_val(app: Sphinx, attr: str, value: Any) -> None:
     """Set the value of a ``conf.py`` config variable
 
@@ -0,0 +1,122 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class _Node:
+
+    """A node in the :class:`XrefIndex` trie"""
+    __slots__ = ('children', 'entry')
+
+    def __init__(self):
+        self.children: Dict[str, _Node] = {}
+        self.entry: Optional[Tuple[str, str, bool]] = None
+
+
+class XrefIndex:
+
+    """Suffix index for resolving |py_domain| cross-references
+
+    Objects are stored in a trie of their reversed name components, so any
+    partially qualified name of an object is a path from the root of the trie.
+
+    The ``~`` and ``.`` prefixes of a cross-reference are resolved at lookup time,
+    rather than storing every variant from :func:`~.get_all_xref_variants`
+
+    **Example:**
+
+    >>> index = XrefIndex(inline_markup=False)
+    >>> index.add("pkg.module.Class.meth", "https://pkg.com/module.html#meth", is_callable=True)
+    >>> index.get("~.Class.meth")
+    {'replace': 'meth()', 'target': 'https://pkg.com/module.html#meth'}
+    >>> index.get("module.Class.meth")
+    {'replace': 'module.Class.meth()', 'target': 'https://pkg.com/module.html#meth'}
+
+    :param inline_markup: specifies if replacements should use inline markup
+    """
+
+    def __init__(self, inline_markup: bool = True):
+        self.inline_markup = inline_markup
+        self._root = _Node()
+        self._entries: List[Tuple[str, str, bool]] = []
+
+    def add(self, qualified_name: str, target: str, is_callable: bool = False) -> None:
+        """Adds an object to the index
+
+        If a partially qualified name of the object was already added for a
+        different object, the existing entry takes precedence
+
+        :param qualified_name: the fully qualified name of the object
+        :param target: the refuri of the object's source code or documentation entry
+        :param is_callable: specifies if the object is a method or function
+        """
+        entry = (qualified_name, target, is_callable)
+        node = self._root
+
+        for part in reversed(qualified_name.split('.')):
+            node = node.children.setdefault(part, _Node())
+
+            if node.entry is None:
+                node.entry = entry
+
+        self._entries.append(entry)
+
+    def get(self, ref_id: str) -> Optional[Dict[str, str]]:
+        """Resolves the target of a cross-reference
+
+        :param ref_id: the target of the cross-reference, for example ``"~.Class.meth"``
+        :return: a dict containing the replacement text and the target URL, or ``None`` if not found
+        """
+        if not (entry := self.lookup(ref_id)):
+            return None
+
+        return format_xref(entry, ref_id, self.inline_markup)
+
+    def lookup(self, ref_id: str) -> Optional[Tuple[str, str, bool]]:
+        """Returns the ``(qualified_name, target, is_callable)`` entry for a cross-reference target
+
+        :param ref_id: the target of the cross-reference
+        """
+        name = ref_id.removeprefix("~").removeprefix(".")
+        node = self._root
+
+        for part in reversed(name.split('.')):
+            if (node := node.children.get(part)) is None:
+                return None
+
+        return node.entry
+
+    def __contains__(self, ref_id: str) -> bool:
+        return self.lookup(ref_id) is not None
+
+    def __iter__(self) -> Iterator[Tuple[str, str, bool]]:
+        """Iterates over the ``(qualified_name, target, is_callable)`` entries, in the order they were added"""
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def format_xref(entry: Tuple[str, str, bool], ref_id: str, inline_markup: bool = True) -> Dict[str, str]:
+    """Returns the replacement text and target URL for a |py_domain| cross-reference
+
+    :param entry: the ``(qualified_name, target, is_callable)`` entry of the object
+    :param ref_id: the target of the cross-reference, for example ``"~.Class.meth"``
+    :param inline_markup: specifies if the replacement should use inline markup
+    """
+    qualified_name, target, is_callable = entry
+    name = ref_id.lstrip("~")
+
+    if ref_id.startswith("~"):
+        replace = qualified_name.split('.')[-1]
+    else:
+        replace = name.removeprefix('.')
+
+    if is_callable:
+        replace += "()"
+
+    if inline_markup:
+        replace = f"``{replace}``"
+
+    return {
+        'replace': replace,
+        'target': target
+    }
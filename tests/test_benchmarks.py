@@ -0,0 +1,31 @@
+import importlib.util
+from pathlib import Path
+
+spec = importlib.util.spec_from_file_location(
+    "bench_parser", Path(__file__).parents[1] / "benchmarks" / "bench_parser.py")
+bench_parser = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bench_parser)
+
+
+def test_run_benchmark(output_dir):
+    root = output_dir / "benchmark"
+    root.mkdir()
+    results = bench_parser.run_benchmark(
+        root, repeat=2, objects=50, documents=7, xrefs=30, depth=3,
+        admonitions=2, admonition_lines=3, includes=2
+    )
+    phases = results['phases']
+
+    assert list(phases) == [*bench_parser.PARSER_PHASES, "doctrees.get"]
+    assert all(phase['min'] <= phase['median'] <= phase['max'] for phase in phases.values())
+    assert phases['parse_env']['calls'] == phases['resolve_source']['calls'] == 1
+    assert phases['doctrees.get']['calls'] >= phases['parse_doctree']['calls']
+    assert results['project']['py_refs'] > 0
+    assert (root / "out" / "README.rst").exists()
+
+    # Compare against results where every phase was twice as fast
+    baseline = {'phases': {
+        name: {**phase, 'median': phase['median'] / 2} for name, phase in phases.items()
+    }}
+    assert bench_parser.compare(results, results) == []
+    assert bench_parser.compare(results, baseline, min_time=0)
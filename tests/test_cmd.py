@@ -0,0 +1,119 @@
+import os
+import time
+import pytest
+from sphinx_readme import cmd
+from sphinx_readme.cmd import build_readme, read_readme_sources, update_readme, get_mtimes, watch_readme, main
+from sphinx_readme.utils.git import get_repo
+from sphinx_readme.utils.linkcode import find_module_file
+from sphinx_readme.utils.sphinx import get_conf_val
+
+
+@pytest.mark.sphinx(
+    buildername='html',
+    freshenv=True,
+)
+def test_build_readme(app_params, build_sphinx, output_dir):
+    src_files = ["directives/include.rst"]
+    app = build_sphinx(
+        src_files=src_files,
+        app_params=app_params,
+        confoverrides={}
+    )
+    generated = (output_dir / "include.rst").read_text(encoding="utf-8")
+    (output_dir / "include.rst").unlink()
+
+    readme_app = build_readme(
+        src_dir=app.srcdir,
+        out_dir=app.outdir,
+        doctree_dir=app.doctreedir,
+        confoverrides={"readme_src_files": src_files},
+        quiet=True
+    )
+    assert (output_dir / "include.rst").read_text(encoding="utf-8") == generated
+
+    # Unchanged source files aren't reread
+    parser = get_conf_val(readme_app, 'READMEParser')
+    docnames = [readme_app.env.path2doc(src) for src in parser.sources]
+    assert docnames == ["directives/include"]
+    assert read_readme_sources(readme_app, docnames) == []
+
+
+@pytest.mark.sphinx(
+    buildername='html',
+    freshenv=True,
+)
+def test_update_readme(app_params, build_sphinx, src_dir, output_dir):
+    src_file = "directives/include.rst"
+    app = build_sphinx(
+        src_files=[src_file],
+        app_params=app_params,
+        confoverrides={}
+    )
+    src = str(src_dir / src_file)
+    included = str(src_dir / "directives/include/part.txt")
+    generated = (output_dir / "include.rst").read_text(encoding="utf-8")
+
+    # Included files are watched, and nothing is regenerated until a file changes
+    assert included in get_mtimes(app)
+    assert update_readme(app) == []
+
+    # Caches of module files and repositories are cleared on each rebuild
+    repo = get_repo()
+    find_module_file("tests.helpers", (src_dir.parent.parent,))
+    update_readme(app)
+    assert find_module_file.cache_info().currsize == 0
+    assert get_repo() is not repo
+
+    stat = os.stat(included)
+    (output_dir / "include.rst").unlink()
+
+    try:
+        os.utime(included, ns=(stat.st_atime_ns, time.time_ns() + 60 * 10**9))
+        assert update_readme(app) == [src]
+    finally:
+        os.utime(included, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert (output_dir / "include.rst").read_text(encoding="utf-8") == generated
+    assert update_readme(app) == []
+
+
+@pytest.mark.sphinx(
+    buildername='html',
+    freshenv=True,
+)
+def test_watch_readme(app_params, build_sphinx, monkeypatch, capsys):
+    app = build_sphinx(
+        src_files=["directives/include.rst"],
+        app_params=app_params,
+        confoverrides={}
+    )
+    mtimes = iter(range(10))
+    results = iter([ValueError("half-saved file"), ["index.rst"], KeyboardInterrupt()])
+    calls = []
+
+    def update(app):
+        calls.append(app)
+
+        if isinstance(result := next(results), BaseException):
+            raise result
+        return result
+
+    monkeypatch.setattr(cmd, "get_mtimes", lambda app: {"index.rst": next(mtimes)})
+    monkeypatch.setattr(cmd, "update_readme", update)
+    monkeypatch.setattr(cmd.time, "sleep", lambda interval: None)
+
+    # The watcher keeps running after an error, until it's interrupted
+    watch_readme(app, interval=0)
+    assert len(calls) == 3
+    assert "ValueError: half-saved file" in app._warning.getvalue()
+
+    # Status messages go through the Sphinx logger, so they follow -q
+    status = app._status.getvalue()
+    assert "watching 1 files for changes" in status
+    assert "regenerated 1 file(s)" in status
+    assert "sphinx_readme" not in capsys.readouterr().out
+
+
+def test_main_without_environment(tmp_path, capsys):
+    assert main([str(tmp_path), str(tmp_path / "_build"), "-q"]) == 2
+    assert "no pickled environment found" in capsys.readouterr().err
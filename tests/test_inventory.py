@@ -0,0 +1,94 @@
+import pytest
+from sphinx_readme.inventory import READMEIndex, write_index, split_url
+from sphinx_readme.utils.xref_index import XrefIndex
+from sphinx_readme.utils.rst import get_all_xref_variants
+
+BASE_URL = "https://sphinx-readme.readthedocs.io/en/latest/"
+PY_REFS = [
+    ("sphinx_readme.parser.READMEParser.resolve", f"{BASE_URL}parser.html#sphinx_readme.parser.READMEParser.resolve", True),
+    ("sphinx_readme.parser.READMEParser", f"{BASE_URL}parser.html#sphinx_readme.parser.READMEParser", False),
+    ("sphinx_readme.config.READMEConfig.resolve", f"{BASE_URL}readme_config.html#sphinx_readme.config.READMEConfig.resolve", True),
+]
+STD_REFS = {
+    "doc": {"parser": {"replace": "The parser module", "target": f"{BASE_URL}parser.html"}},
+    "confval": {"readme_index": {"replace": "``readme_index``", "target": f"{BASE_URL}configuring.html#confval-readme_index"}}
+}
+
+
+@pytest.fixture()
+def index_path(tmp_path):
+    path = tmp_path / "readme_index.db"
+    write_index(
+        path=path,
+        meta={'html_baseurl': BASE_URL.rstrip('/'), 'inline_markup': True},
+        py_refs=PY_REFS,
+        std_refs=STD_REFS,
+        titles={"parser": "The parser module"},
+        sources={"index.rst": {"toctrees": [], "admonitions": [], "rubrics": [{"text": "Rubric", "span": [0, 1]}]}}
+    )
+    return path
+
+
+@pytest.mark.parametrize("ref_id", [
+    variant for entry in PY_REFS for variant in get_all_xref_variants(entry[0])
+] + ["READMEParser.res", "parser.resolve.READMEParser", "~~resolve", ""])
+def test_get_matches_xref_index(index_path, ref_id):
+    xref_index = XrefIndex()
+
+    for entry in PY_REFS:
+        xref_index.add(*entry)
+
+    with READMEIndex(index_path) as index:
+        assert index.get(ref_id) == xref_index.get(ref_id)
+
+
+def test_read_index(index_path):
+    with READMEIndex(index_path) as index:
+        assert len(index) == 5
+        assert index.meta == {'html_baseurl': BASE_URL.rstrip('/'), 'inline_markup': True, 'version': READMEIndex.version}
+        assert index.get_ref("doc", "parser") == STD_REFS["doc"]["parser"]
+        assert index.get_ref("ref", "parser") is None
+        assert index.get_title("parser") == "The parser module"
+        assert index.get_source("index.rst")["rubrics"] == [{"text": "Rubric", "span": [0, 1]}]
+        assert index.get_source("other.rst") is None
+
+        # URL prefixes are only stored once
+        assert index.connection.execute("SELECT url FROM prefixes").fetchall() == [(BASE_URL,)]
+
+    assert index._connection is None
+
+
+def test_unsupported_version(index_path, monkeypatch):
+    monkeypatch.setattr(READMEIndex, "version", READMEIndex.version + 1)
+
+    with pytest.raises(ValueError, match="unsupported README index version"):
+        READMEIndex(index_path).connection
+
+
+def test_split_url():
+    assert split_url(f"{BASE_URL}parser.html#a/b") == (BASE_URL, "parser.html#a/b")
+    assert split_url("parser.html") == ("", "parser.html")
+
+
+@pytest.mark.sphinx(
+    buildername='html',
+    freshenv=True,
+)
+def test_build_index(app_params, build_sphinx):
+    src_file = "cross_references/python_xrefs.rst"
+    app = build_sphinx(
+        src_files=[src_file],
+        app_params=app_params,
+        confoverrides={"readme_index": True}
+    )
+    with READMEIndex(app.outdir / "readme_index.db") as index:
+        # Objects that aren't referenced by the source files are included
+        assert index.lookup("TestException")[0] == "test_package.test_module.TestException"
+        assert index.get_ref("doc", "index")["target"] == f"{app.config.html_baseurl}/index.html"
+        assert index.get_title("index") == "Table of Contents"
+        assert index.get_source(src_file) == {"toctrees": [], "admonitions": [], "rubrics": []}
+
+        # External objects from intersphinx aren't included
+        assert not index.connection.execute(
+            "SELECT COUNT(*) FROM xrefs JOIN prefixes ON prefixes.id = xrefs.prefix WHERE url LIKE 'https://docs.python.org%'"
+        ).fetchone()[0]
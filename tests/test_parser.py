@@ -1,6 +1,12 @@
+import json
+import pickle
 import pytest
 from pathlib import Path
+from sphinx.util import logging
+from sphinx.util.console import strip_colors
 from tests.helpers import assert_doctree_equal
+from sphinx_readme.utils import docutils
+from sphinx_readme.utils.sphinx import get_conf_val, get_env_titles
 
 
 @pytest.mark.sphinx(
@@ -88,6 +94,7 @@ def test_substitution_xrefs(confoverrides, expected_file, app_params, build_sphi
 @pytest.mark.parametrize("confoverrides, expected_file", [
     ({'readme_docs_url_type': 'html'}, "html_links.rst"),
     ({'readme_docs_url_type': 'code'}, "code_links.rst"),
+    ({'readme_docs_url_type': 'code', 'readme_linkcode_static': True}, "code_links.rst"),
     ({'readme_docs_url_type': 'html', 'readme_inline_markup': False}, "html_links_no_inline_markup.rst"),
     ({'readme_docs_url_type': 'code', 'readme_inline_markup': False}, "code_links_no_inline_markup.rst")
 ])
@@ -108,7 +115,271 @@ def test_python_xrefs(confoverrides, expected_file, app_params, build_sphinx, ge
     buildername='html',
     freshenv=True,
 )
-def test_toctree(app_params, build_sphinx, get_generated_doctree, get_expected_doctree):
+def test_includes(app_params, build_sphinx, get_generated_doctree, get_expected_doctree, output_dir):
+    src_file = "directives/include.rst"
+    app = build_sphinx(
+        src_files=[src_file],
+        app_params=app_params,
+        confoverrides={}
+    )
+    expected = get_expected_doctree(app, src_file, "include.rst")
+    generated = get_generated_doctree(app, "include.rst")
+    assert_doctree_equal(generated, expected)
+    assert "include cycle detected" in app._warning.getvalue()
+
+    # Backslashes in included files are kept as is
+    readme = (output_dir / "include.rst").read_text(encoding="utf-8")
+    assert r'print("Backslash-n is kept as is: \n")' in readme
+    assert not list(Path(app.srcdir).glob("**/*_temp.rst"))
+
+
+@pytest.mark.sphinx(
+    buildername='html',
+    freshenv=True,
+)
+def test_images(app_params, build_sphinx, get_generated_doctree, get_expected_doctree):
+    src_file = "directives/image.rst"
+    app = build_sphinx(
+        src_files=[src_file],
+        app_params=app_params,
+        confoverrides={}
+    )
+    expected = get_expected_doctree(app, src_file, "image.rst")
+    generated = get_generated_doctree(app, "image.rst")
+    assert_doctree_equal(generated, expected)
+    assert len(get_conf_val(app, 'READMEParser').image_urls) == 2
+
+
+@pytest.mark.sphinx(
+    buildername='html',
+    freshenv=True,
+)
+def test_directive_spans(app_params, build_sphinx):
+    app = build_sphinx(
+        src_files=["directives/rubric.rst", "directives/toctree/basic_toctree.rst"],
+        app_params=app_params,
+        confoverrides={}
+    )
+    parser = get_conf_val(app, 'READMEParser')
+    directives = []
+
+    for src, rst in parser.sources.items():
+        lines = rst.split("\n")
+        directives.extend((lines, "rubric", info['span']) for info in parser.rubrics[src])
+        directives.extend((lines, "toctree", info['span']) for info in parser.toctrees[src])
+        directives.extend((lines, "admonition", info['span']) for info in parser.admonitions[src])
+
+    assert {directive for _, directive, _ in directives} == {"rubric", "toctree", "admonition"}
+
+    for lines, directive, (start, end) in directives:
+        assert lines[start].lstrip().startswith(f".. {directive}::")
+        assert lines[end - 1].strip()
+
+
+@pytest.mark.sphinx(
+    buildername='html',
+    freshenv=True,
+)
+def test_commented_toctree_span(app_params, build_sphinx):
+    app = build_sphinx(
+        src_files=["directives/toctree/commented_toctree.rst"],
+        app_params=app_params,
+        confoverrides={}
+    )
+    parser = get_conf_val(app, 'READMEParser')
+    src, rst = next(iter(parser.sources.items()))
+    lines = rst.split("\n")
+    toctree, = parser.toctrees[src]
+    start, end = toctree['span']
+
+    # The span of the commented out toctree isn't used for the real one
+    assert lines[start] == ".. toctree::"
+    assert lines[start + 1].strip() == ":caption: Toctree Caption"
+
+
+@pytest.mark.sphinx(
+    buildername='html',
+    freshenv=True,
+)
+def test_titles_incremental_build(app_params, build_sphinx, src_dir, output_dir):
+    src_files = ["directives/toctree/basic_toctree.rst"]
+    contents = src_dir / "directives/toctree/subfolder/contents.rst"
+    docname = "directives/toctree/subfolder/contents"
+    app = build_sphinx(src_files=src_files, app_params=app_params, confoverrides={})
+
+    assert get_env_titles(app.env)[docname]['title'] == "File in the subfolder"
+    assert "File in the subfolder" in (output_dir / "basic_toctree.rst").read_text(encoding="utf-8")
+
+    rst = contents.read_text(encoding="utf-8")
+    args, kwargs = app_params
+
+    try:
+        contents.write_text(rst.replace("File in the subfolder\n", "Renamed file\n", 1), encoding="utf-8")
+        # Only the changed document is reread from the pickled environment
+        app = build_sphinx(src_files=src_files, app_params=(args, kwargs | {'freshenv': False}), confoverrides={})
+    finally:
+        contents.write_text(rst, encoding="utf-8")
+
+    status = strip_colors(app._status.getvalue())
+    assert "loading pickled environment... done" in status
+    assert "0 added, 1 changed, 0 removed" in status
+    titles = get_env_titles(app.env)
+    assert titles[docname]['title'] == "Renamed file"
+    assert titles['index']['title'] == "Table of Contents"
+    assert get_conf_val(app, 'READMEParser').titles[docname] == "Renamed file"
+
+    generated = (output_dir / "basic_toctree.rst").read_text(encoding="utf-8")
+    assert "Renamed file" in generated
+    assert "File in the subfolder" not in generated
+
+
+@pytest.mark.sphinx(
+    buildername='html',
+    freshenv=True,
+)
+def test_replace_xrefs_resolves_each_xref_once(app_params, build_sphinx, monkeypatch):
+    app = build_sphinx(
+        src_files=["directives/toctree/max_depth_toctree.rst"],
+        app_params=app_params,
+        confoverrides={}
+    )
+    parser = get_conf_val(app, 'READMEParser')
+    src = next(iter(parser.sources))
+    get_xref_link = parser.get_xref_link
+    calls = []
+
+    def get_link(rst_src, external, role, title, ref_id):
+        calls.append((role, title, ref_id))
+        return get_xref_link(rst_src, external, role, title, ref_id)
+
+    monkeypatch.setattr(parser, "get_xref_link", get_link)
+    parser.substitutions[src] = {}
+    rst = parser.replace_xrefs(src, ":doc:`/index`, :doc:`/index`, :doc:`Home </index>`, :doc:`../../index`, :doc:`/missing`")
+
+    # Relative and absolute paths resolve to the same document, and unresolved xrefs are left as is
+    assert rst == "|.index|_, |.index|_, |.index+Home|_, |.index|_, :doc:`/missing`"
+    assert calls == [("doc", None, "/index"), ("doc", "Home", "/index"), ("doc", None, "../../index"), ("doc", None, "/missing")]
+    assert set(parser.substitutions[src]) == {"index", "index+Home"}
+    assert parser.substitutions[src]["index+Home"][0] == ".. |.index+Home| replace:: Home"
+
+
+@pytest.mark.sphinx(
+    buildername='html',
+    freshenv=True,
+)
+def test_replace_py_xrefs_lookup(app_params, build_sphinx):
+    app = build_sphinx(
+        src_files=["cross_references/python_xrefs.rst"],
+        app_params=app_params,
+        confoverrides={'readme_docs_url_type': 'html'}
+    )
+    parser = get_conf_val(app, 'READMEParser')
+    src = next(iter(parser.sources))
+    parser.substitutions[src] = {}
+    rst = parser.replace_py_xrefs(
+        src, ":class:`~.TestClass` :class:`test_module.TestClass` :meth:`Title <.TestClass.test_method>` "
+             ":class:`.Missing` :class:`test_moduleXTestClass`"
+    )
+
+    # Targets are looked up exactly, so "." isn't treated as a wildcard
+    assert rst == (
+        "|.~.TestClass|_ |.test_module.TestClass|_ |..TestClass.test_method+Title|_ "
+        ":class:`.Missing` :class:`test_moduleXTestClass`"
+    )
+    assert parser.substitutions[src]["~.TestClass"][0] == ".. |.~.TestClass| replace:: ``TestClass``"
+    assert parser.substitutions[src][".TestClass.test_method+Title"][0] == ".. |..TestClass.test_method+Title| replace:: ``Title``"
+
+
+@pytest.mark.sphinx(
+    buildername='html',
+    freshenv=True,
+)
+def test_sources_are_reparsed_once(app_params, build_sphinx, monkeypatch):
+    parsed = []
+    get_doctree = docutils.get_doctree
+
+    def count_doctrees(app, rst, docname='index'):
+        parsed.append(docname)
+        return get_doctree(app, rst, docname)
+
+    monkeypatch.setattr(docutils, "get_doctree", count_doctrees)
+    app = build_sphinx(
+        src_files=["directives/admonition.rst", "directives/rubric.rst"],
+        app_params=app_params,
+        confoverrides={}
+    )
+    # The reparsed doctree is shared by each parsing step, then released
+    assert sorted(parsed) == ["directives/admonition", "directives/rubric"]
+    assert len(get_conf_val(app, 'READMEParser').doctrees) == 0
+
+
+@pytest.mark.sphinx(
+    buildername='html',
+    freshenv=True,
+)
+def test_resolve_logging(app_params, build_sphinx, capsys):
+    app = build_sphinx(
+        src_files=["directives/rubric.rst"],
+        app_params=app_params,
+        confoverrides={}
+    )
+    assert "saved generated file to" in strip_colors(app._status.getvalue())
+
+    # Files that don't need to be regenerated are only logged in verbose mode
+    get_conf_val(app, 'READMEParser').resolve()
+    assert "is up to date" not in app._status.getvalue()
+
+    app.verbosity = 1
+    logging.setup(app, app._status, app._warning)
+    get_conf_val(app, 'READMEParser').resolve()
+    assert "is up to date" in app._status.getvalue()
+    assert "sphinx_readme" not in capsys.readouterr().out
+
+
+@pytest.mark.sphinx(
+    buildername='html',
+    freshenv=True,
+)
+def test_only_referenced_objects_are_parsed(app_params, build_sphinx):
+    app = build_sphinx(
+        src_files=["directives/toctree/max_depth_toctree.rst"],
+        app_params=app_params,
+        confoverrides={'readme_docs_url_type': 'code'}
+    )
+    parser = get_conf_val(app, 'READMEParser')
+    assert app.env.domaindata['py']['objects']
+    assert len(parser.py_refs) == 0
+    assert list(parser.ref_map) == ['doc']
+    assert list(parser.ref_map['doc']) == ['index']
+
+
+@pytest.mark.sphinx(
+    buildername='html',
+    freshenv=True,
+    parallel=2
+)
+@pytest.mark.parametrize("confoverrides, expected_file", [
+    ({'readme_docs_url_type': 'code'}, "code_links.rst"),
+])
+def test_parallel_build(confoverrides, expected_file, app_params, build_sphinx, get_generated_doctree, get_expected_doctree):
+    src_file = "cross_references/python_xrefs.rst"
+    src_files = {src_file: expected_file}
+    app = build_sphinx(
+        src_files=src_files,
+        app_params=app_params,
+        confoverrides=confoverrides
+    )
+    expected = get_expected_doctree(app, src_file, expected_file)
+    generated = get_generated_doctree(app, expected_file)
+    assert_doctree_equal(generated, expected)
+
+
+@pytest.mark.sphinx(
+    buildername='html',
+    freshenv=True,
+)
+@pytest.mark.parametrize("confoverrides", [{}, {'readme_parallel': 2}])
+def test_toctree(confoverrides, app_params, build_sphinx, get_generated_doctree, get_expected_doctree):
     toc_dir = "directives/toctree"
     files = (
         "basic_toctree.rst",
@@ -124,7 +395,7 @@ def test_toctree(app_params, build_sphinx, get_generated_doctree, get_expected_d
     app = build_sphinx(
         src_files=src_files,
         app_params=app_params,
-        confoverrides={},
+        confoverrides=confoverrides,
         force_all=True
     )
     for file in files:
@@ -132,3 +403,93 @@ def test_toctree(app_params, build_sphinx, get_generated_doctree, get_expected_d
         generated = get_generated_doctree(app, Path(file).name)
         assert_doctree_equal(generated, expected)
 
+
+@pytest.mark.sphinx(
+    buildername='html',
+    freshenv=True,
+)
+def test_profile(app_params, build_sphinx, src_dir):
+    src_file = "cross_references/python_xrefs.rst"
+    app = build_sphinx(
+        src_files=[src_file],
+        app_params=app_params,
+        confoverrides={"readme_profile": "trace"}
+    )
+    report = json.loads((app.outdir / "readme_profile.json").read_text(encoding="utf-8"))
+    source = report['sources'][str(src_dir / src_file)]
+
+    for phase in ("parse_env", "parse_py_domain", "get_doctree", "parse_admonitions", "resolve", "replace_py_xrefs"):
+        assert report['phases'][phase]['calls'] >= 1
+
+    assert 0 < source['counters']['xrefs_resolved'] <= source['counters']['xrefs_found']
+    assert source['counters']['bytes_written'] > 0
+    assert report['counters']['ref_map'] >= 0
+    assert set(source['phases']) >= {"get_doctree", "resolve_source", "replace_xrefs"}
+    assert (app.outdir / "readme_profile.trace.json").exists()
+
+    # Recorded phases are discarded once the report is written
+    assert get_conf_val(app, 'READMEParser').profiler.phases == {}
+
+
+@pytest.mark.sphinx(
+    buildername='html',
+    freshenv=True,
+)
+def test_profile_custom_linkcode_resolve(app_params, build_sphinx):
+    app = build_sphinx(
+        src_files=["cross_references/python_xrefs.rst"],
+        app_params=app_params,
+        confoverrides={"readme_profile": True, "readme_docs_url_type": "code"}
+    )
+    parser = get_conf_val(app, 'READMEParser')
+
+    # Links from a custom linkcode_resolve() aren't cached, but are still profiled
+    parser.config.linkcode_resolver = None
+    parser.parse_py_domain(app.env)
+    assert parser.profiler.phases['linkcode_resolve']['calls'] > 0
+
+
+@pytest.mark.sphinx(
+    buildername='html',
+    freshenv=True,
+)
+def test_memory_report(app_params, build_sphinx):
+    app = build_sphinx(
+        src_files=["cross_references/python_xrefs.rst"],
+        app_params=app_params,
+        confoverrides={"readme_memory_report": True}
+    )
+    report = json.loads((app.outdir / "readme_memory.json").read_text(encoding="utf-8"))
+    phases = [phase['phase'] for phase in report['phases']]
+
+    assert phases[0] == "parse_env" and phases[-1] == "resolve"
+    assert "parse_doctree" in phases
+    assert report['structures']['sources'] > 0
+    assert {"ref_map", "py_refs", "inventory_index", "doctrees", "file_cache"} <= set(report['structures'])
+
+    # Tracing stops once the report is written
+    assert get_conf_val(app, 'READMEParser').memory_report.phases == []
+
+
+@pytest.mark.sphinx(
+    buildername='html',
+    freshenv=True,
+)
+def test_worker_parser(app_params, build_sphinx):
+    app = build_sphinx(
+        src_files=["directives/rubric.rst", "directives/admonition.rst", "directives/include.rst"],
+        app_params=app_params,
+        confoverrides={}
+    )
+    parser = get_conf_val(app, 'READMEParser')
+    src = next(iter(parser.sources))
+    worker = parser.get_worker_parser(src)
+
+    assert len(parser.sources) == 3 and parser.config.file_cache
+    assert worker.sources is worker.config.sources
+    assert list(worker.config.sources) == [src]
+    assert len(worker.config.file_cache) == 0
+
+    # Only the worker's copy of the config is limited to the source file
+    assert len(parser.config.sources) == 3
+    assert len(pickle.dumps(worker.config)) < len(pickle.dumps(parser.config))
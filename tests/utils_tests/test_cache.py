@@ -0,0 +1,58 @@
+from sphinx_readme.utils.cache import BuildManifest, LRUCache, write_file
+
+
+def test_write_file_only_if_changed(tmp_path):
+    file = tmp_path / "README.rst"
+
+    assert write_file(file, "Title\n=====\n") is True
+    mtime = file.stat().st_mtime_ns
+
+    assert write_file(file, "Title\n=====\n") is False
+    assert file.stat().st_mtime_ns == mtime
+
+    assert write_file(file, "New Title\n=========\n") is True
+    assert file.read_text(encoding='utf-8') == "New Title\n=========\n"
+    assert [f.name for f in tmp_path.iterdir()] == ["README.rst"]  # No temp files left behind
+
+
+def test_build_manifest(tmp_path):
+    src, out = str(tmp_path / "src.rst"), tmp_path / "README.rst"
+    write_file(out, "content")
+
+    manifest = BuildManifest(tmp_path / "manifest.json")
+    assert not manifest.is_current(src, "fingerprint", out)
+
+    manifest.update(src, "fingerprint", out)
+    manifest.save()
+
+    manifest = BuildManifest(tmp_path / "manifest.json")
+    assert manifest.is_current(src, "fingerprint", out)
+    assert not manifest.is_current(src, "other_fingerprint", out)
+
+    # Output file was modified or removed since the last build
+    write_file(out, "modified content")
+    assert not manifest.is_current(src, "fingerprint", out)
+
+    out.unlink()
+    assert not manifest.is_current(src, "fingerprint", out)
+
+
+def test_build_manifest_invalid_file(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text("{not json")
+
+    assert BuildManifest(path).entries == {}
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache["a"] = 1
+    cache["b"] = 2
+
+    assert cache["a"] == 1  # Marks "a" as used
+    cache["c"] = 3
+
+    assert list(cache) == ["a", "c"]
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert len(cache) == 2
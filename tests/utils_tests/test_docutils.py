@@ -0,0 +1,46 @@
+import pytest
+from sphinx_readme.utils import docutils
+from sphinx_readme.utils.docutils import DoctreeCache
+
+
+@pytest.fixture
+def parsed(monkeypatch):
+    """Replaces :func:`get_doctree` to record the content and docname of each doctree it generates"""
+    calls = []
+
+    def get_doctree(app, rst, docname='index'):
+        calls.append((rst, docname))
+        return object()
+
+    monkeypatch.setattr(docutils, "get_doctree", get_doctree)
+    return calls
+
+
+def test_doctree_cache_hits_and_misses(parsed):
+    cache = DoctreeCache()
+    doctree = cache.get(None, "Title\n=====\n", "index")
+
+    assert cache.get(None, "Title\n=====\n", "index") is doctree
+    assert cache.get(None, "Title\n=====\n", "other") is not doctree
+    assert cache.get(None, "Other\n=====\n", "index") is not doctree
+    assert len(parsed) == 3 and len(cache) == 3
+
+    # Released doctrees are generated again the next time they're needed
+    cache.release("Title\n=====\n", "index")
+    assert cache.get(None, "Title\n=====\n", "index") is not doctree
+    assert len(parsed) == 4
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_doctree_cache_evicts_least_recently_used(parsed):
+    cache = DoctreeCache(maxsize=2)
+    first = cache.get(None, "first")
+    cache.get(None, "second")
+    cache.get(None, "first")
+    cache.get(None, "third")
+
+    assert len(cache) == 2
+    assert cache.get(None, "first") is first
+    assert len(parsed) == 3
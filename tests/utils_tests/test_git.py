@@ -1,9 +1,11 @@
+import zlib
+import shutil
 import pytest
 import subprocess
 from pathlib import Path
 from unittest.mock import patch
 from sphinx.errors import ExtensionError
-from sphinx_readme.utils.git import get_repo_url, get_blob_url, is_valid_username, is_valid_repo, get_blob, get_head, get_last_tag, get_repo_host, get_repo_dir
+from sphinx_readme.utils.git import get_repo_url, get_blob_url, is_valid_username, is_valid_repo, get_blob, get_head, get_last_tag, get_repo_host, get_repo_dir, get_repo, GitRepo
 
 # GitHub Repo
 github_html_context = {
@@ -329,6 +331,17 @@ def test_get_blob_runtime_error_from_get_last_tag(mocked_get_last_tag):
         get_blob("last_tag")
 
 
+@pytest.fixture
+def cli_repo(tmp_path):
+    """Patches ``get_repo()`` with a repo that has no ``.git`` directory, so the git CLI is used"""
+    repo = GitRepo(tmp_path)
+    repo.git_dir = None
+
+    with patch('sphinx_readme.utils.git.get_repo', return_value=repo):
+        yield repo
+
+
+@pytest.mark.usefixtures("cli_repo")
 @patch('subprocess.check_output')
 def test_get_head_not_tagged(mock_check_output):
     """If the most recent commit is not tagged, the SHA should be returned"""
@@ -337,6 +350,7 @@ def test_get_head_not_tagged(mock_check_output):
     assert get_head() == HEAD
 
 
+@pytest.mark.usefixtures("cli_repo")
 @patch('subprocess.check_output')
 def test_get_head_tagged(mock_check_output):
     """If the most recent commit *is* tagged, the tag name should be returned"""
@@ -345,6 +359,7 @@ def test_get_head_tagged(mock_check_output):
     assert get_head() == LAST_TAG
 
 
+@pytest.mark.usefixtures("cli_repo")
 @patch('subprocess.check_output')
 def test_get_head_fails(mock_check_output):
     """Test when git command execution fails"""
@@ -354,6 +369,7 @@ def test_get_head_fails(mock_check_output):
         get_head()
 
 
+@pytest.mark.usefixtures("cli_repo")
 @patch('subprocess.check_output')
 def test_get_last_tag(mock_check_output):
     mock_check_output.return_value = f"{LAST_TAG}\n".encode('utf-8')
@@ -361,6 +377,7 @@ def test_get_last_tag(mock_check_output):
     assert get_last_tag() == LAST_TAG
 
 
+@pytest.mark.usefixtures("cli_repo")
 @patch('subprocess.check_output')
 def test_get_last_tag_fails(mock_check_output):
     """Test when git command execution fails/the current branch of the repo has no tags"""
@@ -406,6 +423,7 @@ def test_get_repo_host_invalid_url(repo_url):
 REPO_DIR = Path('../').resolve()
 
 
+@pytest.mark.usefixtures("cli_repo")
 @patch('subprocess.check_output')
 def test_get_repo_dir(mock_check_output):
     mock_check_output.return_value = f"{REPO_DIR.as_posix()}\n".encode('utf-8')
@@ -413,9 +431,151 @@ def test_get_repo_dir(mock_check_output):
     assert get_repo_dir() == REPO_DIR
 
 
+@pytest.mark.usefixtures("cli_repo")
 @patch('subprocess.check_output')
 def test_get_repo_dir_fails(mock_check_output):
     mock_check_output.side_effect = subprocess.CalledProcessError(1, 'cmd')
 
     with pytest.raises(RuntimeError, match="Unable to determine the repository directory"):
         get_repo_dir()
+
+
+TAG_OBJECT = "1db503f03193f5e9edf94d7524ed2f09f2a036ac"
+OTHER_COMMIT = "d471a9b08ac5f38bcb39d32af6a15011cdb33d42"
+
+
+@pytest.fixture
+def git_dir(tmp_path):
+    """Creates a minimal ``.git`` directory, with ``main`` checked out at ``HEAD``"""
+    git_dir = tmp_path / ".git"
+    (git_dir / "refs" / "heads").mkdir(parents=True)
+    (git_dir / "refs" / "tags").mkdir()
+    (git_dir / "HEAD").write_text("ref: refs/heads/main\n")
+    (git_dir / "refs" / "heads" / "main").write_text(f"{HEAD}\n")
+    return git_dir
+
+
+def add_object(git_dir, sha, obj_type, content):
+    """Writes a loose object to the ``.git`` directory"""
+    obj = git_dir / "objects" / sha[:2] / sha[2:]
+    obj.parent.mkdir(parents=True, exist_ok=True)
+    obj.write_bytes(zlib.compress(b"%s %d\0" % (obj_type, len(content)) + content))
+
+
+@patch('subprocess.check_output')
+def test_git_repo_reads_head(mock_check_output, git_dir):
+    repo = GitRepo(git_dir.parent)
+
+    assert repo.head == HEAD
+    assert repo.root == git_dir.parent
+    mock_check_output.assert_not_called()
+
+
+@patch('subprocess.check_output')
+def test_git_repo_reads_detached_head(mock_check_output, git_dir):
+    (git_dir / "HEAD").write_text(f"{OTHER_COMMIT}\n")
+
+    assert GitRepo(git_dir.parent).head == OTHER_COMMIT
+    mock_check_output.assert_not_called()
+
+
+@patch('subprocess.check_output')
+def test_git_repo_reads_packed_refs(mock_check_output, git_dir):
+    (git_dir / "refs" / "heads" / "main").unlink()
+    (git_dir / "packed-refs").write_text(
+        "# pack-refs with: peeled fully-peeled sorted \n"
+        f"{HEAD} refs/heads/main\n"
+        f"{OTHER_COMMIT} refs/tags/v0.1.0\n"
+        f"{TAG_OBJECT} refs/tags/{LAST_TAG}\n"
+        f"^{HEAD}\n"
+    )
+    repo = GitRepo(git_dir.parent)
+
+    assert repo.head == HEAD
+    assert repo.tags == {"v0.1.0": OTHER_COMMIT, LAST_TAG: HEAD}
+    assert repo.get_tag(HEAD) == LAST_TAG
+    assert repo.last_tag == LAST_TAG
+    mock_check_output.assert_not_called()
+
+
+@pytest.mark.parametrize("annotated", [True, False])
+@patch('subprocess.check_output')
+def test_git_repo_reads_loose_tags(mock_check_output, git_dir, annotated):
+    add_object(git_dir, HEAD, b"commit", b"tree 4b825dc642cb6eb9a060e54bf8d69288fbee4904\n\ncommit\n")
+
+    if annotated:
+        add_object(git_dir, TAG_OBJECT, b"tag", f"object {HEAD}\ntype commit\ntag {LAST_TAG}\n\ntag\n".encode())
+        (git_dir / "refs" / "tags" / LAST_TAG).write_text(f"{TAG_OBJECT}\n")
+    else:
+        (git_dir / "refs" / "tags" / LAST_TAG).write_text(f"{HEAD}\n")
+
+    repo = GitRepo(git_dir.parent)
+
+    assert repo.tags == {LAST_TAG: HEAD}
+    assert repo.get_tag(HEAD) == LAST_TAG
+    assert repo.get_tag(OTHER_COMMIT) is None
+    mock_check_output.assert_not_called()
+
+
+@patch('subprocess.check_output')
+def test_git_repo_without_tags(mock_check_output, git_dir):
+    repo = GitRepo(git_dir.parent)
+
+    assert repo.get_tag(HEAD) is None
+
+    with pytest.raises(RuntimeError, match="No tags exist for the repo"):
+        repo.last_tag
+
+    mock_check_output.assert_not_called()
+
+
+@patch('subprocess.check_output')
+def test_git_repo_uses_cli_for_unreadable_tags(mock_check_output, git_dir):
+    """If a tag object is packed, ``git describe`` is used to find the tag"""
+    (git_dir / "refs" / "tags" / LAST_TAG).write_text(f"{TAG_OBJECT}\n")
+    mock_check_output.return_value = f"{LAST_TAG}\n".encode('utf-8')
+
+    assert GitRepo(git_dir.parent).get_tag(HEAD) == LAST_TAG
+    mock_check_output.assert_called_once()
+
+
+@patch('subprocess.check_output')
+def test_git_repo_reads_worktree(mock_check_output, git_dir, tmp_path):
+    worktree_dir = git_dir / "worktrees" / "feature"
+    worktree_dir.mkdir(parents=True)
+    (worktree_dir / "HEAD").write_text("ref: refs/heads/main\n")
+    (worktree_dir / "commondir").write_text("../..\n")
+
+    worktree = tmp_path / "feature"
+    (worktree / "docs").mkdir(parents=True)
+    (worktree / ".git").write_text(f"gitdir: {worktree_dir}\n")
+
+    repo = GitRepo(worktree / "docs")
+
+    assert repo.git_dir == worktree_dir
+    assert repo.common_dir == git_dir
+    assert repo.root == worktree
+    assert repo.head == HEAD
+    mock_check_output.assert_not_called()
+
+
+def test_get_repo_is_memoized(git_dir):
+    assert get_repo(git_dir.parent) is get_repo(git_dir.parent)
+    assert get_repo(git_dir.parent) is not get_repo(git_dir.parent.parent)
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="requires git")
+def test_git_repo_matches_cli_with_packed_objects(tmp_path):
+    def git(*args):
+        return subprocess.check_output(["git", *args], cwd=tmp_path).strip().decode('utf-8')
+
+    git("init", "-q")
+    git("-c", "user.name=test", "-c", "user.email=test@test", "commit", "-q", "--allow-empty", "-m", "first")
+    git("-c", "user.name=test", "-c", "user.email=test@test", "tag", "-a", "v1.0.0", "-m", "annotated")
+    git("gc", "-q")
+    git("tag", "v1.0.0-light")  # Loose ref to a packed commit
+
+    repo = GitRepo(tmp_path.resolve())
+
+    assert repo.head == git("rev-parse", "HEAD")
+    assert repo.tags == {"v1.0.0": repo.head, "v1.0.0-light": repo.head}
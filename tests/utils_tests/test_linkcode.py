@@ -0,0 +1,243 @@
+import os
+import sys
+import inspect
+import pytest
+import importlib
+from functools import cached_property
+from sphinx_readme.utils.linkcode import get_line_spans, get_source_lines, get_static_source, find_module_file, LinkcodeCache
+
+MODULE = '''\
+import functools
+from functools import cached_property
+
+
+def decorator(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return func(*args, **kwargs)
+    return wrapper
+
+
+@decorator
+def decorated(x):
+    return x
+
+
+class Outer:
+
+    class Inner:
+        def method(self):
+            pass
+
+    @property
+    def prop(self):
+        return 1
+
+    @prop.setter
+    def prop(self, value):
+        pass
+
+    @cached_property
+    def cached(self):
+        return 2
+
+    def commented(self):
+        x = 1
+        # trailing comment
+
+    def after(self):
+        pass
+
+
+if True:
+    def conditional():
+        return 1
+else:
+    def conditional():
+        return 2
+'''
+
+
+@pytest.fixture
+def module(tmp_path, monkeypatch):
+    path = tmp_path / "linkcode_module.py"
+    path.write_text(MODULE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield importlib.import_module("linkcode_module")
+    sys.modules.pop("linkcode_module", None)
+
+
+def test_get_line_spans(module):
+    spans = get_line_spans(module.__file__)
+
+    assert spans["decorated"] == [(12, 14)]
+    assert spans["Outer.Inner.method"] == [(20, 21)]
+    assert spans["Outer.prop"] == [(23, 25)]  # Setter is excluded
+    assert spans["Outer.commented"] == [(35, 37)]  # Includes trailing comment
+    assert spans["decorator.<locals>.wrapper"] == [(6, 8)]
+    assert len(spans["conditional"]) == 2
+
+
+@pytest.mark.parametrize("name", [
+    "decorated",
+    "Outer",
+    "Outer.Inner",
+    "Outer.Inner.method",
+    "Outer.prop",
+    "Outer.cached",
+    "Outer.commented",
+    "Outer.after",
+    "conditional",
+])
+def test_get_source_lines_matches_inspect(module, name):
+    obj = module
+    for part in name.split("."):
+        obj = getattr(obj, part)
+
+    if isinstance(obj, property):
+        obj = obj.fget
+    elif isinstance(obj, cached_property):
+        obj = obj.func
+
+    obj = inspect.unwrap(obj)
+    source, lineno = inspect.getsourcelines(obj)
+
+    assert get_source_lines(obj, module.__file__) == (lineno, lineno + len(source) - 1)
+
+
+def test_get_line_spans_is_cached(module):
+    assert get_line_spans(module.__file__) is get_line_spans(module.__file__)
+
+
+def test_get_line_spans_invalid_file(tmp_path):
+    assert get_line_spans(tmp_path / "missing.py") == {}
+
+    invalid = tmp_path / "invalid.py"
+    invalid.write_text("def broken(:\n")
+    assert get_line_spans(invalid) == {}
+
+
+PACKAGE = {
+    "pkg/__init__.py": "from .core import Model as Alias\nfrom pkg.helpers import *\n\nVERSION = 1\n",
+    "pkg/core.py": "from . import helpers\n\n\nclass Model:\n\n    def save(self):\n        pass\n",
+    "pkg/helpers.py": "import os\n\n\ndef helper():\n    return 1\n",
+    "pkg/sub/__init__.py": "from ..core import Model\n",
+}
+
+
+@pytest.fixture
+def package(tmp_path):
+    for name, content in PACKAGE.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return tmp_path
+
+
+@pytest.mark.parametrize("module, fullname, file, span", [
+    ("pkg.core", "Model", "pkg/core.py", (4, 7)),
+    ("pkg.core", "Model.save", "pkg/core.py", (6, 7)),
+    ("pkg", "Alias.save", "pkg/core.py", (6, 7)),  # Re-exported from __init__.py
+    ("pkg", "helper", "pkg/helpers.py", (4, 5)),  # Star import
+    ("pkg", "core.Model", "pkg/core.py", (4, 7)),  # Submodule
+    ("pkg.core", "helpers.helper", "pkg/helpers.py", (4, 5)),
+    ("pkg.sub", "Model", "pkg/core.py", (4, 7)),  # Parent relative import
+    ("pkg.helpers", "", "pkg/helpers.py", (1, 5)),
+])
+def test_get_static_source(package, module, fullname, file, span):
+    assert get_static_source(module, fullname, (package,)) == (package / file, *span)
+
+
+@pytest.mark.parametrize("module, fullname", [
+    ("pkg", "VERSION"),
+    ("pkg", "missing"),
+    ("pkg.helpers", "os.path"),
+    ("missing", ""),
+])
+def test_get_static_source_unresolved(package, module, fullname):
+    assert get_static_source(module, fullname, (package,)) is None
+
+
+def test_find_module_file(package):
+    assert find_module_file("pkg", (package,)) == package / "pkg" / "__init__.py"
+    assert find_module_file("pkg.core", (package,)) == package / "pkg" / "core.py"
+    assert find_module_file("pkg.missing", (package,)) is None
+
+
+BLOB_URL = "https://github.com/user/repo/blob/main"
+
+
+@pytest.fixture
+def linkcode_resolve(package, monkeypatch):
+    """Resolves links with :func:`get_static_source`, and records the objects it's called for"""
+    monkeypatch.syspath_prepend(str(package))
+
+    def _resolve(domain, info):
+        _resolve.calls.append(info["fullname"])
+        if source := get_static_source(info["module"], info["fullname"], (package,)):
+            modpath, start, stop = source
+            return f"{BLOB_URL}/{modpath.relative_to(package).as_posix()}#L{start}-L{stop}"
+
+    _resolve.calls = []
+    return _resolve
+
+
+def resolve_all(cache, linkcode_resolve, names):
+    resolve = cache.wrap(linkcode_resolve)
+    links = [resolve("py", {"module": "pkg", "fullname": name}) for name in names]
+    cache.save()
+    return links
+
+
+def test_linkcode_cache(package, linkcode_resolve, tmp_path):
+    path = tmp_path / "cache.json"
+    names = ["Alias", "helper", "missing"]
+
+    links = resolve_all(LinkcodeCache(path, BLOB_URL, "static", package), linkcode_resolve, names)
+    assert links == [f"{BLOB_URL}/pkg/core.py#L4-L7", f"{BLOB_URL}/pkg/helpers.py#L4-L5", None]
+    assert linkcode_resolve.calls == names
+
+    # Links are reused from the cache file, even if files are touched
+    linkcode_resolve.calls.clear()
+    core = package / "pkg" / "core.py"
+    os.utime(core, ns=(core.stat().st_atime_ns, core.stat().st_mtime_ns + 10 ** 9))
+
+    assert resolve_all(LinkcodeCache(path, BLOB_URL, "static", package), linkcode_resolve, names) == links
+    assert linkcode_resolve.calls == ["missing"]
+
+    # Only links that depend on a modified file are resolved again
+    linkcode_resolve.calls.clear()
+    core.write_text("\n" + core.read_text())
+    links = resolve_all(LinkcodeCache(path, BLOB_URL, "static", package), linkcode_resolve, names)
+    assert links[0] == f"{BLOB_URL}/pkg/core.py#L5-L8"
+    assert linkcode_resolve.calls == ["Alias", "missing"]
+
+
+def test_linkcode_cache_failed_resolution(package, linkcode_resolve, tmp_path):
+    path = tmp_path / "cache.json"
+    failing = lambda domain, info: None
+
+    # A link that can't be resolved isn't cached, so it's resolved again once it can be
+    assert resolve_all(LinkcodeCache(path, BLOB_URL, "static", package), failing, ["helper"]) == [None]
+    assert LinkcodeCache(path, BLOB_URL, "static", package).entries == {}
+
+    links = resolve_all(LinkcodeCache(path, BLOB_URL, "static", package), linkcode_resolve, ["helper"])
+    assert links == [f"{BLOB_URL}/pkg/helpers.py#L4-L5"]
+    assert linkcode_resolve.calls == ["helper"]
+
+
+def test_linkcode_cache_blob_change(package, linkcode_resolve, tmp_path):
+    path = tmp_path / "cache.json"
+    resolve_all(LinkcodeCache(path, BLOB_URL, "static", package), linkcode_resolve, ["helper"])
+    linkcode_resolve.calls.clear()
+
+    blob_url = BLOB_URL.replace("main", "v1.0.0")
+    links = resolve_all(LinkcodeCache(path, blob_url, "static", package), linkcode_resolve, ["helper"])
+    assert links == [f"{blob_url}/pkg/helpers.py#L4-L5"]
+    assert linkcode_resolve.calls == []
+
+
+def test_linkcode_cache_resolver_change(package, linkcode_resolve, tmp_path):
+    path = tmp_path / "cache.json"
+    resolve_all(LinkcodeCache(path, BLOB_URL, "static", package), linkcode_resolve, ["helper"])
+    assert LinkcodeCache(path, BLOB_URL, "default", package).entries == {}
@@ -0,0 +1,59 @@
+import sys
+import json
+import tracemalloc
+from sphinx_readme.utils.memory import MemoryReport, get_deep_size, format_size
+
+
+class Node:
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.children = []
+
+
+def test_memory_report(tmp_path):
+    report = MemoryReport(enabled=True)
+
+    with report.phase("parse_env"):
+        retained = [str(i) * 10 for i in range(1000)]
+
+    with report.phase("parse_doctree", docname="index"):
+        [bytes(1000) for _ in range(100)]
+
+    result = report.write(tmp_path, {"retained": retained, "empty": {}})
+
+    assert [phase['phase'] for phase in result['phases']] == ["parse_env", "parse_doctree"]
+    assert result['phases'][1]['docname'] == "index"
+    assert result['phases'][0]['retained'] > 0
+    assert result['phases'][0]['top'][0]['file'] == __file__
+    assert result['phases'][1]['peak'] > 100 * 1000 > result['phases'][1]['retained']
+    assert list(result['structures']) == ["retained", "empty"]
+    assert json.loads((tmp_path / "readme_memory.json").read_text()) == result
+    assert "parse_doctree (index)" in report.get_summary(result)
+
+    report.reset()
+    assert report.phases == []
+    assert not tracemalloc.is_tracing()
+
+
+def test_disabled_memory_report():
+    report = MemoryReport()
+
+    with report.phase("resolve"):
+        pass
+
+    assert report.phases == []
+    assert not tracemalloc.is_tracing()
+
+
+def test_get_deep_size():
+    root = Node()
+    root.children = [Node(root) for _ in range(10)]
+    child_size = get_deep_size(root.children[0])
+
+    # Back-references to the parent aren't followed
+    assert child_size < get_deep_size(root)
+    assert get_deep_size(["a" * 100]) > get_deep_size(["a"])
+    assert get_deep_size([Node]) == sys.getsizeof([Node])
+    assert format_size(512) == "512 B"
+    assert format_size(123456) == "120.6 KiB"
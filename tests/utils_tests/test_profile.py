@@ -0,0 +1,44 @@
+import json
+from sphinx_readme.utils.profile import Profiler
+
+
+def test_profiler(tmp_path):
+    profiler = Profiler(enabled=True)
+
+    with profiler.phase("resolve"):
+        with profiler.phase("replace_xrefs", src="README.rst"):
+            profiler.count("xrefs_found", 3, src="README.rst")
+
+        profiler.wrap(lambda: None, "linkcode_resolve")()
+        profiler.wrap(lambda: None, "linkcode_resolve")()
+
+    profiler.set("ref_map", 10)
+    report = profiler.write(tmp_path, trace=True)
+
+    assert list(report['phases'])[0] == "resolve"
+    assert report['phases']['linkcode_resolve']['calls'] == 2
+    assert report['counters'] == {"xrefs_found": 3, "ref_map": 10}
+    assert report['sources']['README.rst']['counters'] == {"xrefs_found": 3}
+    assert list(report['sources']['README.rst']['phases']) == ["replace_xrefs"]
+    assert json.loads((tmp_path / "readme_profile.json").read_text()) == report
+
+    trace = json.loads((tmp_path / "readme_profile.trace.json").read_text())
+    assert [event['name'] for event in trace['traceEvents']] == [
+        "replace_xrefs", "linkcode_resolve", "linkcode_resolve", "resolve"
+    ]
+    assert "resolve" in profiler.get_summary(report)
+
+    profiler.reset()
+    assert profiler.get_report()['phases'] == {}
+
+
+def test_disabled_profiler(tmp_path):
+    profiler = Profiler()
+    func = lambda: None
+
+    with profiler.phase("resolve"):
+        profiler.count("xrefs_found")
+
+    assert profiler.wrap(func) is func
+    assert profiler.phases == profiler.counters == {}
+    assert profiler.events == []
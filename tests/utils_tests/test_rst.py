@@ -0,0 +1,122 @@
+import re
+import pytest
+from sphinx.util.tags import Tags
+from sphinx_readme.utils.rst import (
+    compile_regex, compile_xref_regex, split_directive_blocks, transform_directives,
+    replace_only_directives, remove_raw_directives, find_directive_spans, DirectiveBlock
+)
+
+
+def test_compile_regex_is_cached():
+    pattern = compile_regex(r"\.\. test-directive::", re.M)
+    hits = compile_regex.cache_info().hits
+
+    assert compile_regex(r"\.\. test-directive::", re.M) is pattern
+    assert compile_regex.cache_info().hits == hits + 1
+
+
+def test_compile_xref_regex_is_cached():
+    args = (("std",), ("ref", "doc"), (r"[\w-]+",))
+    regular, title = compile_xref_regex(*args)
+
+    assert compile_xref_regex(*args) == (regular, title)
+    assert compile_xref_regex(*args, xref_type="regular") is regular
+    assert compile_xref_regex(*args, xref_type="title") is title
+
+
+def test_compile_regex_misses():
+    pattern = compile_regex(r"\.\. miss-directive::")
+    misses = compile_regex.cache_info().misses
+
+    # Patterns are cached separately for each set of flags
+    assert compile_regex(r"\.\. miss-directive::", re.M) is not pattern
+    assert compile_regex(r"\.\. other-miss-directive::") is not pattern
+    assert compile_regex.cache_info().misses == misses + 2
+
+
+def test_compile_xref_regex_misses():
+    args = (("std",), ("ref",), (r"[\w-]+",))
+    pattern = compile_xref_regex(*args, xref_type="any")
+    misses = compile_xref_regex.cache_info().misses
+
+    assert compile_xref_regex(("std",), ("doc",), (r"[\w-]+",), "any") is not pattern
+    assert compile_xref_regex(*args, xref_type="regular") is not pattern
+    assert compile_xref_regex.cache_info().misses == misses + 2
+    assert compile_xref_regex(*args, xref_type="any") is pattern
+
+
+def test_compile_xref_regex_any_type():
+    pattern = compile_xref_regex(("std",), ("ref",), (r"[\w-]+",), "any")
+
+    assert pattern.match(":ref:`label`").groups() == (":ref:`label`", None, "ref", None, "label")
+    assert pattern.match(":std:ref:`Title <label>`").groups() == (":std:ref:`Title <label>`", None, "ref", "Title", "label")
+    assert pattern.match(":ref:`Title <label`") is None
+
+
+NESTED_RST = """\
+.. note::
+
+   .. only:: readme
+
+      Only content
+
+   .. raw:: html
+
+      <br>
+
+   Note content
+
+Text
+"""
+
+
+def test_split_directive_blocks():
+    items = split_directive_blocks(NESTED_RST, ["only", "raw"])
+    only, raw = [item for item in items if isinstance(item, DirectiveBlock)]
+
+    assert (only.name, only.indent, only.argument) == ("only", "   ", "readme")
+    assert only.content == ["      Only content"]
+    assert only.get_content() == ["   Only content"]
+    assert raw.text == "   .. raw:: html\n\n      <br>"
+    assert "   Note content" in items
+
+
+def test_directive_block_options():
+    block = DirectiveBlock([".. include:: file.rst", "   :start-line: 2", "   :end-line: 5", "", "   Content"])
+
+    assert block.argument == "file.rst"
+    assert block.options == {"start-line": "2", "end-line": "5"}
+    assert block.content == ["   Content"]
+
+
+@pytest.mark.parametrize("rst, expected", [
+    (".. only:: readme\n\n   Kept\n\nText\n", "Kept\n\nText\n"),
+    (".. only:: html\n\n   Removed\n\nText\n", "\n\nText\n"),
+    (".. only::  readme\n\n    Four spaces with a \\n\n", "Four spaces with a \\n\n"),
+    (".. only:: readme\n\n   .. only:: html\n\n      Nested\n\n   Kept\n", "\n\nKept\n"),
+    (NESTED_RST, NESTED_RST.replace("   .. only:: readme\n\n      Only", "   Only")),
+])
+def test_replace_only_directives(rst, expected):
+    assert replace_only_directives(rst, Tags(["readme"])) == expected
+
+
+def test_remove_raw_directives():
+    expected = NESTED_RST.replace("   .. raw:: html\n\n      <br>", "")
+    assert remove_raw_directives(NESTED_RST) == expected
+
+
+def test_transform_directives_keeps_unchanged_blocks():
+    rst = ".. raw:: html\n\n   <br>\n\n.. raw:: latex\n\n   \\newpage\n"
+    transforms = {"raw": lambda block: "" if block.argument == "html" else None}
+
+    assert transform_directives(rst, transforms) == "\n\n.. raw:: latex\n\n   \\newpage\n"
+
+
+def test_find_directive_spans():
+    rst = NESTED_RST + "\n.. code-block:: rst\n\n   .. note:: Literal\n\nExample::\n\n   .. note:: Literal\n"
+    spans = find_directive_spans(rst)
+
+    assert spans["note"] == [(0, 11)]
+    assert spans["only"] == [(2, 5)]
+    assert spans["raw"] == [(6, 9)]
+    assert spans["code-block"] == [(14, 17)]
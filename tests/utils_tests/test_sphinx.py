@@ -0,0 +1,98 @@
+import pytest
+from types import SimpleNamespace
+from sphinx_readme.utils.sphinx import InventoryIndex, TitleCollector, get_env_titles
+
+
+def entry(pkg, name, label="-"):
+    return pkg, "1.0", f"https://{pkg}.org/{name}", label
+
+
+INVENTORY = {
+    "py:function": {"pkg.run": entry("numpy", "pkg.run")},
+    "py:method": {"pkg.run": entry("numpy", "pkg.Runner.run")},
+    "py:class": {"pkg.Runner": entry("sphinx", "pkg.Runner")},
+    "std:label": {"getting started": entry("sphinx", "start", "Getting Started")},
+    "std:term": {"Getting Started": entry("sphinx", "term")},
+}
+NAMED_INVENTORY = {
+    "numpy": {"py:function": {"pkg.run": entry("numpy", "pkg.run")}},
+    "sphinx": {
+        "py:class": {"pkg.Runner": entry("sphinx", "pkg.Runner")},
+        "std:label": {"getting started": entry("sphinx", "start", "Getting Started")},
+    },
+}
+OBJTYPES = {
+    "meth": ["py:method", "py:function"],
+    "func": ["py:function", "py:method"],
+    "class": ["py:class"],
+    "ref": ["std:label"],
+    "any": ["std:term", "std:label"],
+}
+
+
+@pytest.fixture
+def index():
+    return InventoryIndex(INVENTORY, NAMED_INVENTORY, OBJTYPES)
+
+
+@pytest.mark.parametrize("role, objtype", [
+    ("meth", "py:method"),
+    ("func", "py:function"),
+])
+def test_get_uses_objtype_rank(index, role, objtype):
+    assert index.get(None, role, "pkg.run").objtype == objtype
+
+
+@pytest.mark.parametrize("ref_id", ["getting started", "Getting Started", "Getting   started"])
+def test_get_normalizes_labels(index, ref_id):
+    xref = index.get(None, "ref", ref_id)
+    assert xref.objtype == "std:label"
+    assert xref.id == "sphinx+getting started"
+    assert xref.label == "Getting Started"
+
+
+def test_get_prefers_higher_ranked_exact_match(index):
+    assert index.get(None, "any", "Getting Started").objtype == "std:term"
+    assert index.get(None, "any", "getting started").objtype == "std:label"
+
+
+def test_get_constrains_to_named_inventory(index):
+    assert index.get("numpy", "class", "pkg.Runner") is None
+    assert index.get("sphinx", "class", "pkg.Runner").target == "https://sphinx.org/pkg.Runner"
+    assert index.get("numpy", "meth", "pkg.run").objtype == "py:function"
+
+
+def test_get_falls_back_to_inventory_for_unknown_pkg(index):
+    assert index.get("unknown", "meth", "pkg.run").objtype == "py:method"
+
+
+@pytest.mark.parametrize("pkg, role, ref_id", [
+    (None, "class", "pkg.run"),
+    (None, "unknown", "pkg.run"),
+    (None, "ref", "missing"),
+])
+def test_get_unresolved(index, pkg, role, ref_id):
+    assert index.get(pkg, role, ref_id) is None
+
+
+def test_title_collector_clear_and_merge():
+    collector = TitleCollector()
+    env = SimpleNamespace(readme_titles={
+        "index": {"title": "Index", "labels": {}},
+        "old": {"title": "Old", "labels": {"old-label": "Old Section"}}
+    })
+    # Titles collected by a parallel reader process
+    other = SimpleNamespace(readme_titles={
+        "new": {"title": "New", "labels": {"new-label": "New Section"}},
+        "unmerged": {"title": "Unmerged", "labels": {}}
+    })
+
+    collector.clear_doc(None, env, "old")
+    collector.clear_doc(None, env, "missing")
+    collector.merge_other(None, env, {"new", "not-read"}, other)
+
+    assert get_env_titles(env) == {
+        "index": {"title": "Index", "labels": {}},
+        "new": {"title": "New", "labels": {"new-label": "New Section"}}
+    }
+    assert get_env_titles(SimpleNamespace()) == {}
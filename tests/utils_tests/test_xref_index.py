@@ -0,0 +1,55 @@
+import pytest
+from sphinx_readme.utils.xref_index import XrefIndex
+from sphinx_readme.utils.rst import get_all_xref_variants
+
+TARGET = "https://sphinx-readme.readthedocs.io/en/latest/parser.html#sphinx_readme.parser.READMEParser.resolve"
+QUALIFIED_NAME = "sphinx_readme.parser.READMEParser.resolve"
+
+
+@pytest.mark.parametrize("inline_markup", [True, False])
+@pytest.mark.parametrize("is_callable", [True, False])
+@pytest.mark.parametrize("variant", get_all_xref_variants(QUALIFIED_NAME))
+def test_get_resolves_all_variants(variant, is_callable, inline_markup):
+    index = XrefIndex(inline_markup)
+    index.add(QUALIFIED_NAME, TARGET, is_callable)
+
+    if variant.startswith("~"):
+        replace = "resolve"
+    else:
+        replace = variant.lstrip('.')
+
+    if is_callable:
+        replace += "()"
+
+    if inline_markup:
+        replace = f"``{replace}``"
+
+    assert index.get(variant) == {'replace': replace, 'target': TARGET}
+
+
+@pytest.mark.parametrize("ref_id", [
+    "parser.resolve.READMEParser",  # Components out of order
+    "READMEParser.res",  # Partial component
+    "..READMEParser.resolve",
+    "~~READMEParser.resolve",
+    "sphinx_readme.parser:READMEParser.resolve",
+    "",
+])
+def test_get_unresolved(ref_id):
+    index = XrefIndex()
+    index.add(QUALIFIED_NAME, TARGET)
+
+    assert index.get(ref_id) is None
+    assert ref_id not in index
+
+
+def test_first_added_object_takes_precedence():
+    index = XrefIndex(inline_markup=False)
+    index.add("pkg.a.Class", "a")
+    index.add("pkg.b.Class", "b")
+
+    assert index.get("Class")['target'] == "a"
+    assert index.get("~.Class")['target'] == "a"
+    assert index.get("b.Class")['target'] == "b"
+    assert len(index) == 2
+    assert list(index) == [("pkg.a.Class", "a", False), ("pkg.b.Class", "b", False)]